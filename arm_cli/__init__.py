@@ -5,21 +5,15 @@ from beartype.claw import beartype_this_package
 # Enable beartype on the package without polluting package __init__
 beartype_this_package()
 
-# Expose package version via setuptools-scm only
+# Expose the version of the installed distribution; setuptools-scm's generated
+# _version.py (not tracked) covers source trees that were never installed
 try:
-    from ._version import version as __version__  # type: ignore[attr-defined]
-except Exception:  # pragma: no cover - fallback for editable installs
+    from importlib.metadata import PackageNotFoundError
+    from importlib.metadata import version as _get_version
+
+    __version__ = _get_version("arm-cli")
+except PackageNotFoundError:  # pragma: no cover - running from an uninstalled tree
     try:
-        from importlib.metadata import version as _get_version
-    except Exception:
-        try:
-            from importlib_metadata import version as _get_version  # type: ignore[no-redef]
-        except Exception:
-            _get_version = None  # type: ignore[assignment]
-    if _get_version is not None:
-        try:
-            __version__ = _get_version("arm-cli")  # type: ignore[assignment]
-        except Exception:
-            __version__ = "0+unknown"  # type: ignore[assignment]
-    else:
-        __version__ = "0+unknown"  # type: ignore[assignment]
+        from ._version import version as __version__  # type: ignore[no-redef]
+    except ImportError:
+        __version__ = "0+unknown"
@@ -1,21 +1,45 @@
+import hashlib
 import json
 import os
 import shutil
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import appdirs
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr, TypeAdapter
+
+from arm_cli.registry import SqliteRegistry
+from arm_cli.utils.completion import invalidate_completion_cache, write_completion_cache
+
+# `"extends": "default"` refers to the packaged default project config
+DEFAULT_TEMPLATE = "default"
 
 
 class ProjectConfig(BaseModel):
-    """Configuration schema for individual projects."""
+    """Configuration schema for individual projects.
+
+    A config may name a parent config in `extends` (a path relative to the config
+    file, or "default" for the packaged template). The parent chain is merged
+    root-first, so every file overrides the ones it extends. Relative paths in the
+    merged config resolve against the file that was loaded, not the one defining them.
+
+    The retention_* fields are the policy of `arm-cli system data prune`.
+    """
 
     name: str
+    extends: Optional[str] = None
     description: Optional[str] = None
     project_directory: Optional[str] = None
     docker_compose_file: Optional[str] = None
     data_directory: Optional[str] = None
+    retention_directory: Optional[str] = None
+    retention_max_age: Optional[str] = None
+    retention_max_size: Optional[str] = None
+    retention_keep_latest: Optional[int] = None
 
     def get_resolved_project_directory(
         self, config_file_path: Optional[Path] = None
@@ -58,11 +82,18 @@ class AvailableProject(BaseModel):
 
 
 class GlobalContext(BaseModel):
-    """Global context schema for the CLI."""
+    """Global context schema for the CLI.
+
+    With the SQLite registry backend, available_projects is only read from the
+    registry by get_available_projects(), and changes are written row by row.
+    """
 
     active_project: str = ""
     available_projects: List[AvailableProject] = []
 
+    _registry: Optional[SqliteRegistry] = PrivateAttr(default=None)
+    _projects_loaded: bool = PrivateAttr(default=False)
+
 
 def get_config_dir() -> Path:
     """Get the configuration directory for the CLI."""
@@ -124,8 +155,173 @@ def copy_default_project_config() -> Path:
     return user_config_path
 
 
+def get_resolved_config_cache_file() -> Path:
+    """Get the path of the cache of configs resolved through their `extends` chain."""
+    return Path(appdirs.user_cache_dir("arm-cli")) / "resolved_project_configs.json"
+
+
+def merge_config_data(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge an overriding config into the one it extends.
+
+    Nested objects are merged key by key; any other value in override, including
+    null and lists, replaces the base value.
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config_data(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _read_config_chain(config_path: Path) -> List[Tuple[Path, bytes, Dict[str, Any]]]:
+    """Read a config and every config it extends, leaf first.
+
+    Raises:
+        FileNotFoundError: If a config in the chain does not exist.
+        ValueError: If a config is not a JSON object or the chain has a cycle.
+    """
+    chain = []
+    seen = set()
+    path = config_path
+    while True:
+        if path in seen:
+            raise ValueError(f"Project config {path} extends itself through {config_path}")
+        seen.add(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Project config not found at {path}")
+        raw = path.read_bytes()
+        data = json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError(f"Project config {path} is not a JSON object")
+        chain.append((path, raw, data))
+
+        extends = data.get("extends")
+        if not extends:
+            return chain
+        if extends == DEFAULT_TEMPLATE:
+            path = get_default_project_config_path()
+        else:
+            parent = Path(os.path.expanduser(extends))
+            path = parent if parent.is_absolute() else (path.parent / parent).resolve()
+
+
+def _get_file_stat(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class _ResolvedConfigCache:
+    """The resolved config cache in memory, shared by threads and written back once."""
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.changed = False
+        try:
+            with open(cache_file, "r") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[key] = entry
+            self.changed = True
+
+    def save(self) -> None:
+        with self.lock:
+            if not self.changed:
+                return
+            self.changed = False
+            tmp_file = None
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                # A unique name, as other processes may be writing the cache too
+                with tempfile.NamedTemporaryFile(
+                    "w", dir=self.cache_file.parent, suffix=".tmp", delete=False
+                ) as f:
+                    tmp_file = f.name
+                    json.dump(self.entries, f)
+                os.replace(tmp_file, self.cache_file)
+            except OSError:
+                if tmp_file is not None and os.path.exists(tmp_file):
+                    os.unlink(tmp_file)
+
+
+_resolved_config_lock = threading.Lock()
+_resolved_config_batch: Optional[_ResolvedConfigCache] = None
+_resolved_config_users = 0
+
+
+@contextmanager
+def resolved_config_batch() -> Iterator[None]:
+    """Resolve configs (from any thread) with one read and one write of the cache.
+
+    Without a batch, every config resolved alone reads and rewrites the whole cache.
+    """
+    global _resolved_config_batch, _resolved_config_users
+    with _resolved_config_lock:
+        if _resolved_config_batch is None:
+            _resolved_config_batch = _ResolvedConfigCache(get_resolved_config_cache_file())
+        _resolved_config_users += 1
+    try:
+        yield
+    finally:
+        with _resolved_config_lock:
+            _resolved_config_users -= 1
+            if not _resolved_config_users:
+                _resolved_config_batch.save()
+                _resolved_config_batch = None
+
+
+def resolve_project_config_data(config_path: Path) -> Tuple[Dict[str, Any], List[Path]]:
+    """Get a config merged with every config it extends, and the files of the chain.
+
+    Resolved chains are cached, keyed on the content hash of every file in the chain.
+    When no file in a cached chain has a new mtime or size, resolving is a single
+    lookup; otherwise the chain is re-read and only re-merged if a hash changed.
+    """
+    with resolved_config_batch():
+        return _resolve_project_config_data(config_path, _resolved_config_batch)
+
+
+def _resolve_project_config_data(
+    config_path: Path, cache: _ResolvedConfigCache
+) -> Tuple[Dict[str, Any], List[Path]]:
+    key = str(config_path)
+    entry = cache.get(key)
+    if entry and all(_get_file_stat(Path(path)) == stat for path, stat, _ in entry["files"]):
+        return entry["data"], [Path(path) for path, _, _ in entry["files"]]
+
+    chain = _read_config_chain(config_path)
+    files = [
+        [str(path), _get_file_stat(path), hashlib.sha256(raw).hexdigest()] for path, raw, _ in chain
+    ]
+    if entry and [f[::2] for f in entry["files"]] == [f[::2] for f in files]:
+        data = entry["data"]  # Touched but unchanged
+    else:
+        data = {}
+        for _, _, parent_data in reversed(chain):
+            data = merge_config_data(data, parent_data)
+        data["extends"] = chain[0][2].get("extends")
+
+    if len(chain) > 1:
+        # Single-file configs are as cheap to read as the cache itself
+        cache.put(key, {"files": files, "data": data})
+    return data, [path for path, _, _ in chain]
+
+
 def load_project_config(project_path: str) -> ProjectConfig:
-    """Load a project configuration from file."""
+    """Load a project configuration from file, merged with the configs it extends."""
     config_path = Path(project_path)
 
     # If it's a relative path, make it relative to the config directory
@@ -135,19 +331,60 @@ def load_project_config(project_path: str) -> ProjectConfig:
     if not config_path.exists():
         raise FileNotFoundError(f"Project config not found at {config_path}")
 
-    with open(config_path, "r") as f:
-        data = json.load(f)
+    data, chain = resolve_project_config_data(config_path)
 
     project_config = ProjectConfig(**data)
 
     # Store the config file path for resolving relative project_directory
     project_config._config_file_path = config_path
+    # And every file the config was merged from, to tell when it changes
+    project_config._config_chain = chain
 
     return project_config
 
 
+def get_registry_file() -> Path:
+    """Get the path of the SQLite registry, next to the global context file."""
+    return get_config_file().with_suffix(".db")
+
+
+def is_sqlite_registry_enabled() -> bool:
+    """Check whether the registry_backend setting selects the SQLite registry."""
+    from arm_cli.settings import get_setting
+
+    return get_setting("registry_backend") == "sqlite"
+
+
+def load_registry_config() -> GlobalContext:
+    """Open the SQLite registry, migrating global_context.json into it on first use."""
+    registry = SqliteRegistry(get_registry_file())
+    if not registry.migrated:
+        config_file = get_config_file()
+        if config_file.exists():
+            try:
+                with open(config_file, "r") as f:
+                    data = GlobalContext(**json.load(f))
+                registry.import_context(
+                    data.active_project, [(p.path, p.name) for p in data.available_projects]
+                )
+                # stderr, so the first run after an upgrade keeps stdout parseable
+                print(
+                    f"Migrated {len(data.available_projects)} projects into {get_registry_file()}",
+                    file=sys.stderr,
+                )
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                print(f"Warning: Could not migrate {config_file}: {e}", file=sys.stderr)
+
+    config = GlobalContext(active_project=registry.get_active())
+    config._registry = registry
+    return config
+
+
 def add_project_to_list(config: GlobalContext, project_path: str, project_name: str) -> None:
     """Add a project to the available projects list and set as active."""
+    if config._registry is not None:
+        config._registry.add(project_path, project_name)
+
     # Remove existing entry if it exists
     config.available_projects = [p for p in config.available_projects if p.path != project_path]
 
@@ -161,6 +398,13 @@ def add_project_to_list(config: GlobalContext, project_path: str, project_name:
 
 def get_available_projects(config: GlobalContext) -> List[AvailableProject]:
     """Get the list of available projects."""
+    if config._registry is not None and not config._projects_loaded:
+        # Validating all rows in one call is much faster than building models one by one
+        config.available_projects = TypeAdapter(List[AvailableProject]).validate_python(
+            [{"path": path, "name": name} for path, name in config._registry.list_projects()]
+        )
+        config._projects_loaded = True
+
     # If no projects are available, ensure the default project is added
     if not config.available_projects:
         try:
@@ -175,6 +419,15 @@ def get_available_projects(config: GlobalContext) -> List[AvailableProject]:
 
 def activate_project(config: GlobalContext, project_identifier: str) -> Optional[ProjectConfig]:
     """Activate a project by path or name."""
+    if config._registry is not None:
+        # Indexed lookup and a single row update instead of scanning every project
+        project = config._registry.find(project_identifier)
+        if project is None:
+            return None
+        config.active_project = project[0]
+        save_config(config)
+        return load_project_config(project[0])
+
     # First try to find by exact path
     for project in config.available_projects:
         if project.path == project_identifier:
@@ -194,6 +447,13 @@ def activate_project(config: GlobalContext, project_identifier: str) -> Optional
 
 def remove_project_from_list(config: GlobalContext, project_identifier: str) -> bool:
     """Remove a project from the available projects list by path or name."""
+    if config._registry is not None:
+        project = config._registry.find(project_identifier)
+        if project is None:
+            return False
+        remove_projects(config, [project[0]])
+        return True
+
     # First try to find by exact path
     for project in config.available_projects:
         if project.path == project_identifier:
@@ -215,8 +475,21 @@ def remove_project_from_list(config: GlobalContext, project_identifier: str) ->
     return False
 
 
+def remove_projects(config: GlobalContext, project_paths: List[str]) -> None:
+    """Remove several projects by path at once, clearing the active project if removed."""
+    paths = set(project_paths)
+    if config._registry is not None:
+        config._registry.remove(paths)
+    config.available_projects = [p for p in config.available_projects if p.path not in paths]
+    if config.active_project in paths:
+        config.active_project = ""
+
+
 def load_config() -> GlobalContext:
     """Load configuration from file, creating default if it doesn't exist."""
+    if is_sqlite_registry_enabled():
+        return load_registry_config()
+
     config_file = get_config_file()
 
     # Check for old config file and migrate if needed
@@ -255,13 +528,24 @@ def load_config() -> GlobalContext:
 
 def save_config(config: GlobalContext) -> None:
     """Save configuration to file."""
+    if config._registry is not None:
+        # Projects were already written row by row; only the active project is left
+        config._registry.set_active(config.active_project)
+        invalidate_completion_cache("projects")
+        return
+
     config_file = get_config_file()
 
     # Ensure directory exists
     config_file.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(config_file, "w") as f:
+    # Write to a temporary file first so readers never see a partially written registry
+    tmp_file = config_file.with_name(config_file.name + ".tmp")
+    with open(tmp_file, "w") as f:
         json.dump(config.model_dump(), f, indent=2)
+    os.replace(tmp_file, config_file)
+
+    write_completion_cache("projects", [project.name for project in config.available_projects])
 
 
 def get_active_project_config(config: GlobalContext) -> Optional[ProjectConfig]:
@@ -0,0 +1,145 @@
+"""Copy files in and out of containers through the Engine archive API.
+
+Tar data is streamed between disk and the Docker socket in fixed size chunks, so
+copying multi-gigabyte files needs neither temporary files nor memory proportional to
+their size.
+"""
+
+import posixpath
+import tarfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import docker
+
+from arm_cli.utils.streams import CHUNK_SIZE, IterStream, iter_path_tar
+
+# Seconds without socket activity before a transfer is considered stalled
+TRANSFER_TIMEOUT = 60.0
+
+# os.FileMode directory bit, as reported in the archive path stat header
+_MODE_DIR = 1 << 31
+
+
+class ByteCounter:
+    """Pass chunks through while counting them, for throughput reporting."""
+
+    def __init__(self):
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def count(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            with self._lock:
+                self.bytes += len(chunk)
+            yield chunk
+
+
+def parse_container_path(spec: str) -> Optional[Tuple[str, str]]:
+    """Split CONTAINER:PATH into its parts, or return None for a local path.
+
+    Like `docker cp`, paths starting with / or . are always local, so local files with
+    a colon in their name can still be copied.
+    """
+    if spec.startswith(("/", ".")) or ":" not in spec:
+        return None
+    container, path = spec.split(":", 1)
+    if not container:
+        return None
+    return container, path if path.startswith("/") else "/" + path
+
+
+def stat_container_path(client, container_id: str, path: str) -> Optional[Dict[str, Any]]:
+    """Stat a path inside a container, returning None if it does not exist."""
+    # docker-py only exposes the stat header through get_archive(), which starts a
+    # download, so ask for the header alone with HEAD on the same endpoint
+    url = f"{client.api.base_url}/v{client.api.api_version}/containers/{container_id}/archive"
+    with client.api.head(url, params={"path": path}) as response:
+        if response.status_code == 404:
+            return None
+        if response.status_code >= 400:
+            raise docker.errors.APIError(f"Cannot stat {path}", response=response)
+        header = response.headers.get("X-Docker-Container-Path-Stat")
+    return docker.utils.decode_json_header(header) if header else None
+
+
+def copy_to_container(
+    client, container_id: str, source: Path, dest: str, counter: ByteCounter
+) -> None:
+    """Copy a local file or directory to a path inside a container.
+
+    As with `docker cp`, an existing destination directory receives the source under
+    its own name; otherwise the source is renamed to the destination's basename.
+
+    Raises:
+        ValueError: If the destination cannot hold the source.
+    """
+    stat = stat_container_path(client, container_id, dest)
+    if stat is not None and stat.get("mode", 0) & _MODE_DIR:
+        target_dir, arcname = dest, source.name
+    elif dest.endswith("/"):
+        raise ValueError(f"Destination directory {dest} does not exist")
+    elif stat is not None and source.is_dir():
+        raise ValueError(f"Cannot copy a directory over the file {dest}")
+    else:
+        target_dir, arcname = posixpath.dirname(dest) or "/", posixpath.basename(dest)
+
+    data = counter.count(iter_path_tar(source, arcname))
+    client.api.put_archive(container_id, target_dir, data)
+
+
+def copy_from_container(
+    client, container_id: str, source: str, dest: Path, counter: ByteCounter
+) -> None:
+    """Copy a file or directory out of a container to a local path.
+
+    Raises:
+        ValueError: If the local destination's parent directory does not exist.
+    """
+    if dest.is_dir():
+        target_dir, rename = dest, None
+    elif dest.parent.is_dir():
+        target_dir, rename = dest.parent, dest.name
+    else:
+        raise ValueError(f"Destination directory {dest.parent} does not exist")
+
+    chunks, stat = client.api.get_archive(container_id, source, chunk_size=CHUNK_SIZE)
+    root = (stat or {}).get("name") or posixpath.basename(source.rstrip("/"))
+    extract_tar_stream(counter.count(chunks), target_dir, root, rename)
+
+
+def extract_tar_stream(
+    chunks: Iterable[bytes], target_dir: Path, root: str, rename: Optional[str] = None
+) -> None:
+    """Extract a tar stream member by member, optionally renaming its top-level entry.
+
+    Raises:
+        ValueError: If a member would be extracted outside of target_dir.
+    """
+    with tarfile.open(fileobj=IterStream(chunks), mode="r|") as tar:
+        for member in tar:
+            if rename is not None and (member.name == root or member.name.startswith(root + "/")):
+                member.name = rename + member.name[len(root) :]
+            if hasattr(tarfile, "tar_filter"):
+                # The filter resolves each member's real path, so links cannot be written through
+                tar.extract(member, target_dir, filter="tar")
+                continue
+            parts = Path(member.name).parts
+            if Path(member.name).is_absolute() or ".." in parts:
+                raise ValueError(f"Refusing to extract {member.name} outside of {target_dir}")
+            # Without it, links out of target_dir are refused, as later members could be
+            # written through them. Symlink targets are relative to the link, hard link
+            # targets to the archive root.
+            if member.issym():
+                link_target: Optional[str] = posixpath.join(
+                    posixpath.dirname(member.name), member.linkname
+                )
+            else:
+                link_target = member.linkname if member.islnk() else None
+            if link_target is not None and (
+                posixpath.isabs(link_target)
+                or posixpath.normpath(link_target).split("/")[0] == ".."
+            ):
+                raise ValueError(f"Refusing to link {member.name} to {member.linkname}")
+            tar.extract(member, target_dir)
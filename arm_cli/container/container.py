@@ -1,10 +1,39 @@
 import subprocess
+import sys
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import click
 import docker
-import inquirer
 
+from arm_cli.container.archive import (
+    TRANSFER_TIMEOUT,
+    ByteCounter,
+    copy_from_container,
+    copy_to_container,
+    parse_container_path,
+)
+from arm_cli.container.endpoints import (
+    DEFAULT_ENDPOINT,
+    DEFAULT_ENDPOINT_TIMEOUT,
+    Endpoint,
+    EndpointResult,
+    connect,
+    endpoint_options,
+    query_endpoints,
+    resolve_endpoints,
+)
+from arm_cli.container.prefetch import ENTRYPOINTS, Prefetcher
 from arm_cli.settings import get_setting
+from arm_cli.utils.completion import (
+    complete_containers,
+    invalidate_completion_cache,
+    write_completion_cache,
+)
+from arm_cli.utils.picker import pick
 from arm_cli.utils.safe_subprocess import safe_run, sudo_run
 
 
@@ -15,64 +44,183 @@ def container():
     pass
 
 
-def get_running_containers():
-    """Retrieve a list of running Docker containers"""
-    client = docker.from_env()
-    return client.containers.list(filters={"status": "running"})
+def list_endpoint_containers(
+    endpoints: List[Endpoint], timeout: float, all_states: bool = False
+) -> Tuple[List[Tuple[Endpoint, Dict[str, Any]]], List[EndpointResult]]:
+    """List containers on every endpoint concurrently.
+
+    Returns:
+        Tuple of (containers, failures) where containers pairs each container's
+        summary with its endpoint and failures holds the endpoints that did not answer.
+    """
+    results = query_endpoints(
+        endpoints,
+        lambda client: client.api.containers(all=all_states),
+        timeout,
+    )
+    containers = []
+    for result in results:
+        if result.error is None:
+            containers.extend((result.endpoint, summary) for summary in result.value)
+            if result.endpoint.name == DEFAULT_ENDPOINT and not all_states:
+                # Keep name completion current with every listing of the local daemon
+                write_completion_cache(
+                    "containers", [get_container_name(summary) for summary in result.value]
+                )
+    return containers, [result for result in results if result.error is not None]
+
+
+def get_container_name(summary: Dict[str, Any]) -> str:
+    """Get a container's name from its summary in a container listing."""
+    names = summary.get("Names") or [summary["Id"][:12]]
+    return names[0].lstrip("/")
+
+
+def report_unavailable_endpoints(failures: List[EndpointResult]) -> None:
+    for failure in failures:
+        print(
+            f"Warning: endpoint {failure.endpoint.name} unavailable: {failure.error}",
+            file=sys.stderr,
+        )
+
+
+def get_selected_endpoints(endpoints, all_endpoints) -> List[Endpoint]:
+    try:
+        return resolve_endpoints(endpoints, all_endpoints)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def select_endpoint_container(
+    endpoints: List[Endpoint],
+    timeout: float,
+    message: str,
+    all_states: bool = False,
+    name: Optional[str] = None,
+    prefetcher: Optional[Prefetcher] = None,
+) -> Optional[Tuple[Endpoint, Dict[str, Any]]]:
+    """Interactively select a container from all endpoints.
+
+    If a name is given, only containers with that name are offered and a single match
+    is selected without prompting. A prefetcher starts fetching the candidates while
+    the picker is open.
+    """
+    containers, failures = list_endpoint_containers(endpoints, timeout, all_states)
+    report_unavailable_endpoints(failures)
+    if name is not None:
+        containers = [c for c in containers if get_container_name(c[1]) == name]
+    if not containers:
+        print("No matching containers found." if name else "No running containers found.")
+        return None
+    if name is not None and len(containers) == 1:
+        return containers[0]
+
+    show_endpoint = len(endpoints) > 1
+    choices = []
+    for endpoint, summary in containers:
+        label = f"{get_container_name(summary)} ({summary['Id'][:12]})"
+        if show_endpoint:
+            label += f" @ {endpoint.name}"
+        choices.append((label, len(choices)))
+
+    on_highlight = None
+    if prefetcher is not None:
+        candidates = [(endpoint, summary["Id"]) for endpoint, summary in containers]
+        prefetcher.start(candidates)
+
+        def on_highlight(index: int) -> None:
+            prefetcher.start([candidates[index]])
+
+    selected = pick(message, choices, on_highlight=on_highlight)
+    if selected is None:
+        print("No container selected.")
+        return None
+    return containers[selected]
 
 
 @container.command("list")
+@endpoint_options
 @click.pass_context
-def list_containers(ctx):
-    """List all Docker containers"""
+def list_containers(ctx, endpoints, all_endpoints, endpoint_timeout):
+    """List running Docker containers, optionally across several Docker daemons"""
     config = ctx.obj["config"]  # noqa: F841 - config available for future use
-    containers = get_running_containers()
+    selected = get_selected_endpoints(endpoints, all_endpoints)
+    containers, failures = list_endpoint_containers(selected, endpoint_timeout)
 
-    if containers:
-        for container in containers:
-            print(f"{container.id[:12]}: {container.name}")
-    else:
+    if not containers:
         print("No running containers found.")
+    elif not endpoints and not all_endpoints:
+        for _, summary in containers:
+            print(f"{summary['Id'][:12]}: {get_container_name(summary)}")
+    else:
+        rows = [
+            (
+                endpoint.name,
+                summary["Id"][:12],
+                get_container_name(summary),
+                summary.get("Status", ""),
+            )
+            for endpoint, summary in containers
+        ]
+        headers = ("ENDPOINT", "CONTAINER ID", "NAME", "STATUS")
+        widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+        for row in [headers] + rows:
+            print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+    report_unavailable_endpoints(failures)
+
+    if failures and len(failures) == len(selected):
+        sys.exit(1)
+
+
+def get_attach_command(entrypoints: Optional[List[str]]) -> str:
+    """Build the shell command run by attach, sourcing the container's entrypoints.
+
+    Without resolved entrypoints, the container's shell checks for each one itself.
+    """
+    if entrypoints is None:
+        lines = [f"if [ -f {path} ]; then source {path}; fi" for path in ENTRYPOINTS]
+    else:
+        lines = [f"source {path}" for path in entrypoints]
+    return "\n".join(lines + ["exec bash"])
 
 
 @container.command("attach")
+@click.argument("name", required=False, shell_complete=complete_containers)
 @click.pass_context
-def attach_container(ctx):
-    """Interactively select a running Docker container and attach to it"""
+def attach_container(ctx, name):
+    """Attach to a running Docker container, selected interactively if NAME is omitted"""
     config = ctx.obj["config"]  # noqa: F841 - config available for future use
-    containers = get_running_containers()
-
-    if not containers:
-        print("No running containers found.")
-        return
-
-    container_choices = [
-        inquirer.List(
-            "container",
-            message="Select a container to attach to",
-            choices=[f"{container.name} ({container.id[:12]})" for container in containers],
-            carousel=True,
+    endpoint = Endpoint(DEFAULT_ENDPOINT)
+
+    with Prefetcher(
+        lambda e: connect(e, DEFAULT_ENDPOINT_TIMEOUT), resolve_exec=True
+    ) as prefetcher:
+        choice = select_endpoint_container(
+            [endpoint],
+            DEFAULT_ENDPOINT_TIMEOUT,
+            "Select a container to attach to",
+            name=name,
+            prefetcher=prefetcher,
         )
-    ]
-
-    answers = inquirer.prompt(container_choices)
-    if not answers:
-        print("No container selected.")
-        return
-
-    selected_container_name = answers["container"].split(" ")[0]  # Extract name
+        if choice is None:
+            if name is not None:
+                sys.exit(1)
+            return
+        _, summary = choice
+        selected_container_name = get_container_name(summary)
+        try:
+            prefetched = prefetcher.get(endpoint, summary["Id"])
+            entrypoints = prefetched.entrypoints
+        except docker.errors.NotFound:
+            print(f"Error: Container {selected_container_name} not found.")
+            return
+        except docker.errors.DockerException:
+            entrypoints = None
 
     print(f"Attaching to {selected_container_name}...")
 
-    cmd = """
-    if [ -f /ros_entrypoint.sh ]; then
-        source /ros_entrypoint.sh
-    fi
-    if [ -f /interactive_entrypoint.sh ]; then
-        source /interactive_entrypoint.sh
-    fi
-    exec bash
-    """
+    cmd = get_attach_command(entrypoints)
 
     try:
         safe_run(["docker", "exec", "-it", selected_container_name, "bash", "-c", cmd], check=True)
@@ -82,81 +230,199 @@ def attach_container(ctx):
         print("\nExiting interactive session...")
 
 
+def _run_container_action(endpoints, all_endpoints, endpoint_timeout, action: str) -> None:
+    """Select a running container on any endpoint and restart or stop it."""
+    selected = get_selected_endpoints(endpoints, all_endpoints)
+    with Prefetcher(lambda endpoint: connect(endpoint, endpoint_timeout)) as prefetcher:
+        choice = select_endpoint_container(
+            selected, endpoint_timeout, f"Select a container to {action}", prefetcher=prefetcher
+        )
+        if choice is None:
+            return
+        endpoint, summary = choice
+        name = get_container_name(summary)
+        location = f" on {endpoint.name}" if len(selected) > 1 else ""
+
+        print(f"{'Restarting' if action == 'restart' else 'Stopping'} {name}{location}...")
+
+        try:
+            client = prefetcher.get(endpoint, summary["Id"]).client
+            if action == "restart":
+                client.api.restart(summary["Id"])
+            else:
+                client.api.stop(summary["Id"])
+                invalidate_completion_cache("containers")
+            print(
+                f"Container {name} {'restarted' if action == 'restart' else 'stopped'} successfully."
+            )
+        except docker.errors.NotFound:
+            print(f"Error: Container {name} not found.")
+        except (docker.errors.DockerException, OSError) as e:
+            # Connecting raises DockerException, a dropped connection an OSError from requests
+            print(f"Error {'restarting' if action == 'restart' else 'stopping'} container: {e}")
+
+
 @container.command("restart")
+@endpoint_options
 @click.pass_context
-def restart_container(ctx):
+def restart_container(ctx, endpoints, all_endpoints, endpoint_timeout):
     """Interactively select a running Docker container and restart it"""
     config = ctx.obj["config"]  # noqa: F841 - config available for future use
-    containers = get_running_containers()
-
-    if not containers:
-        print("No running containers found.")
-        return
-
-    container_choices = [
-        inquirer.List(
-            "container",
-            message="Select a container to restart",
-            choices=[f"{container.name} ({container.id[:12]})" for container in containers],
-            carousel=True,
-        )
-    ]
-
-    answers = inquirer.prompt(container_choices)
-    if not answers:
-        print("No container selected.")
-        return
-
-    selected_container_name = answers["container"].split(" ")[0]
-
-    print(f"Restarting {selected_container_name}...")
-
-    try:
-        client = docker.from_env()
-        container = client.containers.get(selected_container_name)
-        container.restart()
-        print(f"Container {selected_container_name} restarted successfully.")
-    except docker.errors.NotFound:
-        print(f"Error: Container {selected_container_name} not found.")
-    except docker.errors.APIError as e:
-        print(f"Error restarting container: {e}")
+    _run_container_action(endpoints, all_endpoints, endpoint_timeout, "restart")
 
 
 @container.command("stop")
+@endpoint_options
 @click.pass_context
-def stop_container(ctx):
+def stop_container(ctx, endpoints, all_endpoints, endpoint_timeout):
     """Interactively select a running Docker container and stop it"""
     config = ctx.obj["config"]  # noqa: F841 - config available for future use
-    containers = get_running_containers()
+    _run_container_action(endpoints, all_endpoints, endpoint_timeout, "stop")
 
-    if not containers:
-        print("No running containers found.")
+
+@container.command("logs")
+@click.argument("name", required=False, shell_complete=complete_containers)
+@click.option("-f", "--follow", is_flag=True, help="Keep streaming new log output")
+@click.option("--tail", default=None, type=click.IntRange(min=0), help="Lines to show from the end")
+@endpoint_options
+@click.pass_context
+def container_logs(ctx, name, follow, tail, endpoints, all_endpoints, endpoint_timeout):
+    """Show the logs of a Docker container, selected interactively if NAME is omitted"""
+    config = ctx.obj["config"]  # noqa: F841 - config available for future use
+    selected = get_selected_endpoints(endpoints, all_endpoints)
+    choice = select_endpoint_container(
+        selected,
+        endpoint_timeout,
+        "Select a container to show logs for",
+        all_states=name is not None,
+        name=name,
+    )
+    if choice is None:
+        if name is not None:
+            sys.exit(1)
         return
+    endpoint, summary = choice
 
-    container_choices = [
-        inquirer.List(
-            "container",
-            message="Select a container to stop",
-            choices=[f"{container.name} ({container.id[:12]})" for container in containers],
-            carousel=True,
+    try:
+        # Following logs waits for output indefinitely, so only bound the connection
+        client = connect(endpoint, None if follow else endpoint_timeout)
+        stream = client.api.logs(
+            summary["Id"], stream=True, follow=follow, tail=tail if tail is not None else "all"
         )
-    ]
+        for chunk in stream:
+            sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+    except docker.errors.APIError as e:
+        print(f"Error reading logs: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
 
-    answers = inquirer.prompt(container_choices)
-    if not answers:
-        print("No container selected.")
-        return
 
-    selected_container_name = answers["container"].split(" ")[0]  # Extract name
+def _find_containers(
+    selected: List[Endpoint], endpoint_timeout: float, name: str
+) -> List[Tuple[Endpoint, Dict[str, Any]]]:
+    containers, failures = list_endpoint_containers(selected, endpoint_timeout, all_states=True)
+    report_unavailable_endpoints(failures)
+    return [c for c in containers if get_container_name(c[1]) == name]
 
-    print(f"Stopping {selected_container_name}...")
 
+def _copy(task) -> Tuple[str, int, float, Optional[str]]:
+    """Run one copy, returning (label, bytes, seconds, error)."""
+    label, endpoint, copy, container_id, source, dest = task
+    counter = ByteCounter()
+    start = time.monotonic()
     try:
-        client = docker.from_env()
-        container = client.containers.get(selected_container_name)
-        container.stop()
-        print(f"Container {selected_container_name} stopped successfully.")
-    except docker.errors.NotFound:
-        print(f"Error: Container {selected_container_name} not found.")
-    except docker.errors.APIError as e:
-        print(f"Error stopping container: {e}")
+        client = connect(endpoint, TRANSFER_TIMEOUT)
+        try:
+            copy(client, container_id, source, dest, counter)
+        finally:
+            client.close()
+    except (
+        docker.errors.DockerException,
+        OSError,
+        RuntimeError,
+        ValueError,
+        tarfile.TarError,
+    ) as e:
+        return label, counter.bytes, time.monotonic() - start, str(e)
+    return label, counter.bytes, time.monotonic() - start, None
+
+
+@container.command("cp")
+@click.argument("source")
+@click.argument("destinations", metavar="DEST...", nargs=-1, required=True)
+@click.option(
+    "-j",
+    "--jobs",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Containers to copy to at the same time",
+)
+@endpoint_options
+@click.pass_context
+def copy_files(ctx, source, destinations, jobs, endpoints, all_endpoints, endpoint_timeout):
+    """Copy files between the host and containers.
+
+    SOURCE and DEST are local paths or CONTAINER:PATH. Data is streamed through the
+    Docker Engine API without temporary files. Give several DEST containers (or select
+    several endpoints running the same container) to copy a local path to all of them.
+    """
+    config = ctx.obj["config"]  # noqa: F841 - config available for future use
+    selected = get_selected_endpoints(endpoints, all_endpoints)
+    show_endpoint = len(selected) > 1
+    container_source = parse_container_path(source)
+    container_dests = [parse_container_path(dest) for dest in destinations]
+
+    tasks = []
+    if container_source is not None:
+        if len(destinations) != 1 or container_dests[0] is not None:
+            print("Error: Copying out of a container needs exactly one local destination.")
+            sys.exit(1)
+        name, path = container_source
+        matches = _find_containers(selected, endpoint_timeout, name)
+        if len(matches) != 1:
+            found = ", ".join(endpoint.name for endpoint, _ in matches)
+            print(f"Error: Container {name} " + (f"found on {found}" if found else "not found"))
+            sys.exit(1)
+        endpoint, summary = matches[0]
+        dest = Path(destinations[0])
+        tasks.append((str(dest), endpoint, copy_from_container, summary["Id"], path, dest))
+    else:
+        local = Path(source)
+        if not local.exists():
+            print(f"Error: {source} does not exist")
+            sys.exit(1)
+        if any(dest is None for dest in container_dests):
+            print("Error: Use cp (not arm-cli) to copy between local paths.")
+            sys.exit(1)
+        for name, path in container_dests:
+            matches = _find_containers(selected, endpoint_timeout, name)
+            if not matches:
+                print(f"Error: Container {name} not found")
+                sys.exit(1)
+            for endpoint, summary in matches:
+                label = f"{name}:{path}" + (f" @ {endpoint.name}" if show_endpoint else "")
+                tasks.append((label, endpoint, copy_to_container, summary["Id"], local, path))
+
+    start = time.monotonic()
+    failed = False
+    total = 0
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for label, size, elapsed, error in executor.map(_copy, tasks):
+            total += size
+            if error is not None:
+                failed = True
+                print(f"{label}: failed: {error}")
+            else:
+                rate = size / 1e6 / max(elapsed, 1e-6)
+                print(f"{label}: {size / 1e6:.1f} MB in {elapsed:.1f}s ({rate:.1f} MB/s)")
+    elapsed = time.monotonic() - start
+    if len(tasks) > 1:
+        print(
+            f"Copied {total / 1e6:.1f} MB to {len(tasks)} containers in {elapsed:.1f}s "
+            f"({total / 1e6 / max(elapsed, 1e-6):.1f} MB/s)"
+        )
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import click
+import docker
+
+DEFAULT_ENDPOINT = "default"
+DEFAULT_ENDPOINT_TIMEOUT = 5.0
+
+_CONNECTION_ERRORS = {
+    "timed out": "timed out",
+    "Timeout": "timed out",
+    "Connection refused": "connection refused",
+    "No such file or directory": "socket not found",
+    "Permission denied": "permission denied",
+}
+
+
+class Endpoint(NamedTuple):
+    """A Docker daemon, named after its context or its host URL."""
+
+    name: str
+    host: Optional[str] = None
+    tls_dir: Optional[Path] = None
+    skip_tls_verify: bool = False
+
+
+class EndpointResult(NamedTuple):
+    """The outcome of running a query against one endpoint."""
+
+    endpoint: Endpoint
+    value: Any = None
+    error: Optional[str] = None
+
+
+def get_docker_config_dir() -> Path:
+    """Get the Docker CLI configuration directory (honors DOCKER_CONFIG)."""
+    return Path(os.environ.get("DOCKER_CONFIG", Path.home() / ".docker"))
+
+
+def get_docker_contexts() -> Dict[str, Endpoint]:
+    """Read the Docker contexts created with `docker context create`.
+
+    Each context lives in contexts/meta/<id>/meta.json, with its TLS material (if any)
+    in contexts/tls/<id>/docker.
+    """
+    contexts_dir = get_docker_config_dir() / "contexts"
+    contexts: Dict[str, Endpoint] = {}
+    for meta_file in sorted((contexts_dir / "meta").glob("*/meta.json")):
+        try:
+            with open(meta_file) as f:
+                meta = json.load(f)
+            name = meta["Name"]
+            docker_endpoint = meta["Endpoints"]["docker"]
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        tls_dir = contexts_dir / "tls" / meta_file.parent.name / "docker"
+        contexts[name] = Endpoint(
+            name=name,
+            host=docker_endpoint.get("Host"),
+            tls_dir=tls_dir if tls_dir.is_dir() else None,
+            skip_tls_verify=bool(docker_endpoint.get("SkipTLSVerify")),
+        )
+    return contexts
+
+
+def resolve_endpoints(names: Sequence[str], all_endpoints: bool) -> List[Endpoint]:
+    """Resolve --endpoint/--all-endpoints options to endpoints.
+
+    An endpoint is either a Docker context name, "default" for the daemon configured
+    by the environment, or a host URL such as unix:///var/run/docker.sock or
+    ssh://user@robot. Without options only the default endpoint is used.
+
+    Raises:
+        ValueError: If a name is neither a known context nor a host URL.
+    """
+    contexts = get_docker_contexts()
+    if all_endpoints:
+        endpoints = [Endpoint(DEFAULT_ENDPOINT)] + [
+            context for name, context in contexts.items() if name != DEFAULT_ENDPOINT
+        ]
+    elif not names:
+        return [Endpoint(DEFAULT_ENDPOINT)]
+    else:
+        endpoints = []
+        for name in names:
+            if name == DEFAULT_ENDPOINT:
+                endpoints.append(Endpoint(DEFAULT_ENDPOINT))
+            elif name in contexts:
+                endpoints.append(contexts[name])
+            elif "://" in name:
+                endpoints.append(Endpoint(name=name, host=name))
+            else:
+                known = ", ".join([DEFAULT_ENDPOINT] + sorted(contexts))
+                raise ValueError(f"Unknown endpoint '{name}' (known: {known})")
+
+    unique: Dict[str, Endpoint] = {}
+    for endpoint in endpoints:
+        unique.setdefault(endpoint.host or endpoint.name, endpoint)
+    return list(unique.values())
+
+
+def connect(endpoint: Endpoint, timeout: Optional[float]):
+    """Create a Docker client for an endpoint.
+
+    A timeout of None disables the read timeout, e.g. for following logs.
+    """
+    if endpoint.host is None:
+        return docker.from_env(timeout=timeout)
+    tls = None
+    if endpoint.tls_dir is not None:
+        ca_cert = endpoint.tls_dir / "ca.pem"
+        tls = docker.tls.TLSConfig(
+            client_cert=(str(endpoint.tls_dir / "cert.pem"), str(endpoint.tls_dir / "key.pem")),
+            ca_cert=str(ca_cert) if ca_cert.exists() and not endpoint.skip_tls_verify else None,
+            verify=not endpoint.skip_tls_verify,
+        )
+    return docker.DockerClient(
+        base_url=endpoint.host,
+        timeout=timeout,
+        tls=tls,
+        use_ssh_client=endpoint.host.startswith("ssh://"),
+    )
+
+
+def query_endpoints(
+    endpoints: List[Endpoint],
+    query: Callable[[Any], Any],
+    timeout: float = DEFAULT_ENDPOINT_TIMEOUT,
+) -> List[EndpointResult]:
+    """Run `query(client)` against every endpoint concurrently.
+
+    Each endpoint gets `timeout` seconds, used both as the client's socket timeout and
+    as a deadline for the whole query, so an unreachable daemon (or an ssh connection
+    that hangs while connecting) only costs that endpoint its result. Queries still
+    running at the deadline are abandoned on daemon threads.
+
+    Returns:
+        One result per endpoint, in the order of `endpoints`.
+    """
+    results: List[Optional[EndpointResult]] = [None] * len(endpoints)
+
+    def run(index: int, endpoint: Endpoint) -> None:
+        try:
+            client = connect(endpoint, timeout)
+            try:
+                results[index] = EndpointResult(endpoint, value=query(client))
+            finally:
+                client.close()
+        except Exception as e:
+            results[index] = EndpointResult(endpoint, error=_describe_error(e))
+
+    threads = []
+    for index, endpoint in enumerate(endpoints):
+        thread = threading.Thread(target=run, args=(index, endpoint), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    return [
+        result or EndpointResult(endpoint, error=f"timed out after {timeout:g}s")
+        for endpoint, result in zip(endpoints, results)
+    ]
+
+
+def _describe_error(error: Exception) -> str:
+    """Shorten the nested connection errors raised by docker/requests to one line."""
+    message = str(error) or type(error).__name__
+    for hint, description in _CONNECTION_ERRORS.items():
+        if hint in message:
+            return description
+    return message.splitlines()[0]
+
+
+def endpoint_options(func):
+    """Add --endpoint, --all-endpoints and --endpoint-timeout to a command."""
+    func = click.option(
+        "--endpoint-timeout",
+        default=DEFAULT_ENDPOINT_TIMEOUT,
+        show_default=True,
+        type=click.FloatRange(min=0.1),
+        help="Seconds to wait for each endpoint",
+    )(func)
+    func = click.option(
+        "--all-endpoints",
+        is_flag=True,
+        help="Use the default daemon and every Docker context",
+    )(func)
+    func = click.option(
+        "--endpoint",
+        "endpoints",
+        multiple=True,
+        help="Docker context name or host URL (repeatable, default: local daemon)",
+    )(func)
+    return func
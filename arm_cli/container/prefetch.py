@@ -0,0 +1,114 @@
+"""Speculative prefetching of container details while an interactive picker is open.
+
+Selecting a container takes the user seconds, during which the Docker connection and
+everything an action needs about the likely choices can already be fetched. Once a
+choice is made, the action starts from the prefetched state instead of connecting and
+inspecting after the fact.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from arm_cli.container.archive import stat_container_path
+from arm_cli.container.endpoints import Endpoint
+
+# Scripts sourced by `container attach` when they exist in the container
+ENTRYPOINTS = ("/ros_entrypoint.sh", "/interactive_entrypoint.sh")
+
+# Candidates prefetched when the picker opens; highlighted ones are added as they come
+MAX_PREFETCH = 8
+
+
+class PrefetchedContainer(NamedTuple):
+    """What an action needs to start on a container right away."""
+
+    client: Any
+    attrs: Dict[str, Any]
+    entrypoints: Optional[List[str]] = None
+
+
+class Prefetcher:
+    """Fetch clients, inspect data and (optionally) exec environments in the background.
+
+    Use as a context manager around the picker: start() is called with the candidates
+    once they are known and get() returns the prefetched state of the chosen one,
+    waiting for it if it is still in flight or fetching it if it was not a candidate.
+    """
+
+    def __init__(
+        self,
+        connect_endpoint: Callable[[Endpoint], Any],
+        resolve_exec: bool = False,
+        max_workers: int = 4,
+    ):
+        self._connect_endpoint = connect_endpoint
+        self._resolve_exec = resolve_exec
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._clients: Dict[Endpoint, Future] = {}
+        self._containers: Dict[Tuple[Endpoint, str], Future] = {}
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self, candidates: List[Tuple[Endpoint, str]]) -> None:
+        """Begin prefetching candidates, given as (endpoint, container id), in order."""
+        for endpoint, container_id in candidates[:MAX_PREFETCH]:
+            self._submit(endpoint, container_id)
+
+    def get(self, endpoint: Endpoint, container_id: str) -> PrefetchedContainer:
+        """Get the prefetched state of a container, fetching it now if needed.
+
+        Raises:
+            Whatever connecting to the endpoint or inspecting the container raised.
+        """
+        future = self._submit(endpoint, container_id)
+        if future.cancel():
+            # Still queued behind other candidates: fetch it right away instead
+            return self._fetch(endpoint, container_id)
+        return future.result()
+
+    def close(self) -> None:
+        """Stop prefetching; fetches that already started finish in the background."""
+        with self._lock:
+            for future in self._containers.values():
+                future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, endpoint: Endpoint, container_id: str) -> Future:
+        with self._lock:
+            key = (endpoint, container_id)
+            if key not in self._containers:
+                self._containers[key] = self._executor.submit(self._fetch, endpoint, container_id)
+            return self._containers[key]
+
+    def _get_client(self, endpoint: Endpoint) -> Any:
+        """Connect once per endpoint; every candidate on it shares the warm connection."""
+        with self._lock:
+            future = self._clients.get(endpoint)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._clients[endpoint] = future
+        if owner:
+            try:
+                future.set_result(self._connect_endpoint(endpoint))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _fetch(self, endpoint: Endpoint, container_id: str) -> PrefetchedContainer:
+        client = self._get_client(endpoint)
+        attrs = client.api.inspect_container(container_id)
+        entrypoints = None
+        if self._resolve_exec:
+            entrypoints = [
+                path
+                for path in ENTRYPOINTS
+                if stat_container_path(client, container_id, path) is not None
+            ]
+        return PrefetchedContainer(client, attrs, entrypoints)
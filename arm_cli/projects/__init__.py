@@ -1,3 +1,3 @@
 # Projects module for ARM CLI
 
-from . import activate, info, init, list, remove
+from . import activate, bundle, delta, foreach, info, init, list, pull, remove, rollout
@@ -1,7 +1,6 @@
 from typing import Optional
 
 import click
-import inquirer
 
 from arm_cli.config import (
     activate_project,
@@ -10,11 +9,13 @@ from arm_cli.config import (
     print_available_projects,
     print_no_projects_message,
 )
-from arm_cli.settings import get_setting
+from arm_cli.projects.project_index import is_ambiguous, search_projects
+from arm_cli.utils.completion import complete_projects
+from arm_cli.utils.picker import pick
 
 
 def _activate(ctx, project: Optional[str] = None):
-    """Activate a project from available projects"""
+    """Activate a project by path, name or a partial match of its name, path or description"""
     config = ctx.obj["config"]
 
     # If no project specified, show interactive list
@@ -35,40 +36,38 @@ def _activate(ctx, project: Optional[str] = None):
                 print_no_projects_message()
             return
 
-        # Create choices for inquirer
+        # Create choices for the picker
         choices = []
         for proj in available_projects:
             active_indicator = " *" if proj.path == config.active_project else ""
-            choices.append(f"{proj.name}{active_indicator}")
-
-        # Create the question
-        questions = [
-            inquirer.List(
-                "project",
-                message="Select a project to activate",
-                choices=choices,
-                carousel=True,
-            )
-        ]
+            choices.append((f"{proj.name}{active_indicator}", proj.name))
 
         try:
-            answers = inquirer.prompt(questions)
-            if answers is None:
+            project = pick("Select a project to activate", choices)
+            if project is None:
                 print("Cancelled.")
                 return
 
-            # Extract project name (remove the active indicator if present)
-            selected_choice = answers["project"]
-            project = selected_choice.replace(" *", "")
-            if project is None:
-                raise RuntimeError("Project name cannot be None")
-
         except KeyboardInterrupt:
             print("\nCancelled.")
             return
 
-    # Try to activate the project
+    # Try to activate the project, falling back to a fuzzy search
     project_config = activate_project(config, project)
+    if project_config is None:
+        matches = search_projects(config, project)
+        path = matches[0].path if matches else None
+        if is_ambiguous(matches):
+            choices = [(f"{match.name} ({match.path})", match.path) for match in matches]
+            try:
+                path = pick(f"Several projects match '{project}'", choices)
+            except KeyboardInterrupt:
+                path = None
+            if path is None:
+                print("Cancelled.")
+                return
+        if path is not None:
+            project_config = activate_project(config, path)
 
     if project_config:
         print(f"Activated project: {project_config.name}")
@@ -83,5 +82,7 @@ def _activate(ctx, project: Optional[str] = None):
 
 # Create the command object
 activate = click.command(name="activate")(
-    click.argument("project", required=False)(click.pass_context(_activate))
+    click.argument("project", required=False, shell_complete=complete_projects)(
+        click.pass_context(_activate)
+    )
 )
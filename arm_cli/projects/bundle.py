@@ -0,0 +1,307 @@
+import hashlib
+import io
+import json
+import sys
+import tarfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import click
+import docker
+
+from arm_cli.config import get_active_project_config
+from arm_cli.projects.delta import DeltaWriter, index_base
+from arm_cli.utils.compose import get_compose_file, get_compose_images
+from arm_cli.utils.streams import (
+    IterStream,
+    get_default_compression,
+    iter_tar_stream,
+    open_compressed_reader,
+    open_compressed_writer,
+)
+
+# Name of the arm-cli metadata entry written at the end of every bundle
+BUNDLE_METADATA = "arm-cli-bundle.json"
+BUNDLE_VERSION = 1
+
+# Entries of a single `docker save` stream that are merged across images instead of copied.
+# Newer daemons save OCI layouts, whose index.json and oci-layout are merged alongside
+# the legacy manifest.json and repositories.
+MERGED_ENTRIES = ("manifest.json", "repositories", "index.json", "oci-layout")
+
+
+def get_chain_ids(diff_ids: List[str]) -> List[str]:
+    """Compute the layer chain ids for an ordered list of layer diff ids.
+
+    The daemon identifies a layer by its chain id (the layer plus everything below it),
+    so this is what decides whether a layer is already present on a target.
+    """
+    chain_ids: List[str] = []
+    for diff_id in diff_ids:
+        if not chain_ids:
+            chain_ids.append(diff_id)
+        else:
+            digest = hashlib.sha256(f"{chain_ids[-1]} {diff_id}".encode()).hexdigest()
+            chain_ids.append(f"sha256:{digest}")
+    return chain_ids
+
+
+def _add_json_entry(tar: tarfile.TarFile, name: str, data: Any) -> None:
+    """Add a JSON document as a regular file entry of a streaming tar."""
+    payload = json.dumps(data, indent=2).encode()
+    info = tarfile.TarInfo(name)
+    info.size = len(payload)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(payload))
+
+
+def write_bundle(client, images: List[str], out, compression: str) -> Dict[str, int]:
+    """Stream the given images into a compressed, deduplicated bundle.
+
+    Each image is read straight from the daemon's export stream and its entries are
+    copied into the bundle, which is itself a valid `docker load` archive. Layer blobs
+    are addressed by digest, so a layer shared by several images is stored once.
+
+    Returns:
+        Statistics with the number of layer bytes written and deduplicated.
+    """
+    stats = {"images": 0, "written_bytes": 0, "deduplicated_bytes": 0}
+    written: Set[str] = set()
+    manifests: List[Dict[str, Any]] = []
+    repositories: Dict[str, Dict[str, str]] = {}
+    oci_index: Optional[Dict[str, Any]] = None
+    oci_layout: Optional[Dict[str, Any]] = None
+    metadata: Dict[str, Any] = {"version": BUNDLE_VERSION, "images": []}
+
+    compressed = open_compressed_writer(out, compression)
+    with tarfile.open(fileobj=compressed, mode="w|", format=tarfile.PAX_FORMAT) as bundle_tar:
+        for image in images:
+            image_manifests: List[Dict[str, Any]] = []
+            source = io.BufferedReader(IterStream(client.api.get_image(image)))
+            with tarfile.open(fileobj=source, mode="r|") as image_tar:
+                for member in image_tar:
+                    if member.name in MERGED_ENTRIES:
+                        data = image_tar.extractfile(member)
+                        if member.name == "manifest.json" and data is not None:
+                            image_manifests = json.load(data)
+                        elif member.name == "repositories" and data is not None:
+                            for repo, tags in json.load(data).items():
+                                repositories.setdefault(repo, {}).update(tags)
+                        elif member.name == "index.json" and data is not None:
+                            index = json.load(data)
+                            if oci_index is None:
+                                oci_index = {**index, "manifests": []}
+                            for descriptor in index.get("manifests") or []:
+                                if descriptor not in oci_index["manifests"]:
+                                    oci_index["manifests"].append(descriptor)
+                        elif member.name == "oci-layout" and data is not None:
+                            oci_layout = json.load(data)
+                        continue
+                    if member.name in written:
+                        stats["deduplicated_bytes"] += member.size
+                        continue
+                    written.add(member.name)
+                    stats["written_bytes"] += member.size
+                    data = image_tar.extractfile(member) if member.isreg() else None
+                    bundle_tar.addfile(member, data)
+
+            diff_ids = client.images.get(image).attrs["RootFS"]["Layers"]
+            for manifest in image_manifests:
+                manifests.append(manifest)
+                metadata["images"].append(
+                    {
+                        "ref": image,
+                        "repo_tags": manifest.get("RepoTags") or [],
+                        "layers": manifest["Layers"],
+                        "diff_ids": diff_ids,
+                    }
+                )
+            stats["images"] += 1
+
+        # Metadata goes last since it is only complete once every image was streamed
+        _add_json_entry(bundle_tar, "manifest.json", manifests)
+        if repositories:
+            _add_json_entry(bundle_tar, "repositories", repositories)
+        if oci_layout is not None:
+            _add_json_entry(bundle_tar, "oci-layout", oci_layout)
+        if oci_index is not None:
+            _add_json_entry(bundle_tar, "index.json", oci_index)
+        _add_json_entry(bundle_tar, BUNDLE_METADATA, metadata)
+    compressed.close()
+    return stats
+
+
+def read_bundle_metadata(bundle_path: Path) -> Dict[str, Any]:
+    """Read the arm-cli metadata entry from a bundle file."""
+    with open(bundle_path, "rb") as f:
+        with tarfile.open(fileobj=open_compressed_reader(f), mode="r|") as bundle_tar:
+            for member in bundle_tar:
+                if member.name == BUNDLE_METADATA:
+                    data = bundle_tar.extractfile(member)
+                    if data is not None:
+                        return json.load(data)
+    raise ValueError(f"{bundle_path} is not an arm-cli bundle (missing {BUNDLE_METADATA})")
+
+
+def get_local_chain_ids(client) -> Set[str]:
+    """Get the chain ids of every layer already present in the local image store."""
+    chain_ids: Set[str] = set()
+    for image in client.images.list(all=True):
+        chain_ids.update(get_chain_ids(image.attrs.get("RootFS", {}).get("Layers", [])))
+    return chain_ids
+
+
+def get_missing_layer_paths(metadata: Dict[str, Any], local_chain_ids: Set[str]) -> Set[str]:
+    """Get the bundle paths of the layers at least one image needs but the target lacks."""
+    missing: Set[str] = set()
+    for image in metadata["images"]:
+        chain_ids = get_chain_ids(image["diff_ids"])
+        for path, chain_id in zip(image["layers"], chain_ids):
+            if chain_id not in local_chain_ids:
+                missing.add(path)
+    return missing
+
+
+def load_bundle(client, bundle_path: Path) -> Tuple[int, int]:
+    """Load a bundle into the local daemon, skipping layers the daemon already has.
+
+    The bundle is read twice: once to get its metadata and once to stream the entries
+    to the daemon. Layer entries already present on the target are dropped from the
+    second stream, so only missing layers are transferred and imported.
+
+    Returns:
+        Tuple of (number of layers loaded, number of layers skipped).
+    """
+    metadata = read_bundle_metadata(bundle_path)
+    all_layers = {path for image in metadata["images"] for path in image["layers"]}
+    missing = get_missing_layer_paths(metadata, get_local_chain_ids(client))
+    skipped = all_layers - missing
+
+    def keep(member: tarfile.TarInfo) -> bool:
+        return member.name not in skipped and member.name != BUNDLE_METADATA
+
+    with open(bundle_path, "rb") as f:
+        with tarfile.open(fileobj=open_compressed_reader(f), mode="r|") as bundle_tar:
+            for event in client.api.load_image(iter_tar_stream(bundle_tar, keep)):
+                if "error" in event:
+                    raise RuntimeError(event["error"])
+                if event.get("stream"):
+                    print(event["stream"].strip())
+
+    return len(missing), len(skipped)
+
+
+def _get_project_images(ctx) -> Tuple[str, List[str]]:
+    """Get the active project's name and the images used by its compose file."""
+    config = ctx.obj["config"]
+
+    project_config = get_active_project_config(config)
+    if not project_config:
+        print("No active project configured.")
+        sys.exit(1)
+
+    compose_file = get_compose_file(project_config)
+    if compose_file is None or not compose_file.exists():
+        print(f"Docker compose file not found for project '{project_config.name}'")
+        sys.exit(1)
+
+    try:
+        images = get_compose_images(compose_file)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    return project_config.name, images
+
+
+def _write_bundle_or_delta(
+    client, images: List[str], out, compression: str, base: Optional[str]
+) -> Dict[str, int]:
+    """Write a full bundle, or a delta against the base bundle if one is given."""
+    if base is None:
+        return write_bundle(client, images, out, compression)
+
+    click.echo(f"Indexing base bundle {base}...", err=True)
+    base_index, base_digest = index_base(Path(base))
+    writer = DeltaWriter(base_index, base_digest, out, compression, compression)
+    # The delta is computed over the uncompressed bundle and compressed as a whole
+    stats = write_bundle(client, images, writer, "none")
+    writer.close()
+    stats.update(writer.stats)
+    return stats
+
+
+def _bundle(ctx, output: str, compression: str, base: Optional[str]):
+    """Export the active project's images into an offline deployment bundle"""
+    project_name, images = _get_project_images(ctx)
+    if not images:
+        print(f"No images found for project '{project_name}'")
+        return
+
+    if compression == "auto":
+        compression = get_default_compression()
+
+    client = docker.from_env()
+    start = time.monotonic()
+    # Progress goes to stderr so the bundle itself can be streamed to stdout
+    click.echo(f"Bundling {len(images)} images for '{project_name}' ({compression})...", err=True)
+    try:
+        if output == "-":
+            stats = _write_bundle_or_delta(client, images, sys.stdout.buffer, compression, base)
+        else:
+            with open(output, "wb") as f:
+                stats = _write_bundle_or_delta(client, images, f, compression, base)
+    except (docker.errors.APIError, RuntimeError, ValueError) as e:
+        click.echo(f"Error creating bundle: {e}", err=True)
+        sys.exit(1)
+
+    elapsed = time.monotonic() - start
+    click.echo(
+        f"Bundled {stats['images']} images: {stats['written_bytes'] / 1e6:.1f} MB stored, "
+        f"{stats['deduplicated_bytes'] / 1e6:.1f} MB of shared layers deduplicated "
+        f"in {elapsed:.1f}s",
+        err=True,
+    )
+    if base is not None:
+        click.echo(
+            f"Delta against {base}: {stats['copied_bytes'] / 1e6:.1f} MB reused, "
+            f"{stats['literal_bytes'] / 1e6:.1f} MB new data",
+            err=True,
+        )
+
+
+def _unbundle(ctx, bundle_path: str):
+    """Load an offline deployment bundle, importing only missing layers"""
+    client = docker.from_env()
+    try:
+        loaded, skipped = load_bundle(client, Path(bundle_path))
+    except (docker.errors.APIError, RuntimeError, ValueError) as e:
+        print(f"Error loading bundle: {e}")
+        sys.exit(1)
+    print(f"Loaded {loaded} layers ({skipped} already present on this machine).")
+
+
+# Create the command objects
+bundle = click.command(name="bundle")(
+    click.option("-o", "--output", required=True, help="Bundle file to write, or '-' for stdout")(
+        click.option(
+            "--compression",
+            type=click.Choice(["auto", "zstd", "gzip", "none"]),
+            default="auto",
+            show_default=True,
+            help="Compression codec (auto uses zstd when the zstandard package is installed)",
+        )(
+            click.option(
+                "--base",
+                type=click.Path(exists=True, dir_okay=False),
+                help="Previous bundle; write a delta against it instead of a full bundle",
+            )(click.pass_context(_bundle))
+        )
+    )
+)
+
+unbundle = click.command(name="unbundle")(
+    click.argument("bundle_path", type=click.Path(exists=True, dir_okay=False))(
+        click.pass_context(_unbundle)
+    )
+)
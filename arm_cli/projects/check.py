@@ -0,0 +1,141 @@
+"""Health checks for every registered project.
+
+Checking a project stats its config file, parses it and stats the project directory and
+compose file it points to. Projects are checked concurrently, and parse results are
+cached next to global_context.json keyed by the mtime and size of the config file and
+every config it extends, so a repeated check of an unchanged registry only stats files.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from arm_cli.config import (
+    AvailableProject,
+    get_config_dir,
+    get_config_file,
+    load_project_config,
+    resolved_config_batch,
+)
+from arm_cli.utils.compose import get_compose_file
+
+# Config missing or unreadable: the registry entry is dead and can be pruned
+STATUS_DEAD = "dead"
+# Config fine, but its project directory or compose file is missing
+STATUS_BROKEN = "broken"
+STATUS_OK = "ok"
+
+CHECK_WORKERS = 8
+
+
+class ProjectHealth(NamedTuple):
+    """Result of checking one registered project."""
+
+    name: str
+    path: str
+    status: str
+    problems: List[str]
+
+
+def get_check_cache_file() -> Path:
+    """Get the path of the check cache, next to the global context file."""
+    config_file = get_config_file()
+    return config_file.with_name(config_file.stem + ".check.json")
+
+
+def _load_cache(cache_file: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_file: Path, cache: Dict[str, Dict[str, Any]]) -> None:
+    tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
+
+def _get_stat_key(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _parse_project(config_path: Path) -> Dict[str, Any]:
+    """Parse a project config into what the health check needs from it."""
+    try:
+        project_config = load_project_config(str(config_path))
+        project_directory = project_config.get_resolved_project_directory(config_path)
+        compose_file = get_compose_file(project_config)
+    except (OSError, ValueError) as e:
+        # pydantic's ValidationError and json's JSONDecodeError are ValueErrors
+        return {"error": f"config unreadable: {str(e).splitlines()[0]}"}
+    return {
+        "parents": [[str(path), _get_stat_key(path)] for path in project_config._config_chain[1:]],
+        "project_directory": project_directory,
+        "compose_file": None if compose_file is None else str(compose_file),
+    }
+
+
+def _check_project(
+    project: AvailableProject, cached: Optional[Dict[str, Any]]
+) -> Tuple[ProjectHealth, Optional[Dict[str, Any]]]:
+    config_path = Path(project.path)
+    if not config_path.is_absolute():
+        config_path = get_config_dir() / config_path
+    key = _get_stat_key(config_path)
+    if key is None:
+        return ProjectHealth(project.name, project.path, STATUS_DEAD, ["config missing"]), None
+
+    if (
+        cached is None
+        or cached.get("key") != key
+        or any(_get_stat_key(Path(path)) != stat for path, stat in cached.get("parents", []))
+    ):
+        cached = {"key": key, **_parse_project(config_path)}
+    if cached.get("error"):
+        # Not cached: the error may be in a parent config, which the key does not cover
+        return ProjectHealth(project.name, project.path, STATUS_DEAD, [cached["error"]]), None
+
+    problems = []
+    project_directory = cached.get("project_directory")
+    if project_directory and not os.path.isdir(project_directory):
+        problems.append(f"project directory missing: {project_directory}")
+    compose_file = cached.get("compose_file")
+    if compose_file and not os.path.isfile(compose_file):
+        problems.append(f"compose file missing: {compose_file}")
+    status = STATUS_BROKEN if problems else STATUS_OK
+    return ProjectHealth(project.name, project.path, status, problems), cached
+
+
+def check_projects(
+    projects: List[AvailableProject], max_workers: int = CHECK_WORKERS
+) -> List[ProjectHealth]:
+    """Check every project concurrently, in the order given."""
+    cache_file = get_check_cache_file()
+    cache = _load_cache(cache_file)
+    # Configs that extend others are resolved with one write of their cache for the batch
+    with resolved_config_batch(), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(lambda project: _check_project(project, cache.get(project.path)), projects)
+        )
+
+    new_cache = {
+        project.path: cached
+        for project, (_, cached) in zip(projects, results)
+        if cached is not None
+    }
+    if new_cache != cache:
+        _save_cache(cache_file, new_cache)
+    return [health for health, _ in results]
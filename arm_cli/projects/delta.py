@@ -0,0 +1,317 @@
+"""Delta artifacts between two versions of a project bundle.
+
+A delta is computed over the uncompressed bundle streams. Both the previous (base)
+bundle and the new bundle are split with content-defined chunking, so an edit inside a
+layer only changes the chunks around it instead of shifting every following block.
+Chunks already present in the base are referenced by offset; everything else is sent
+as literal data.
+"""
+
+import hashlib
+import json
+import random
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import click
+
+from arm_cli.utils.streams import CHUNK_SIZE, open_compressed_reader, open_compressed_writer
+
+DELTA_MAGIC = b"ARMDELTA\x01"
+
+# Content-defined chunk sizes (bytes)
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+# A chunk ends after a run of ANCHOR_BITS bytes that all map to 1 in the bit table,
+# which happens on average every 2**(ANCHOR_BITS + 1) bytes of random data (~64 KiB)
+ANCHOR_BITS = 15
+
+# Byte -> bit table from a fixed seed so both sides of a delta chunk identically
+_bits = [1] * 128 + [0] * 128
+random.Random(0x41524D).shuffle(_bits)
+_BIT_TABLE = bytes(_bits)
+_ANCHOR = b"\x01" * ANCHOR_BITS
+
+# Delta record types
+OP_HEADER = b"H"
+OP_COPY = b"C"
+OP_DATA = b"D"
+OP_END = b"E"
+
+
+def find_cut_point(data: Union[bytes, bytearray], start: int, end: int) -> int:
+    """Find the end of the next content-defined chunk in data[start:end].
+
+    Every byte is mapped to a single bit and a chunk is cut after the first run of
+    ANCHOR_BITS set bits past MIN_CHUNK. The cut only depends on the last ANCHOR_BITS
+    bytes, so chunk boundaries resynchronize right after an insertion or deletion.
+    Using translate() and find() keeps the scan in C rather than a per-byte loop.
+    """
+    size = end - start
+    if size <= MIN_CHUNK:
+        return end
+    limit = start + min(size, MAX_CHUNK)
+    # Let the anchor start before MIN_CHUNK so that a cut exactly at MIN_CHUNK is possible
+    window_start = start + MIN_CHUNK - ANCHOR_BITS
+    found = data[window_start:limit].translate(_BIT_TABLE).find(_ANCHOR)
+    if found < 0:
+        return limit
+    return window_start + found + ANCHOR_BITS
+
+
+def iter_chunks(stream, read_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Split a readable binary stream into content-defined chunks."""
+    buffer = b""
+    eof = False
+    while True:
+        while not eof and len(buffer) < MAX_CHUNK:
+            data = stream.read(read_size)
+            if not data:
+                eof = True
+            buffer += data
+        if not buffer:
+            return
+        pos = 0
+        # Only cut while a full MAX_CHUNK is buffered, so chunk boundaries do not depend
+        # on how the stream happened to be read
+        while len(buffer) - pos >= MAX_CHUNK or (eof and pos < len(buffer)):
+            cut = find_cut_point(buffer, pos, len(buffer))
+            yield buffer[pos:cut]
+            pos = cut
+        buffer = buffer[pos:]
+
+
+def index_base(base_path: Path) -> Tuple[Dict[bytes, Tuple[int, int]], str]:
+    """Chunk a base bundle and index its chunks by digest.
+
+    Returns:
+        Tuple of ({chunk digest: (offset, length)}, sha256 of the uncompressed base).
+    """
+    index: Dict[bytes, Tuple[int, int]] = {}
+    base_digest = hashlib.sha256()
+    offset = 0
+    with open(base_path, "rb") as f:
+        for chunk in iter_chunks(open_compressed_reader(f)):
+            base_digest.update(chunk)
+            index.setdefault(hashlib.sha256(chunk).digest(), (offset, len(chunk)))
+            offset += len(chunk)
+    return index, base_digest.hexdigest()
+
+
+def _write_json_record(out, op: bytes, data: Dict[str, Any]) -> None:
+    payload = json.dumps(data).encode()
+    out.write(op + struct.pack(">I", len(payload)) + payload)
+
+
+class DeltaWriter:
+    """Writable sink that encodes everything written to it as a delta against a base.
+
+    A new bundle is streamed into this writer exactly as it would be into a file;
+    close() finishes the delta with the digest of the reconstructed bundle.
+    """
+
+    def __init__(
+        self,
+        base_index: Dict[bytes, Tuple[int, int]],
+        base_digest: str,
+        out,
+        compression: str,
+        target_compression: str,
+    ):
+        self.base_index = base_index
+        self.stats = {"copied_bytes": 0, "literal_bytes": 0}
+        self._out = open_compressed_writer(out, compression)
+        self._buffer = bytearray()
+        self._target_digest = hashlib.sha256()
+        self._target_size = 0
+        self._pending_copy: Optional[List[int]] = None
+        self._pending_data: List[bytes] = []
+        self._pending_data_size = 0
+        self._out.write(DELTA_MAGIC)
+        _write_json_record(
+            self._out,
+            OP_HEADER,
+            {"base_sha256": base_digest, "target_compression": target_compression},
+        )
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        # Keep at least one MAX_CHUNK buffered so cut points match iter_chunks
+        if len(self._buffer) >= 2 * MAX_CHUNK:
+            pos = 0
+            while len(self._buffer) - pos >= MAX_CHUNK:
+                cut = find_cut_point(self._buffer, pos, len(self._buffer))
+                self._add_chunk(bytes(self._buffer[pos:cut]))
+                pos = cut
+            del self._buffer[:pos]
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def _add_chunk(self, chunk: bytes) -> None:
+        self._target_digest.update(chunk)
+        self._target_size += len(chunk)
+        match = self.base_index.get(hashlib.sha256(chunk).digest())
+        if match is None:
+            self._flush_copy()
+            self._pending_data.append(chunk)
+            self._pending_data_size += len(chunk)
+            self.stats["literal_bytes"] += len(chunk)
+            # Bound memory when a whole new layer is sent as literal data
+            if self._pending_data_size >= CHUNK_SIZE * 4:
+                self._flush_data()
+            return
+
+        self._flush_data()
+        offset, length = match
+        self.stats["copied_bytes"] += length
+        # Merge references to consecutive base regions into one copy record
+        if self._pending_copy and self._pending_copy[0] + self._pending_copy[1] == offset:
+            self._pending_copy[1] += length
+        else:
+            self._flush_copy()
+            self._pending_copy = [offset, length]
+
+    def _flush_copy(self) -> None:
+        if self._pending_copy:
+            self._out.write(OP_COPY + struct.pack(">QQ", *self._pending_copy))
+            self._pending_copy = None
+
+    def _flush_data(self) -> None:
+        if self._pending_data:
+            data = b"".join(self._pending_data)
+            self._out.write(OP_DATA + struct.pack(">I", len(data)) + data)
+            self._pending_data = []
+            self._pending_data_size = 0
+
+    def close(self) -> None:
+        pos = 0
+        while pos < len(self._buffer):
+            cut = find_cut_point(self._buffer, pos, len(self._buffer))
+            self._add_chunk(bytes(self._buffer[pos:cut]))
+            pos = cut
+        self._buffer = bytearray()
+        self._flush_copy()
+        self._flush_data()
+        _write_json_record(
+            self._out,
+            OP_END,
+            {"target_sha256": self._target_digest.hexdigest(), "target_size": self._target_size},
+        )
+        self._out.close()
+
+
+def _read_exact(stream, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        block = stream.read(size - len(data))
+        if not block:
+            raise ValueError("Delta is truncated")
+        data += block
+    return data
+
+
+def _read_json_record(stream) -> Dict[str, Any]:
+    (length,) = struct.unpack(">I", _read_exact(stream, 4))
+    return json.loads(_read_exact(stream, length))
+
+
+def apply_delta(base_path: Path, delta_path: Path, out) -> Dict[str, Any]:
+    """Rebuild the full bundle described by a delta and write it to out.
+
+    The base bundle is decompressed into a temporary file for random access. Both the
+    base and the rebuilt bundle are verified against the digests recorded in the delta.
+
+    Returns:
+        Statistics with the rebuilt size and the compression used for it.
+    """
+    with open(delta_path, "rb") as delta_file:
+        delta = open_compressed_reader(delta_file)
+        if _read_exact(delta, len(DELTA_MAGIC)) != DELTA_MAGIC:
+            raise ValueError(f"{delta_path} is not an arm-cli bundle delta")
+        if _read_exact(delta, 1) != OP_HEADER:
+            raise ValueError("Delta is missing its header")
+        header = _read_json_record(delta)
+
+        with tempfile.TemporaryFile() as base, open(base_path, "rb") as base_file:
+            base_digest = hashlib.sha256()
+            reader = open_compressed_reader(base_file)
+            while True:
+                block = reader.read(CHUNK_SIZE)
+                if not block:
+                    break
+                base_digest.update(block)
+                base.write(block)
+            if base_digest.hexdigest() != header["base_sha256"]:
+                raise ValueError(f"{base_path} is not the base bundle this delta was made from")
+
+            target_digest = hashlib.sha256()
+            target_size = 0
+            compressed = open_compressed_writer(out, header["target_compression"])
+            while True:
+                op = _read_exact(delta, 1)
+                if op == OP_END:
+                    trailer = _read_json_record(delta)
+                    break
+                if op == OP_COPY:
+                    offset, length = struct.unpack(">QQ", _read_exact(delta, 16))
+                    base.seek(offset)
+                    while length:
+                        block = base.read(min(length, CHUNK_SIZE))
+                        if not block:
+                            raise ValueError("Delta references data beyond the base bundle")
+                        length -= len(block)
+                        target_digest.update(block)
+                        target_size += len(block)
+                        compressed.write(block)
+                elif op == OP_DATA:
+                    (length,) = struct.unpack(">I", _read_exact(delta, 4))
+                    block = _read_exact(delta, length)
+                    target_digest.update(block)
+                    target_size += len(block)
+                    compressed.write(block)
+                else:
+                    raise ValueError(f"Unknown delta record {op!r}")
+            compressed.close()
+
+    if target_digest.hexdigest() != trailer["target_sha256"]:
+        raise ValueError("Rebuilt bundle does not match the digest recorded in the delta")
+    return {"size": target_size, "compression": header["target_compression"]}
+
+
+def _apply_delta(ctx, base_path: str, delta_path: str, output: str):
+    """Rebuild a full project bundle from a previous bundle and a delta"""
+    start = time.monotonic()
+    try:
+        with open(output, "wb") as f:
+            stats = apply_delta(Path(base_path), Path(delta_path), f)
+    except ValueError as e:
+        Path(output).unlink(missing_ok=True)
+        print(f"Error applying delta: {e}")
+        sys.exit(1)
+
+    elapsed = max(time.monotonic() - start, 1e-9)
+    print(
+        f"Rebuilt {output} ({stats['size'] / 1e6:.1f} MB, {stats['compression']}) "
+        f"in {elapsed:.1f}s ({stats['size'] / 1e6 / elapsed:.1f} MB/s), digest verified."
+    )
+
+
+# Create the command object
+apply_delta_cmd = click.command(name="apply-delta")(
+    click.argument("base_path", type=click.Path(exists=True, dir_okay=False))(
+        click.argument("delta_path", type=click.Path(exists=True, dir_okay=False))(
+            click.option("-o", "--output", required=True, help="Path of the rebuilt bundle")(
+                click.pass_context(_apply_delta)
+            )
+        )
+    )
+)
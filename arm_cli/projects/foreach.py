@@ -0,0 +1,210 @@
+import fnmatch
+import hashlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, TextIO
+
+import click
+
+from arm_cli.config import AvailableProject, get_available_projects, load_project_config
+from arm_cli.projects.info import get_env_name, get_project_fields
+from arm_cli.utils.safe_subprocess import safe_popen
+
+
+class ForeachResult(NamedTuple):
+    """Outcome of running the command in one project."""
+
+    name: str
+    returncode: Optional[int]
+    seconds: float
+    error: Optional[str] = None
+
+
+def filter_projects(
+    projects: List[AvailableProject], patterns: Sequence[str]
+) -> List[AvailableProject]:
+    """Keep the projects whose name matches any of the glob patterns (all without patterns)."""
+    if not patterns:
+        return list(projects)
+    return [
+        project
+        for project in projects
+        if any(fnmatch.fnmatch(project.name.lower(), pattern.lower()) for pattern in patterns)
+    ]
+
+
+def get_project_env(project: AvailableProject) -> Dict[str, str]:
+    """Get the environment for a project's command: ARM_PROJECT_* on top of ours.
+
+    Raises:
+        FileNotFoundError, ValueError: If the project config cannot be loaded.
+    """
+    project_config = load_project_config(project.path)
+    env = dict(os.environ)
+    for name, value in get_project_fields(project_config).items():
+        env[get_env_name(name)] = "" if value is None else str(value)
+    env[get_env_name("config")] = str(project_config._config_file_path)
+    return env
+
+
+class OutputPrinter:
+    """Write output lines of concurrent commands, prefixed with their project's name."""
+
+    def __init__(self, names: List[str], stream: Optional[TextIO] = None):
+        self._width = max((len(name) for name in names), default=0)
+        self._stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def write(self, name: str, line: str) -> None:
+        line = line.rstrip("\n")
+        with self._lock:
+            self._stream.write(f"[{name.ljust(self._width)}] {line}\n")
+            self._stream.flush()
+
+
+def get_log_file(log_dir: Path, project: AvailableProject) -> Path:
+    """Get the log file of a project, keeping path separators out of the file name.
+
+    Project names need not be unique, so the name is followed by a hash of the
+    project's config path.
+    """
+    digest = hashlib.sha256(project.path.encode()).hexdigest()[:8]
+    return log_dir / f"{project.name.replace(os.sep, '_')}-{digest}.log"
+
+
+def run_in_project(
+    project: AvailableProject,
+    command: Sequence[str],
+    printer: Optional[OutputPrinter] = None,
+    log_dir: Optional[Path] = None,
+) -> ForeachResult:
+    """Run a command in a project's directory with its fields in the environment.
+
+    Output goes line by line to the printer, or to the project's file in log_dir (see get_log_file).
+    """
+    start = time.monotonic()
+    try:
+        env = get_project_env(project)
+        cwd = env[get_env_name("project_directory")]
+        if not cwd or not os.path.isdir(cwd):
+            raise FileNotFoundError(f"project directory not found: {cwd or '(not set)'}")
+    except (OSError, ValueError) as e:
+        return ForeachResult(project.name, None, time.monotonic() - start, str(e).splitlines()[0])
+
+    try:
+        if log_dir is not None:
+            with open(get_log_file(log_dir, project), "wb") as log:
+                process = safe_popen(
+                    list(command),
+                    cwd=cwd,
+                    env=env,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                )
+                returncode = process.wait()
+        else:
+            process = safe_popen(
+                list(command),
+                cwd=cwd,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                errors="replace",
+            )
+            for line in process.stdout:
+                if printer is not None:
+                    printer.write(project.name, line)
+            returncode = process.wait()
+    except OSError as e:
+        return ForeachResult(project.name, None, time.monotonic() - start, str(e))
+    return ForeachResult(project.name, returncode, time.monotonic() - start)
+
+
+def _foreach(
+    ctx,
+    command: Sequence[str],
+    filters: Sequence[str],
+    jobs: int,
+    log_dir: Optional[str],
+):
+    """Run a command in every project's directory, several projects at a time
+
+    The project's fields are exported as ARM_PROJECT_* variables (as with
+    `projects info --format shell`) and the active project is left unchanged.
+    Example: arm-cli projects foreach --filter 'lyon-*' -- git pull
+    """
+    config = ctx.obj["config"]
+    projects = filter_projects(get_available_projects(config), filters)
+    if not projects:
+        print("No projects match." if filters else "No projects available.")
+        return
+
+    log_path = None
+    if log_dir is not None:
+        log_path = Path(log_dir)
+        log_path.mkdir(parents=True, exist_ok=True)
+    printer = OutputPrinter([project.name for project in projects])
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(
+            executor.map(
+                lambda project: run_in_project(project, command, printer, log_path), projects
+            )
+        )
+
+    print()
+    rows = [
+        (
+            result.name,
+            "-" if result.returncode is None else str(result.returncode),
+            f"{result.seconds:.1f}s",
+            result.error or ("" if log_path is None else str(get_log_file(log_path, project))),
+        )
+        for project, result in zip(projects, results)
+    ]
+    headers = ("PROJECT", "EXIT", "TIME", "LOG" if log_path is not None else "")
+    widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+    for row in [headers] + rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+    failed = [result for result in results if result.returncode != 0]
+    print(f"\n{len(results) - len(failed)}/{len(results)} projects succeeded.")
+    if failed:
+        sys.exit(1)
+
+
+# Create the command object
+foreach = click.command(name="foreach")(
+    click.argument("command", nargs=-1, required=True, type=click.UNPROCESSED)(
+        click.option(
+            "--filter",
+            "filters",
+            multiple=True,
+            help="Only run in projects whose name matches this glob (repeatable)",
+        )(
+            click.option(
+                "-j",
+                "--jobs",
+                default=4,
+                show_default=True,
+                type=click.IntRange(min=1),
+                help="Maximum number of projects running the command at once",
+            )(
+                click.option(
+                    "--log-dir",
+                    default=None,
+                    type=click.Path(file_okay=False),
+                    help="Write each project's output to DIR/<name>-<hash>.log, not the console",
+                )(click.pass_context(_foreach))
+            )
+        )
+    )
+)
@@ -1,10 +1,66 @@
+import json
+import shlex
+from typing import Any, Dict, Optional, Sequence
+
 import click
 
-from arm_cli.config import get_active_project_config
+from arm_cli.config import ProjectConfig, get_active_project_config
+
+# Prefix of the variables exported by --format shell/env
+ENV_PREFIX = "ARM_PROJECT_"
+
+
+def get_env_name(field: str) -> str:
+    """Get the variable a field is exported as, e.g. project_directory -> ARM_PROJECT_DIRECTORY."""
+    name = field.upper()
+    if name.startswith("PROJECT_"):
+        name = name[len("PROJECT_") :]
+    return ENV_PREFIX + name
+
+
+def get_project_fields(project_config: ProjectConfig, fields: Sequence[str] = ()) -> Dict[str, Any]:
+    """Get field values of a project, with the project directory resolved.
+
+    Raises:
+        ValueError: If a requested field does not exist.
+    """
+    names = [field.lower().replace(" ", "_") for field in fields] or list(
+        type(project_config).model_fields
+    )
+    values = {}
+    for name in names:
+        if name not in type(project_config).model_fields:
+            raise ValueError(name)
+        if name == "project_directory":
+            values[name] = project_config.get_resolved_project_directory(
+                getattr(project_config, "_config_file_path", None)
+            )
+        else:
+            values[name] = getattr(project_config, name)
+    return values
+
+
+def format_project_fields(values: Dict[str, Any], output_format: str) -> str:
+    """Render field values as JSON, eval-safe shell exports or KEY=value env lines."""
+    if output_format == "json":
+        return json.dumps(values, indent=2)
+    lines = []
+    for name, value in values.items():
+        value = "" if value is None else str(value)
+        if output_format == "shell":
+            lines.append(f"export {get_env_name(name)}={shlex.quote(value)}")
+        else:
+            # Env files have no quoting, so a value must stay on its line
+            lines.append(f"{get_env_name(name)}={' '.join(value.splitlines())}")
+    return "\n".join(lines)
 
 
-def _info(ctx, field):
-    """Show information about the active project"""
+def _info(ctx, fields: Sequence[str], output_format: Optional[str]):
+    """Show information about the active project
+
+    --format prints the requested fields (all of them without --field) in one call:
+    as JSON, as eval-safe `export ARM_PROJECT_...=` lines, or as KEY=value env lines.
+    """
     config = ctx.obj["config"]
 
     # Get the active project configuration
@@ -13,8 +69,21 @@ def _info(ctx, field):
         print("No active project configured.")
         return
 
-    # If --field is specified, extract and print only that field
-    if field:
+    if output_format is not None:
+        try:
+            values = get_project_fields(project_config, fields)
+        except ValueError as e:
+            print(f"Unknown field: {e}", file=click.get_text_stream("stderr"))
+            print(
+                f"Available fields: {', '.join(type(project_config).model_fields)}",
+                file=click.get_text_stream("stderr"),
+            )
+            return
+        print(format_project_fields(values, output_format))
+        return
+
+    # If --field is specified, extract and print only those fields, one per line
+    for field in fields:
         # Convert field name to attribute name (e.g., "project_directory" -> project_directory)
         field = field.lower().replace(" ", "_")
 
@@ -44,7 +113,7 @@ def _info(ctx, field):
                 file=click.get_text_stream("stderr"),
             )
             return
-    else:
+    if not fields:
         # Print all fields as before
         print(f"Active Project: {project_config.name}")
         if project_config.description:
@@ -62,5 +131,15 @@ def _info(ctx, field):
 
 # Create the command object
 info = click.command(name="info")(
-    click.option("--field", help="Extract a specific field value")(click.pass_context(_info))
+    click.option(
+        "--field", "fields", multiple=True, help="Extract a specific field value (repeatable)"
+    )(
+        click.option(
+            "--format",
+            "output_format",
+            type=click.Choice(["json", "shell", "env"]),
+            default=None,
+            help="Print the fields in one go: as JSON, shell exports or env lines",
+        )(click.pass_context(_info))
+    )
 )
@@ -12,6 +12,7 @@ from arm_cli.config import (
     load_project_config,
     save_config,
 )
+from arm_cli.projects.project_index import update_project_index
 from arm_cli.settings import get_setting
 
 
@@ -135,6 +136,7 @@ def _init(ctx, project_path: str, name: Optional[str] = None):
     # Add to available projects and set as active
     add_project_to_list(config, str(config_file), project_config.name)
     save_config(config)
+    update_project_index(config, changed_path=str(config_file))
 
     print(f"Project '{project_config.name}' initialized and set as active")
     resolved_dir = project_config.get_resolved_project_directory(
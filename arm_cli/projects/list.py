@@ -1,24 +1,105 @@
+import json
+import sys
+
 import click
+import inquirer
+
+from arm_cli.config import (
+    get_available_projects,
+    print_no_projects_message,
+    remove_projects,
+    save_config,
+)
+from arm_cli.projects.check import STATUS_DEAD, STATUS_OK, check_projects
+from arm_cli.projects.project_index import update_project_index
 
-from arm_cli.config import get_available_projects, print_no_projects_message
 
+def _list(ctx, check: bool = False, as_json: bool = False, prune: bool = False, yes: bool = False):
+    """List all available projects
 
-def _list(ctx):
-    """List all available projects"""
+    --check validates every project's config, project directory and compose file;
+    --prune removes the projects whose config is missing or unreadable.
+    """
     config = ctx.obj["config"]
     available_projects = get_available_projects(config)
 
     if not available_projects:
-        print_no_projects_message()
+        if as_json:
+            print("[]")
+        else:
+            print_no_projects_message()
         return
 
-    print("Available Projects:")
-    for i, project in enumerate(available_projects, 1):
-        active_indicator = " *" if project.path == config.active_project else ""
-        print(f"  {i}. {project.name}{active_indicator}")
-        print(f"     Path: {project.path}")
-        print()
+    health = check_projects(available_projects) if check or prune else None
+
+    if as_json:
+        entries = []
+        for i, project in enumerate(available_projects):
+            entry = {
+                "name": project.name,
+                "path": project.path,
+                "active": project.path == config.active_project,
+            }
+            if health is not None:
+                entry["status"] = health[i].status
+                entry["problems"] = health[i].problems
+            entries.append(entry)
+        print(json.dumps(entries, indent=2))
+    elif health is not None:
+        rows = [(h.status.upper(), h.name, h.path, "; ".join(h.problems)) for h in health]
+        headers = ("STATUS", "NAME", "PATH", "PROBLEMS")
+        widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+        for row in [headers] + rows:
+            print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+    else:
+        print("Available Projects:")
+        for i, project in enumerate(available_projects, 1):
+            active_indicator = " *" if project.path == config.active_project else ""
+            print(f"  {i}. {project.name}{active_indicator}")
+            print(f"     Path: {project.path}")
+            print()
+
+    if prune:
+        dead = {h.path for h in health if h.status == STATUS_DEAD}
+        out = sys.stderr if as_json else sys.stdout
+        if not dead:
+            print("No dead projects to prune.", file=out)
+            return
+        if not yes:
+            try:
+                answers = inquirer.prompt(
+                    [
+                        inquirer.Confirm(
+                            "confirm",
+                            message=f"Remove {len(dead)} project(s) whose config is missing or unreadable?",
+                            default=False,
+                        )
+                    ]
+                )
+            except KeyboardInterrupt:
+                answers = None
+            if answers is None or not answers["confirm"]:
+                print("Prune cancelled.", file=out)
+                return
+        remove_projects(config, sorted(dead))
+        save_config(config)
+        update_project_index(config)
+        print(f"Pruned {len(dead)} project(s).", file=out)
+    elif health is not None and any(h.status != STATUS_OK for h in health):
+        sys.exit(1)
 
 
 # Create the command object
-list = click.command(name="ls")(click.pass_context(_list))
+list = click.command(name="ls")(
+    click.option("--check", is_flag=True, help="Validate each project's config and paths")(
+        click.option("--json", "as_json", is_flag=True, help="Print the projects as JSON")(
+            click.option(
+                "--prune", is_flag=True, help="Remove projects whose config is missing or broken"
+            )(
+                click.option("-y", "--yes", is_flag=True, help="Prune without asking")(
+                    click.pass_context(_list)
+                )
+            )
+        )
+    )
+)
@@ -0,0 +1,297 @@
+"""Fuzzy project search over a persistent trigram index.
+
+The index lives next to global_context.json and stores, for every available project,
+its name, config path, description and a lowercase search text, together with
+trigram postings. Postings are
+kept as space-separated id strings and only parsed for the trigrams of a query, so
+loading the index stays cheap even with thousands of projects.
+
+Known limitation: a search is well under 10 ms, but a new process first parses the
+whole index file, which takes about 30 ms with 10,000 projects. A loaded index is kept
+for the rest of the process, so only the first search of a command pays for it.
+"""
+
+import heapq
+import json
+import os
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from arm_cli.config import (
+    GlobalContext,
+    get_available_projects,
+    get_config_file,
+    load_project_config,
+)
+
+INDEX_VERSION = 1
+
+# Share of a query's trigrams a project must contain to match fuzzily
+MIN_SIMILARITY = 0.5
+
+# The top match is ambiguous if the runner-up scores at least this share of it
+AMBIGUITY_RATIO = 0.9
+
+
+class ProjectMatch(NamedTuple):
+    """A ranked search result."""
+
+    score: float
+    name: str
+    path: str
+
+
+def get_index_file() -> Path:
+    """Get the path of the project index, next to the global context file."""
+    config_file = get_config_file()
+    return config_file.with_name(config_file.stem + ".index.json")
+
+
+def _get_stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_trigrams(text: str) -> Set[str]:
+    """Get the lowercase trigrams of a text."""
+    text = text.lower()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class ProjectIndex:
+    """Trigram index over project names, config paths and descriptions.
+
+    Projects get stable integer ids; removed projects leave a hole that is reclaimed
+    when the index is compacted on save.
+    """
+
+    def __init__(self):
+        self.projects: List[Optional[List[str]]] = []
+        self.postings: Dict[str, str] = {}
+        self._ids: Dict[str, int] = {}
+        # Ids added since postings were last joined, to keep bulk indexing linear
+        self._added: Dict[str, List[str]] = defaultdict(list)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, index_file: Path) -> "ProjectIndex":
+        """Load an index, returning an empty one if it is missing or unreadable.
+
+        The index is only parsed again once the file changed since this process loaded
+        or saved it.
+        """
+        key = _get_stat_key(index_file)
+        loaded = _loaded_indexes.get(str(index_file))
+        if key is not None and loaded is not None and loaded[0] == key:
+            return loaded[1]
+        index = cls()
+        try:
+            with open(index_file) as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return index
+            index.projects = data["projects"]
+            index.postings = data["postings"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return index
+        index._ids = {entry[0]: i for i, entry in enumerate(index.projects) if entry is not None}
+        if key is not None:
+            _loaded_indexes[str(index_file)] = (key, index)
+        return index
+
+    def save(self, index_file: Path) -> None:
+        """Write the index atomically, compacting it if many projects were removed."""
+        if self.projects.count(None) > len(self.projects) // 2:
+            self._compact()
+        self._join_postings()
+        tmp_file = index_file.with_name(index_file.name + ".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(
+                {"version": INDEX_VERSION, "projects": self.projects, "postings": self.postings},
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_file, index_file)
+        self.dirty = False
+        key = _get_stat_key(index_file)
+        if key is not None:
+            _loaded_indexes[str(index_file)] = (key, self)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._ids
+
+    def get_entry(self, path: str) -> Optional[List[str]]:
+        project_id = self._ids.get(path)
+        return None if project_id is None else self.projects[project_id]
+
+    def add(self, path: str, name: str, description: str = "") -> None:
+        """Index a project, replacing any previous entry for the same path."""
+        if path in self._ids:
+            self.remove(path)
+        project_id = len(self.projects)
+        haystack = f"{name}\n{path}\n{description}".lower()
+        self.projects.append([path, name, description, haystack])
+        self._ids[path] = project_id
+        for trigram in self._entry_trigrams(path, name, description):
+            self._added[trigram].append(str(project_id))
+        self.dirty = True
+
+    def remove(self, path: str) -> None:
+        """Remove a project from the index, updating only its own trigrams' postings."""
+        project_id = self._ids.pop(path, None)
+        if project_id is None:
+            return
+        self._join_postings()
+        entry = self.projects[project_id]
+        self.projects[project_id] = None
+        removed = str(project_id)
+        for trigram in self._entry_trigrams(*entry[:3]):
+            ids = [i for i in self.postings.get(trigram, "").split() if i != removed]
+            if ids:
+                self.postings[trigram] = " ".join(ids)
+            else:
+                self.postings.pop(trigram, None)
+        self.dirty = True
+
+    def search(self, query: str, limit: int = 10) -> List[ProjectMatch]:
+        """Rank projects by how well their name, path or description match a query.
+
+        Exact, prefix and substring name matches rank first, then substring matches
+        in the path and description, then fuzzy matches sharing most of the query's
+        trigrams (which tolerates typos).
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        self._join_postings()
+        query_trigrams = sorted(get_trigrams(query), key=lambda t: len(self.postings.get(t, "")))
+        candidates = []
+        if query_trigrams:
+            # Substring matches always outrank fuzzy ones, and each contains the rarest
+            # trigram. If there are enough of them the fuzzy pass can be skipped.
+            for i in self.postings.get(query_trigrams[0], "").split():
+                project_id = int(i)
+                if query in self.projects[project_id][3]:
+                    candidates.append((project_id, 1.0))
+        if not query_trigrams:
+            # Queries shorter than a trigram are matched as substrings
+            candidates = [
+                (i, 1.0)
+                for i, entry in enumerate(self.projects)
+                if entry is not None and query in entry[3]
+            ]
+        elif len(candidates) < limit:
+            candidates = []
+            # A match needs `required` of the query's trigrams, so it must appear in at
+            # least one of the rarest len - required + 1 postings. Only those are parsed;
+            # the common trigrams are checked against the few resulting candidates.
+            required = max(1, int(len(query_trigrams) * MIN_SIMILARITY + 0.5))
+            split = len(query_trigrams) - required + 1
+            hits: Counter = Counter()
+            for trigram in query_trigrams[:split]:
+                hits.update(self.postings.get(trigram, "").split())
+            common = query_trigrams[split:]
+            for i, n in hits.items():
+                if n + len(common) < required:
+                    continue
+                project_id = int(i)
+                if common:
+                    haystack = self.projects[project_id][3]
+                    n += sum(trigram in haystack for trigram in common)
+                if n >= required:
+                    candidates.append((project_id, n / len(query_trigrams)))
+
+        # Scored inline: this loop runs for every candidate, so it avoids per-call overhead.
+        # The haystack is "name\npath\ndescription" in lowercase.
+        scored = []
+        for project_id, similarity in candidates:
+            path, name, _, haystack = self.projects[project_id]
+            if query not in haystack:
+                base = 0.0
+            elif haystack.startswith(query + "\n"):
+                base = 1000.0
+            elif haystack.startswith(query):
+                base = 800.0
+            elif query in haystack[: len(name)]:
+                base = 600.0
+            elif query in haystack[len(name) + 1 : len(name) + 1 + len(path)]:
+                base = 400.0
+            else:
+                base = 300.0
+            scored.append((base + 100.0 * similarity, -len(name), name, path))
+        top = heapq.nlargest(limit, scored)
+        return [ProjectMatch(score, name, path) for score, _, name, path in top]
+
+    @staticmethod
+    def _entry_trigrams(path: str, name: str, description: str) -> Set[str]:
+        return get_trigrams(name) | get_trigrams(path) | get_trigrams(description)
+
+    def _join_postings(self) -> None:
+        for trigram, ids in self._added.items():
+            existing = self.postings.get(trigram)
+            self.postings[trigram] = f"{existing} {' '.join(ids)}" if existing else " ".join(ids)
+        self._added.clear()
+
+    def _compact(self) -> None:
+        entries = [entry for entry in self.projects if entry is not None]
+        self.projects, self.postings, self._ids = [], {}, {}
+        self._added.clear()
+        for entry in entries:
+            self.add(*entry[:3])
+        self._join_postings()
+
+
+# Index file -> (mtime and size it was loaded or saved with, the index)
+_loaded_indexes: Dict[str, Tuple[Tuple[int, int], ProjectIndex]] = {}
+
+
+def is_ambiguous(matches: List[ProjectMatch]) -> bool:
+    """Check whether the top match does not clearly beat the runner-up."""
+    if len(matches) < 2:
+        return False
+    return matches[1].score >= matches[0].score * AMBIGUITY_RATIO
+
+
+def _read_description(path: str) -> str:
+    try:
+        return load_project_config(path).description or ""
+    except (OSError, ValueError):
+        return ""
+
+
+def update_project_index(config: GlobalContext, changed_path: Optional[str] = None) -> ProjectIndex:
+    """Bring the index in line with the available projects and save it if it changed.
+
+    Only projects that were added, renamed or removed since the index was written are
+    (re)indexed. changed_path forces re-reading a project, e.g. after `projects init`
+    rewrote its config.
+    """
+    index_file = get_index_file()
+    index = ProjectIndex.load(index_file)
+
+    available = {project.path: project.name for project in get_available_projects(config)}
+    for path in [entry[0] for entry in index.projects if entry is not None]:
+        if path not in available:
+            index.remove(path)
+    for path, name in available.items():
+        entry = index.get_entry(path)
+        if entry is None or entry[1] != name or path == changed_path:
+            index.add(path, name, _read_description(path))
+
+    if index.dirty:
+        try:
+            index.save(index_file)
+        except OSError as e:
+            # The file no longer matches this index, so the next load parses it again
+            _loaded_indexes.pop(str(index_file), None)
+            print(f"Warning: could not save project index: {e}")
+    return index
+
+
+def search_projects(config: GlobalContext, query: str, limit: int = 10) -> List[ProjectMatch]:
+    """Search the available projects by name, path and description."""
+    return update_project_index(config).search(query, limit)
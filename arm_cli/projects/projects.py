@@ -2,17 +2,28 @@ import click
 
 # Import the modules and access the command objects
 import arm_cli.projects.activate
+import arm_cli.projects.bundle
+import arm_cli.projects.delta
+import arm_cli.projects.foreach
 import arm_cli.projects.info
 import arm_cli.projects.init
 import arm_cli.projects.list
+import arm_cli.projects.pull
 import arm_cli.projects.remove
+import arm_cli.projects.rollout
 
 # Get the command objects
 activate = arm_cli.projects.activate.activate
+bundle = arm_cli.projects.bundle.bundle
+unbundle = arm_cli.projects.bundle.unbundle
+apply_delta = arm_cli.projects.delta.apply_delta_cmd
+foreach = arm_cli.projects.foreach.foreach
 info = arm_cli.projects.info.info
 init = arm_cli.projects.init.init
 ls_cmd = arm_cli.projects.list.list
+pull = arm_cli.projects.pull.pull
 remove = arm_cli.projects.remove.remove
+rollout = arm_cli.projects.rollout.rollout_cmd
 
 
 @click.group()
@@ -27,3 +38,9 @@ projects.add_command(activate)
 projects.add_command(ls_cmd)
 projects.add_command(info)
 projects.add_command(remove)
+projects.add_command(pull)
+projects.add_command(bundle)
+projects.add_command(unbundle)
+projects.add_command(apply_delta)
+projects.add_command(rollout)
+projects.add_command(foreach)
@@ -0,0 +1,205 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import click
+import docker
+
+from arm_cli.config import get_active_project_config
+from arm_cli.utils.compose import get_compose_file, get_compose_images
+
+# Pull statuses after which a layer is fully present locally
+LAYER_DONE_STATUSES = ("Download complete", "Pull complete", "Already exists")
+
+
+class PullProgress:
+    """Aggregate progress for several concurrent image pulls.
+
+    Layers are tracked by their id rather than per image, so a base layer shared by
+    several images is only counted (and downloaded by the daemon) once.
+    """
+
+    def __init__(self, images: List[str], min_interval: float = 0.1):
+        self.images = images
+        self.min_interval = min_interval
+        self.layers: Dict[str, List[int]] = {}
+        self.done_layers: Set[str] = set()
+        self.finished_images = 0
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, event: Dict[str, Any]) -> None:
+        """Record a single decoded event from the pull stream."""
+        layer_id = event.get("id")
+        status = event.get("status", "")
+        # Events without a layer id are image level ("Pulling from", "Digest: ...")
+        if not layer_id or status.startswith("Pulling from"):
+            return
+
+        with self._lock:
+            layer = self.layers.setdefault(layer_id, [0, 0])
+            detail = event.get("progressDetail") or {}
+            if status == "Downloading" and detail.get("total"):
+                layer[0] = max(layer[0], int(detail.get("current", 0)))
+                layer[1] = int(detail["total"])
+            elif status in LAYER_DONE_STATUSES:
+                layer[0] = layer[1]
+                self.done_layers.add(layer_id)
+        self.render()
+
+    def finish_image(self) -> None:
+        """Mark one image as finished (pulled, skipped or failed)."""
+        with self._lock:
+            self.finished_images += 1
+        self.render(force=True)
+
+    def totals(self) -> Tuple[int, int]:
+        """Get (downloaded, total) bytes over all known layers."""
+        with self._lock:
+            current = sum(layer[0] for layer in self.layers.values())
+            total = sum(layer[1] for layer in self.layers.values())
+        return current, total
+
+    def render(self, force: bool = False) -> None:
+        """Redraw the aggregate progress line, rate limited to min_interval."""
+        now = time.monotonic()
+        if not force and now - self._last_render < self.min_interval:
+            return
+        self._last_render = now
+
+        current, total = self.totals()
+        fraction = current / total if total else 0.0
+        width = 30
+        filled = int(width * fraction)
+        bar = "#" * filled + "-" * (width - filled)
+        line = (
+            f"\r[{bar}] {fraction * 100:5.1f}%  "
+            f"{current / 1e6:.1f}/{total / 1e6:.1f} MB  "
+            f"layers {len(self.done_layers)}/{len(self.layers)}  "
+            f"images {self.finished_images}/{len(self.images)}"
+        )
+        click.echo(line, nl=False, err=True)
+
+
+def is_image_current(client, image: str) -> bool:
+    """Check whether the local copy of an image matches the registry digest.
+
+    Digest references are immutable, so any local copy is current. If the registry
+    cannot be reached, an existing local copy is treated as current so that robots
+    without registry access can still deploy.
+    """
+    try:
+        local_image = client.images.get(image)
+    except docker.errors.ImageNotFound:
+        return False
+
+    if "@" in image:
+        return True
+
+    try:
+        registry_data = client.images.get_registry_data(image)
+    except docker.errors.APIError:
+        return True
+
+    local_digests = [d.split("@", 1)[-1] for d in local_image.attrs.get("RepoDigests", [])]
+    return registry_data.id in local_digests
+
+
+def pull_image(client, image: str, progress: PullProgress) -> str:
+    """Pull a single image unless it is already current.
+
+    Returns:
+        "skipped" if the local image was already current, otherwise "pulled".
+    """
+    if is_image_current(client, image):
+        return "skipped"
+
+    for event in client.api.pull(image, stream=True, decode=True):
+        if "error" in event:
+            raise RuntimeError(event["error"])
+        progress.update(event)
+    return "pulled"
+
+
+def pull_images(client, images: List[str], jobs: int) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Pull images concurrently with at most `jobs` pulls in flight.
+
+    Returns:
+        Mapping of image to (result, error) where result is pulled, skipped or failed.
+    """
+    progress = PullProgress(images)
+    results: Dict[str, Tuple[str, Optional[str]]] = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(pull_image, client, image, progress): image for image in images}
+        for future in as_completed(futures):
+            image = futures[future]
+            try:
+                results[image] = (future.result(), None)
+            except (docker.errors.APIError, RuntimeError) as e:
+                results[image] = ("failed", str(e))
+            progress.finish_image()
+
+    click.echo("", err=True)
+    return results
+
+
+def _pull(ctx, jobs: int):
+    """Pull the images used by the active project's docker compose file"""
+    config = ctx.obj["config"]
+
+    project_config = get_active_project_config(config)
+    if not project_config:
+        print("No active project configured.")
+        return
+
+    compose_file = get_compose_file(project_config)
+    if compose_file is None:
+        print(f"Project '{project_config.name}' has no docker_compose_file configured.")
+        return
+    if not compose_file.exists():
+        print(f"Docker compose file not found at {compose_file}")
+        sys.exit(1)
+
+    try:
+        images = get_compose_images(compose_file)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if not images:
+        print(f"No images referenced in {compose_file}")
+        return
+
+    print(f"Pulling {len(images)} images for project '{project_config.name}' ({jobs} at a time)...")
+    client = docker.from_env()
+    results = pull_images(client, images, jobs)
+
+    failed = False
+    for image in images:
+        result, error = results[image]
+        if result == "skipped":
+            print(f"  Up to date: {image}")
+        elif result == "pulled":
+            print(f"  Pulled: {image}")
+        else:
+            failed = True
+            print(f"  Failed: {image}: {error}")
+
+    if failed:
+        sys.exit(1)
+
+
+# Create the command object
+pull = click.command(name="pull")(
+    click.option(
+        "-j",
+        "--jobs",
+        default=4,
+        show_default=True,
+        type=click.IntRange(min=1),
+        help="Maximum number of images to pull concurrently",
+    )(click.pass_context(_pull))
+)
@@ -10,7 +10,9 @@ from arm_cli.config import (
     remove_project_from_list,
     save_config,
 )
-from arm_cli.settings import get_setting
+from arm_cli.projects.project_index import update_project_index
+from arm_cli.utils.completion import complete_projects
+from arm_cli.utils.picker import pick
 
 
 def _remove(ctx, project: Optional[str] = None):
@@ -25,34 +27,18 @@ def _remove(ctx, project: Optional[str] = None):
             print("No projects available to remove.")
             return
 
-        # Create choices for inquirer
+        # Create choices for the picker
         choices = []
         for proj in available_projects:
             active_indicator = " *" if proj.path == config.active_project else ""
-            choices.append(f"{proj.name}{active_indicator}")
-
-        # Create the question
-        questions = [
-            inquirer.List(
-                "project",
-                message="Select a project to remove",
-                choices=choices,
-                carousel=True,
-            )
-        ]
+            choices.append((f"{proj.name}{active_indicator}", proj.name))
 
         try:
-            answers = inquirer.prompt(questions)
-            if answers is None:
+            project = pick("Select a project to remove", choices)
+            if project is None:
                 print("Cancelled.")
                 return
 
-            # Extract project name (remove the active indicator if present)
-            selected_choice = answers["project"]
-            project = selected_choice.replace(" *", "")
-            if project is None:
-                raise RuntimeError("Project name cannot be None")
-
         except KeyboardInterrupt:
             print("\nCancelled.")
             return
@@ -106,6 +92,7 @@ def _remove(ctx, project: Optional[str] = None):
     # Remove the project
     if remove_project_from_list(config, project):
         save_config(config)
+        update_project_index(config)
         print(f"Removed project: {project}")
         if is_active:
             print("Active project has been cleared.")
@@ -116,5 +103,7 @@ def _remove(ctx, project: Optional[str] = None):
 
 # Create the command object
 remove = click.command(name="remove")(
-    click.argument("project", required=False)(click.pass_context(_remove))
+    click.argument("project", required=False, shell_complete=complete_projects)(
+        click.pass_context(_remove)
+    )
 )
@@ -0,0 +1,260 @@
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import click
+import docker
+
+from arm_cli.config import get_active_project_config
+from arm_cli.utils.compose import get_compose_config, get_compose_file
+from arm_cli.utils.safe_subprocess import safe_run
+
+
+def get_rollout_batches(services: Dict[str, Any], batch_size: int) -> List[List[str]]:
+    """Order services for a rollout in reverse dependency order and split them in batches.
+
+    Services nothing depends on come first and a service is only restarted after all of
+    its dependents. Batches never mix dependency levels, so that ordering holds even
+    when a batch restarts several services at once.
+    """
+    depends_on = {name: set(service.get("depends_on") or {}) for name, service in services.items()}
+    dependents: Dict[str, Set[str]] = {name: set() for name in services}
+    for name, dependencies in depends_on.items():
+        for dependency in dependencies:
+            if dependency in dependents:
+                dependents[dependency].add(name)
+
+    batches: List[List[str]] = []
+    done: Set[str] = set()
+    remaining = set(services)
+    while remaining:
+        level = sorted(name for name in remaining if dependents[name] <= done)
+        if not level:
+            raise ValueError(f"Dependency cycle between services: {', '.join(sorted(remaining))}")
+        for i in range(0, len(level), batch_size):
+            batches.append(level[i : i + batch_size])
+        done.update(level)
+        remaining.difference_update(level)
+    return batches
+
+
+def get_service_image(project_name: str, service_name: str, service: Dict[str, Any]) -> str:
+    """Get the image reference compose uses for a service."""
+    return service.get("image") or f"{project_name}-{service_name}"
+
+
+def get_service_containers(client, project_name: str, service_name: str) -> List[Any]:
+    """Get all containers (running or not) belonging to a compose service."""
+    return client.containers.list(
+        all=True,
+        filters={
+            "label": [
+                f"com.docker.compose.project={project_name}",
+                f"com.docker.compose.service={service_name}",
+            ]
+        },
+    )
+
+
+def get_container_health(container) -> str:
+    """Get a container's rollout health: healthy, starting or failed.
+
+    Containers with a healthcheck must report healthy; containers without one only
+    have to be running.
+    """
+    state = container.attrs.get("State", {})
+    status = state.get("Status")
+    if status in ("exited", "dead") or state.get("Restarting"):
+        return "failed"
+    health = state.get("Health")
+    if health:
+        return {"healthy": "healthy", "unhealthy": "failed"}.get(health.get("Status"), "starting")
+    return "healthy" if status == "running" else "starting"
+
+
+def recreate_services(compose_file: Path, services: List[str]) -> None:
+    """Recreate services with their current images, leaving their dependencies alone."""
+    safe_run(
+        ["docker", "compose", "-f", str(compose_file), "up", "-d", "--no-deps", "--force-recreate"]
+        + services,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def wait_until_healthy(
+    client,
+    project_name: str,
+    service_name: str,
+    timeout: float,
+    poll_interval: float = 1.0,
+) -> Tuple[bool, str]:
+    """Wait for every container of a service to become healthy.
+
+    Returns:
+        Tuple of (healthy, reason) where reason describes a failure or timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        containers = get_service_containers(client, project_name, service_name)
+        states = []
+        for container in containers:
+            container.reload()
+            states.append(get_container_health(container))
+        if containers and all(state == "healthy" for state in states):
+            return True, "healthy"
+        if "failed" in states:
+            return False, "container exited or reported unhealthy"
+        if time.monotonic() >= deadline:
+            return False, f"not healthy after {timeout:.0f}s"
+        time.sleep(poll_interval)
+
+
+def rollback_services(
+    client, compose_file: Path, previous_images: Dict[str, Tuple[str, str]]
+) -> None:
+    """Point each service's image tag back to the image it ran before and recreate it.
+
+    Services are rolled back in the opposite order of the rollout, so dependencies are
+    restored before the services that depend on them. A service that cannot be rolled
+    back is reported and the others are still rolled back.
+    """
+    for service_name, (image_ref, image_id) in reversed(list(previous_images.items())):
+        try:
+            client.images.get(image_id).tag(image_ref)
+        except docker.errors.APIError as e:
+            print(f"  Could not restore image for {service_name}: {e}")
+            continue
+        print(f"  Rolling back {service_name} to {image_id[:19]}")
+        try:
+            recreate_services(compose_file, [service_name])
+        except subprocess.CalledProcessError as e:
+            print(f"  Could not recreate {service_name}: {(e.stderr or str(e)).strip()}")
+
+
+def rollout(
+    client,
+    compose_file: Path,
+    compose_config: Dict[str, Any],
+    batch_size: int,
+    max_unavailable: int,
+    timeout: float,
+    on_failure: str,
+) -> bool:
+    """Recreate the project's services batch by batch, gating each batch on health.
+
+    Within a batch at most `max_unavailable` services are recreated at the same time.
+    On failure the rollout stops; with on_failure="rollback", every service recreated
+    so far is returned to the image it was running before.
+
+    Returns:
+        True if every service was rolled out and reported healthy.
+    """
+    project_name = compose_config["name"]
+    services = compose_config.get("services", {})
+    batches = get_rollout_batches(services, batch_size)
+    previous_images: Dict[str, Tuple[str, str]] = {}
+
+    def roll_service(service_name: str) -> Tuple[str, bool, str]:
+        # Errors fail the service instead of escaping the batch, so the rollback still runs
+        try:
+            containers = get_service_containers(client, project_name, service_name)
+            if containers:
+                image_ref = get_service_image(project_name, service_name, services[service_name])
+                previous_images[service_name] = (image_ref, containers[0].attrs["Image"])
+            recreate_services(compose_file, [service_name])
+            healthy, reason = wait_until_healthy(client, project_name, service_name, timeout)
+        except subprocess.CalledProcessError as e:
+            return service_name, False, (e.stderr or str(e)).strip()
+        except (docker.errors.APIError, OSError) as e:
+            return service_name, False, f"docker error: {e}"
+        return service_name, healthy, reason
+
+    for number, batch in enumerate(batches, 1):
+        print(f"Batch {number}/{len(batches)}: {', '.join(batch)}")
+        with ThreadPoolExecutor(max_workers=max_unavailable) as executor:
+            results = list(executor.map(roll_service, batch))
+
+        for name, healthy, reason in results:
+            print(f"  {name}: {reason}")
+        if not all(healthy for _, healthy, _ in results):
+            print(f"Rollout failed in batch {number}.")
+            if on_failure == "rollback":
+                print("Rolling back...")
+                rollback_services(client, compose_file, previous_images)
+            return False
+    return True
+
+
+def _rollout(ctx, batch_size: int, max_unavailable: Optional[int], timeout: int, on_failure: str):
+    """Restart the project's services in batches, waiting for each batch to be healthy"""
+    config = ctx.obj["config"]
+
+    project_config = get_active_project_config(config)
+    if not project_config:
+        print("No active project configured.")
+        return
+
+    compose_file = get_compose_file(project_config)
+    if compose_file is None or not compose_file.exists():
+        print(f"Docker compose file not found for project '{project_config.name}'")
+        sys.exit(1)
+
+    try:
+        compose_config = get_compose_config(compose_file)
+        client = docker.from_env()
+        succeeded = rollout(
+            client,
+            compose_file,
+            compose_config,
+            batch_size,
+            max_unavailable or batch_size,
+            float(timeout),
+            on_failure,
+        )
+    except (RuntimeError, ValueError, docker.errors.APIError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if not succeeded:
+        sys.exit(1)
+    print(f"Rollout of project '{project_config.name}' completed successfully.")
+
+
+# Create the command object
+rollout_cmd = click.command(name="rollout")(
+    click.option(
+        "--batch-size",
+        default=1,
+        show_default=True,
+        type=click.IntRange(min=1),
+        help="Services per batch; each batch must be healthy before the next starts",
+    )(
+        click.option(
+            "--max-unavailable",
+            default=None,
+            type=click.IntRange(min=1),
+            help="Services recreated at the same time within a batch (default: batch size)",
+        )(
+            click.option(
+                "--timeout",
+                default=120,
+                show_default=True,
+                type=click.IntRange(min=1),
+                help="Seconds to wait for a service to become healthy",
+            )(
+                click.option(
+                    "--on-failure",
+                    type=click.Choice(["abort", "rollback"]),
+                    default="abort",
+                    show_default=True,
+                    help="Stop, or also return recreated services to their previous images",
+                )(click.pass_context(_rollout))
+            )
+        )
+    )
+)
@@ -0,0 +1,133 @@
+"""SQLite storage for the project registry, for fleets with many projects.
+
+With the JSON backend every activate, init or remove rewrites global_context.json in
+full. Here each project is a row, so those commands update a single row, lookups by
+path or name use an index and the list of projects is only read when a command needs
+it. The database runs in WAL mode, so any number of CLI processes can read it while
+one writes.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA_VERSION = 1
+
+# Seconds to wait for another process's write to finish
+BUSY_TIMEOUT = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_name ON projects (name COLLATE NOCASE, position);
+CREATE INDEX IF NOT EXISTS projects_position ON projects (position);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SqliteRegistry:
+    """Projects (path, name) in registration order, plus the active project."""
+
+    def __init__(self, db_file: Path):
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: every statement is its own transaction unless wrapped in one
+        self._db = sqlite3.connect(str(db_file), timeout=BUSY_TIMEOUT, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last commits on power loss, never corruption
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._set_state_default("schema_version", str(SCHEMA_VERSION))
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._db.execute(
+            "INSERT INTO state (key, value) VALUES (?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _set_state_default(self, key: str, value: str) -> None:
+        self._db.execute("INSERT OR IGNORE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def migrated(self) -> bool:
+        """Whether the registry was already filled, from global_context.json or by use."""
+        return self._get_state("migrated") is not None
+
+    def get_active(self) -> str:
+        return self._get_state("active_project") or ""
+
+    def set_active(self, path: str) -> None:
+        self._set_state("active_project", path)
+
+    def list_projects(self) -> List[Tuple[str, str]]:
+        """Get every project as (path, name), in registration order."""
+        return self._db.execute("SELECT path, name FROM projects ORDER BY position").fetchall()
+
+    def count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def find(self, identifier: str) -> Optional[Tuple[str, str]]:
+        """Find a project by exact path, then by case-insensitive name."""
+        row = self._db.execute(
+            "SELECT path, name FROM projects WHERE path = ?", (identifier,)
+        ).fetchone()
+        if row is None:
+            row = self._db.execute(
+                "SELECT path, name FROM projects WHERE name = ? COLLATE NOCASE"
+                " ORDER BY position LIMIT 1",
+                (identifier,),
+            ).fetchone()
+        return row
+
+    def add(self, path: str, name: str) -> None:
+        """Register a project, moving it to the end if its path is already registered."""
+        self._db.execute(
+            "INSERT INTO projects (path, name, position)"
+            " VALUES (?, ?, (SELECT COALESCE(MAX(position), 0) + 1 FROM projects))"
+            " ON CONFLICT (path) DO UPDATE SET name = excluded.name, position = excluded.position",
+            (path, name),
+        )
+        self._set_state_default("migrated", "1")
+
+    def remove(self, paths: Iterable[str]) -> None:
+        """Unregister projects in one transaction, clearing the active one if removed."""
+        paths = list(paths)
+        with self._transaction():
+            self._db.executemany("DELETE FROM projects WHERE path = ?", [(p,) for p in paths])
+            if self.get_active() in paths:
+                self.set_active("")
+
+    def import_context(self, active_project: str, projects: List[Tuple[str, str]]) -> None:
+        """Fill the registry from an existing global context, in one transaction."""
+        with self._transaction():
+            self._db.execute("DELETE FROM projects")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO projects (path, name, position) VALUES (?, ?, ?)",
+                [(path, name, i) for i, (path, name) in enumerate(projects, 1)],
+            )
+            self.set_active(active_project)
+            self._set_state("migrated", "1")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
@@ -14,6 +14,8 @@ from arm_cli.config import (
     save_config,
 )
 from arm_cli.settings import get_setting, load_settings, save_settings, set_setting
+from arm_cli.utils.completion import complete_settings
+from arm_cli.utils.picker import pick
 from arm_cli.utils.safe_subprocess import safe_run, sudo_run
 
 
@@ -92,7 +94,7 @@ def show_settings(ctx):
 
 
 @settings.command("get")
-@click.argument("key")
+@click.argument("key", shell_complete=complete_settings)
 @click.pass_context
 def get_settings_cmd(ctx, key):
     """Get a specific setting value"""
@@ -112,7 +114,7 @@ def get_settings_cmd(ctx, key):
 
 
 @settings.command("set")
-@click.argument("key", required=False)
+@click.argument("key", required=False, shell_complete=complete_settings)
 @click.argument("value", required=False)
 @click.pass_context
 def set_settings(ctx, key, value):
@@ -126,32 +128,19 @@ def set_settings(ctx, key, value):
         # Get all available settings
         available_settings = list(settings.model_fields.keys())
 
-        # Create choices for inquirer
+        # Create choices for the picker
         choices = []
         for setting_key in available_settings:
             current_val = getattr(settings, setting_key)
-            choices.append(f"{setting_key} (current: {current_val})")
+            choices.append((f"{setting_key} (current: {current_val})", setting_key))
 
         # Ask user to select a setting
-        questions = [
-            inquirer.List(
-                "setting",
-                message="Select a setting to modify",
-                choices=choices,
-                carousel=True,
-            )
-        ]
-
         try:
-            answers = inquirer.prompt(questions)
-            if answers is None:
+            key = pick("Select a setting to modify", choices)
+            if key is None:
                 print("Configuration cancelled.")
                 return
 
-            # Extract the key from the selected choice
-            selected_choice = answers["setting"]
-            key = selected_choice.split(" (current:")[0]
-
         except KeyboardInterrupt:
             print("\nConfiguration cancelled.")
             return
@@ -161,33 +150,27 @@ def set_settings(ctx, key, value):
         current_value = getattr(settings, key)
 
         # Create appropriate input question based on type
-        if isinstance(current_value, bool):
-            questions = [
-                inquirer.List(
-                    "value",
-                    message=f"Set {key} (current: {current_value})",
-                    choices=["true", "false"],
-                    default="true" if current_value else "false",
-                    carousel=True,
-                )
-            ]
-        else:
-            questions = [
-                inquirer.Text(
-                    "value",
-                    message=f"Set {key} (current: {current_value})",
-                    default=str(current_value),
-                )
-            ]
-
         try:
-            answers = inquirer.prompt(questions)
-            if answers is None:
+            if isinstance(current_value, bool):
+                value = pick(
+                    f"Set {key} (current: {current_value})",
+                    ["true", "false"],
+                    default=0 if current_value else 1,
+                )
+            else:
+                questions = [
+                    inquirer.Text(
+                        "value",
+                        message=f"Set {key} (current: {current_value})",
+                        default=str(current_value),
+                    )
+                ]
+                answers = inquirer.prompt(questions)
+                value = answers["value"] if answers is not None else None
+            if value is None:
                 print("Configuration cancelled.")
                 return
 
-            value = answers["value"]
-
         except KeyboardInterrupt:
             print("\nConfiguration cancelled.")
             return
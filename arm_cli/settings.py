@@ -6,16 +6,19 @@ from typing import Optional, Union
 import appdirs
 from pydantic import BaseModel
 
+from arm_cli.utils.completion import write_completion_cache
+
 
 class Settings(BaseModel):
     """Settings schema for the CLI."""
 
-    # Note: menu_page_size is currently not used due to inquirer 3.4.0 not supporting
-    # the page_size parameter in List questions. This setting is kept for potential
-    # future use if we switch to a different interactive library.
+    # Number of choices shown at once by interactive pickers (arm_cli.utils.picker)
     menu_page_size: int = 20
     global_context_path: str = "global_context.json"
     cdc_path: str = "~/code"
+    # Where the project registry is stored: "json" (global_context.json) or "sqlite"
+    # (global_context.db, for fleets with thousands of projects; migrated on first use)
+    registry_backend: str = "json"
 
 
 def get_settings_dir() -> Path:
@@ -62,6 +65,8 @@ def save_settings(settings: Settings) -> None:
     with open(settings_file, "w") as f:
         json.dump(settings.model_dump(), f, indent=2)
 
+    write_completion_cache("settings", list(Settings.model_fields))
+
 
 def get_setting(key: str) -> Optional[Union[int, str, bool]]:
     """Get a specific setting value."""
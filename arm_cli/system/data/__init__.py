@@ -0,0 +1,3 @@
+# Data directory commands for ARM CLI
+
+from . import catalog, export, prune, sync, usage
@@ -0,0 +1,500 @@
+"""A SQLite catalog of the files in the data directories, for queries by time and source.
+
+`index` records the path, size, mtime and source of every file under the given
+directories. The source is the file's directory relative to the indexed root, cut to
+SOURCE_DEPTH levels: /DATA/images/front/2024-05-01/0.jpg indexed from /DATA has the
+source images/front. Every directory belongs to a single indexed root, so its source
+never depends on which index ran last: a directory inside an indexed root cannot be
+indexed on its own, and indexing a directory that contains indexed roots takes them
+over. Directories are scanned in parallel and their mtimes stored, so like `data usage`
+a repeat index only rescans the directories whose entries changed, and drops the ones
+that are gone.
+
+`query` selects files by mtime range and source through the indexes on (mtime) and
+(source, mtime), streaming rows as SQLite returns them.
+"""
+
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import appdirs
+import click
+
+from arm_cli.config import get_active_project_config
+from arm_cli.registry import BUSY_TIMEOUT
+from arm_cli.system.data.prune import parse_duration
+from arm_cli.system.setup_utils import get_project_data_directory
+from arm_cli.utils.walk import WALK_WORKERS, map_tree, scan_dir
+
+SCHEMA_VERSION = 1
+SOURCE_DEPTH = 2
+# Files written per transaction while indexing, so an interrupted index keeps its work
+INDEX_BATCH_FILES = 20000
+
+_GLOB_CHARS = frozenset("*?[")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dirs_root ON dirs (root);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    source TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime);
+CREATE INDEX IF NOT EXISTS files_source_mtime ON files (source, mtime);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def get_catalog_file() -> Path:
+    """Get the SQLite database of the catalog."""
+    return Path(appdirs.user_cache_dir("arm-cli")) / "data_catalog.db"
+
+
+def get_source(path: str, root: str) -> str:
+    """Get the source of the files in a directory: its first SOURCE_DEPTH levels under root."""
+    rel = os.path.relpath(path, root)
+    return "" if rel == "." else "/".join(rel.split(os.sep)[:SOURCE_DEPTH])
+
+
+def is_within(path: str, root: str) -> bool:
+    """Whether a path is root or somewhere below it."""
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def parse_time(value: str, now: Optional[float] = None) -> float:
+    """Parse a local date and time, a time of today (14:30) or a duration ago (2h).
+
+    Raises:
+        ValueError: If the value is none of these.
+    """
+    now = time.time() if now is None else now
+    try:
+        clock = datetime.strptime(value, "%H:%M")
+    except ValueError:
+        try:
+            clock = datetime.strptime(value, "%H:%M:%S")
+        except ValueError:
+            clock = None
+    if clock is not None:
+        today = datetime.fromtimestamp(now)
+        return today.replace(
+            hour=clock.hour, minute=clock.minute, second=clock.second, microsecond=0
+        ).timestamp()
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    try:
+        return now - parse_duration(value)
+    except ValueError:
+        raise ValueError(f"Invalid time: {value}") from None
+
+
+class CatalogFile(NamedTuple):
+    path: str
+    size: int
+    mtime: float
+    source: str
+
+
+class DirScan(NamedTuple):
+    """A directory as indexed; files is None when it did not change since the last index."""
+
+    path: str
+    mtime_ns: int
+    files: Optional[List[Tuple[str, int, float]]]
+    subdirs: List[str]
+    error: Optional[str] = None
+
+
+class DataCatalog:
+    """Files under indexed directories, with the directories' mtimes at the last index."""
+
+    def __init__(self, db_file: Path):
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: every statement is its own transaction unless wrapped in one
+        self._db = sqlite3.connect(str(db_file), timeout=BUSY_TIMEOUT, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.execute(
+            "INSERT OR IGNORE INTO state (key, value) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+
+    def close(self) -> None:
+        # Keeps the planner's statistics current, so queries pick the narrower index
+        self._db.execute("PRAGMA optimize")
+        self._db.close()
+
+    def is_indexed(self, path: str) -> bool:
+        """Whether a directory was found by an index."""
+        return self._db.execute("SELECT 1 FROM dirs WHERE path = ?", (path,)).fetchone() is not None
+
+    def get_roots(self) -> List[str]:
+        """Get the directories indexed as roots."""
+        return [root for root, in self._db.execute("SELECT DISTINCT root FROM dirs")]
+
+    def get_root(self, path: str) -> Optional[str]:
+        """Get the indexed root whose tree holds a directory."""
+        row = self._db.execute("SELECT root FROM dirs WHERE path = ?", (path,)).fetchone()
+        return None if row is None else row[0]
+
+    def get_dirs(self, root: str) -> Dict[str, Tuple[Optional[str], int]]:
+        """Get the directories last indexed from a root, as path -> (parent, mtime_ns)."""
+        rows = self._db.execute("SELECT path, parent, mtime_ns FROM dirs WHERE root = ?", (root,))
+        return {path: (parent, mtime_ns) for path, parent, mtime_ns in rows}
+
+    def update_dirs(self, root: str, scans: Sequence[DirScan]) -> None:
+        """Replace the files of rescanned directories, in one transaction."""
+        with self._transaction():
+            for scan in scans:
+                source = get_source(scan.path, root)
+                self._db.execute("DELETE FROM files WHERE dir = ?", (scan.path,))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO files (path, dir, source, size, mtime)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (os.path.join(scan.path, name), scan.path, source, size, mtime)
+                        for name, size, mtime in scan.files or []
+                    ],
+                )
+                self._db.execute(
+                    "INSERT INTO dirs (path, root, parent, mtime_ns) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (path) DO UPDATE SET root = excluded.root,"
+                    " parent = excluded.parent, mtime_ns = excluded.mtime_ns",
+                    (
+                        scan.path,
+                        root,
+                        None if scan.path == root else os.path.dirname(scan.path),
+                        scan.mtime_ns,
+                    ),
+                )
+
+    def remove_dirs(self, paths: Sequence[str]) -> None:
+        """Forget directories and their files, in one transaction."""
+        with self._transaction():
+            for path in paths:
+                self._db.execute("DELETE FROM files WHERE dir = ?", (path,))
+                self._db.execute("DELETE FROM dirs WHERE path = ?", (path,))
+
+    def query(
+        self,
+        roots: Sequence[str] = (),
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        sources: Sequence[str] = (),
+    ) -> Iterator[CatalogFile]:
+        """Yield the files under the roots modified in [since, until), oldest first.
+
+        Sources are glob patterns such as images/front or images/*.
+        """
+        clauses = []
+        params: List[object] = []
+        if roots:
+            # Paths under root sort between "root/" and "root0" ("0" follows "/")
+            clauses.append("(" + " OR ".join("(path > ? AND path < ?)" for _ in roots) + ")")
+            for root in roots:
+                params += [root.rstrip(os.sep) + os.sep, root.rstrip(os.sep) + "0"]
+        if since is not None:
+            clauses.append("mtime >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("mtime < ?")
+            params.append(until)
+        if sources:
+            # Exact sources compare with =, so the (source, mtime) index serves the time range
+            exact = [source for source in sources if not _GLOB_CHARS.intersection(source)]
+            patterns = [source for source in sources if _GLOB_CHARS.intersection(source)]
+            matches = ["source GLOB ?" for _ in patterns]
+            if exact:
+                matches.append(f"source IN ({', '.join('?' for _ in exact)})")
+            clauses.append("(" + " OR ".join(matches) + ")")
+            params += patterns + exact
+        sql = "SELECT path, size, mtime, source FROM files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        for row in self._db.execute(sql + " ORDER BY mtime, path", params):
+            yield CatalogFile(*row)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+
+class IndexStats(NamedTuple):
+    dirs: int
+    scanned: int
+    files: int
+    removed: int
+    errors: List[Tuple[str, str]]
+
+
+def scan_catalog_dir(path: str, cached: Optional[Tuple[Optional[str], int]]) -> DirScan:
+    """Scan a directory for the catalog unless its mtime matches the cached one."""
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        return DirScan(path, 0, None, [], e.strerror)
+    if cached is not None and cached[1] == st.st_mtime_ns:
+        return DirScan(path, st.st_mtime_ns, None, [])
+    walked = scan_dir(path)
+    if walked.error is not None:
+        return DirScan(path, st.st_mtime_ns, None, [], walked.error.strerror)
+    files = []
+    subdirs = []
+    for entry, entry_st in walked.entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        else:
+            files.append((entry.name, entry_st.st_size, entry_st.st_mtime))
+    return DirScan(path, st.st_mtime_ns, files, subdirs)
+
+
+def index_trees(
+    catalog: DataCatalog,
+    roots: Sequence[str],
+    refresh: bool = False,
+    workers: int = WALK_WORKERS,
+) -> IndexStats:
+    """Bring the catalog up to date with the directories under the roots.
+
+    Roots indexed before that are inside one of the roots are indexed again as part of it.
+
+    Raises:
+        ValueError: If a root is inside another root, or inside a root indexed before.
+    """
+    indexed = catalog.get_roots()
+    for root in roots:
+        for other in [*roots, *indexed]:
+            if other != root and is_within(root, other):
+                raise ValueError(f"{root} is inside {other}, index that instead")
+
+    dirs = scanned = files = removed = 0
+    errors = []
+    for root in roots:
+        # Sources are relative to the root, so directories taken over are scanned again
+        nested = [other for other in indexed if other != root and is_within(other, root)]
+        for other in nested:
+            catalog.remove_dirs(list(catalog.get_dirs(other)))
+        cached = catalog.get_dirs(root)
+        cached_children: Dict[str, List[str]] = {}
+        for path, (parent, _) in cached.items():
+            if parent is not None:
+                cached_children.setdefault(parent, []).append(path)
+        seen = set()
+        batch: List[DirScan] = []
+        batch_files = 0
+
+        def visit(path: str) -> DirScan:
+            return scan_catalog_dir(path, None if refresh else cached.get(path))
+
+        def children(scan: DirScan) -> List[str]:
+            # Unchanged or unreadable directories keep the subdirectories of the last index
+            if scan.files is None:
+                return cached_children.get(scan.path, [])
+            return scan.subdirs
+
+        for scan in map_tree([root], visit, children, workers):
+            if scan.error is not None and scan.path not in cached:
+                errors.append((scan.path, scan.error))
+                continue
+            seen.add(scan.path)
+            dirs += 1
+            if scan.error is not None:
+                errors.append((scan.path, scan.error))
+            elif scan.files is not None:
+                scanned += 1
+                batch.append(scan)
+                batch_files += len(scan.files)
+                if batch_files >= INDEX_BATCH_FILES:
+                    catalog.update_dirs(root, batch)
+                    files += batch_files
+                    batch, batch_files = [], 0
+        catalog.update_dirs(root, batch)
+        files += batch_files
+        gone = [path for path in cached if path not in seen]
+        catalog.remove_dirs(gone)
+        removed += len(gone)
+    return IndexStats(dirs, scanned, files, removed, errors)
+
+
+def _get_roots(ctx, paths: Sequence[str]) -> List[str]:
+    if not paths:
+        paths = [get_project_data_directory(get_active_project_config(ctx.obj["config"]))]
+    return [os.path.abspath(path) for path in paths]
+
+
+def print_index_stats(stats: IndexStats, elapsed: float) -> None:
+    print(
+        f"Indexed {stats.dirs} directories in {elapsed:.2f}s: rescanned {stats.scanned} "
+        f"({stats.files} files), removed {stats.removed}.",
+        file=sys.stderr,
+    )
+    for path, error in stats.errors:
+        print(f"Warning: could not read {path}: {error}", file=sys.stderr)
+
+
+def _index(ctx, paths: Sequence[str], refresh: bool, jobs: int):
+    """Catalog the files in the data directories for `data query`
+
+    Without PATHS, indexes the active project's data directory. Repeat runs only
+    rescan directories whose entries changed; --refresh rescans everything. A
+    directory inside an indexed one is indexed as part of it, not on its own.
+    """
+    roots = _get_roots(ctx, paths)
+    missing = [root for root in roots if not os.path.isdir(root)]
+    if missing:
+        print(f"Error: not a directory: {', '.join(missing)}")
+        sys.exit(1)
+
+    start = time.monotonic()
+    catalog = DataCatalog(get_catalog_file())
+    try:
+        stats = index_trees(catalog, roots, refresh=refresh, workers=jobs)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        catalog.close()
+    print_index_stats(stats, time.monotonic() - start)
+
+
+def _query(
+    ctx,
+    paths: Sequence[str],
+    since: Optional[str],
+    until: Optional[str],
+    sources: Sequence[str],
+    long: bool,
+    null: bool,
+    output: Optional[str],
+    update: bool,
+):
+    """List cataloged files by time range and source, oldest first
+
+    Without PATHS, lists files in the active project's data directory. Times are
+    local, as 2024-05-01, "2024-05-01 14:00", 14:00 (today) or a duration ago (2h).
+    Sources are directories two levels below the indexed directory, such as
+    images/front, and may be glob patterns (images/*).
+    """
+    roots = _get_roots(ctx, paths)
+    try:
+        since_time = None if since is None else parse_time(since)
+        until_time = None if until is None else parse_time(until)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    catalog = DataCatalog(get_catalog_file())
+    try:
+        if update:
+            # Directories inside an indexed root are updated with the rest of that root
+            update_roots = sorted({catalog.get_root(root) or root for root in roots})
+            start = time.monotonic()
+            try:
+                stats = index_trees(catalog, update_roots)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            print_index_stats(stats, time.monotonic() - start)
+        not_indexed = [root for root in roots if not catalog.is_indexed(root)]
+        if not_indexed:
+            print(f"Error: not indexed: {', '.join(not_indexed)}")
+            print("Run `arm-cli system data index` first, or pass --update.")
+            sys.exit(1)
+
+        out = sys.stdout if output is None else open(output, "w")
+        count = size = 0
+        try:
+            for f in catalog.query(roots, since_time, until_time, sources):
+                if long:
+                    mtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(f.mtime))
+                    line = f"{mtime}  {f.size:>12}  {f.source}  {f.path}"
+                else:
+                    line = f.path
+                out.write(line + ("\0" if null else "\n"))
+                count += 1
+                size += f.size
+        finally:
+            if output is not None:
+                out.close()
+    finally:
+        catalog.close()
+    if output is not None:
+        print(f"Wrote {count} files ({size / 1e6:.1f} MB) to {output}")
+
+
+# Create the command objects
+index = click.command(name="index")(
+    click.argument("paths", nargs=-1, type=click.Path(file_okay=False))(
+        click.option("--refresh", is_flag=True, help="Rescan every directory")(
+            click.option(
+                "-j",
+                "--jobs",
+                default=WALK_WORKERS,
+                show_default=True,
+                type=click.IntRange(min=1),
+                help="Directories scanned at once",
+            )(click.pass_context(_index))
+        )
+    )
+)
+
+query = click.command(name="query")(
+    click.argument("paths", nargs=-1, type=click.Path(file_okay=False))(
+        click.option("--since", default=None, help="Files modified at or after this time")(
+            click.option("--until", default=None, help="Files modified before this time")(
+                click.option(
+                    "--source",
+                    "sources",
+                    multiple=True,
+                    help="Source directory or glob, e.g. images/front (repeatable)",
+                )(
+                    click.option("-l", "--long", is_flag=True, help="Show mtime, size and source")(
+                        click.option(
+                            "-0", "--null", is_flag=True, help="End entries with NUL, for xargs -0"
+                        )(
+                            click.option(
+                                "-o",
+                                "--output",
+                                default=None,
+                                type=click.Path(dir_okay=False),
+                                help="Write the file list to this file instead of stdout",
+                            )(
+                                click.option(
+                                    "--update", is_flag=True, help="Update the index first"
+                                )(click.pass_context(_query))
+                            )
+                        )
+                    )
+                )
+            )
+        )
+    )
+)
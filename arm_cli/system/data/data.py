@@ -0,0 +1,31 @@
+import click
+
+# Import the modules and access the command objects
+import arm_cli.system.data.catalog
+import arm_cli.system.data.export
+import arm_cli.system.data.prune
+import arm_cli.system.data.sync
+import arm_cli.system.data.usage
+
+# Get the command objects
+export = arm_cli.system.data.export.export
+index = arm_cli.system.data.catalog.index
+prune = arm_cli.system.data.prune.prune_cmd
+query = arm_cli.system.data.catalog.query
+sync = arm_cli.system.data.sync.sync
+usage = arm_cli.system.data.usage.usage
+
+
+@click.group()
+def data():
+    """Inspect and manage the data directories"""
+    pass
+
+
+# Register all data commands
+data.add_command(export)
+data.add_command(index)
+data.add_command(prune)
+data.add_command(query)
+data.add_command(sync)
+data.add_command(usage)
@@ -0,0 +1,193 @@
+"""Export the files of a time range in the data directory as a compressed tar stream.
+
+Files are selected through the catalog (see `arm_cli.system.data.catalog`), which is
+brought up to date first, and come oldest first as SQLite returns them. Each file is
+read in chunks straight into the tar stream, which is compressed as it goes: zstd on
+its own worker threads, gzip in blocks compressed in parallel. Nothing is staged on
+disk and memory use does not depend on how much is exported, so the archive can be
+piped to ssh or an upload as it is written.
+"""
+
+import io
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import click
+
+from arm_cli.config import get_active_project_config
+from arm_cli.system.data.catalog import (
+    CatalogFile,
+    DataCatalog,
+    get_catalog_file,
+    index_trees,
+    parse_time,
+    print_index_stats,
+)
+from arm_cli.system.setup_utils import get_project_data_directory
+from arm_cli.utils.streams import get_default_compression, iter_files_tar, open_compressed_writer
+
+
+class ExportStats:
+    """Counters of an export."""
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.tar_bytes = 0
+        self.written_bytes = 0
+        self.start = time.monotonic()
+
+
+class _CountingWriter(io.RawIOBase):
+    """Pass-through writer counting the bytes written; close() leaves the wrapped file open."""
+
+    def __init__(self, fileobj, stats: ExportStats):
+        self._fileobj = fileobj
+        self._stats = stats
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._fileobj.write(b)
+        self._stats.written_bytes += len(b)
+        return len(b)
+
+    def flush(self) -> None:
+        self._fileobj.flush()
+
+
+def export_files(
+    files: Iterable[CatalogFile],
+    root: str,
+    out,
+    compression: str,
+    workers: Optional[int] = None,
+) -> ExportStats:
+    """Write files as a compressed tar, named relative to root, to a binary file object."""
+    stats = ExportStats()
+
+    def entries():
+        for f in files:
+            stats.files += 1
+            yield Path(f.path), os.path.relpath(f.path, root)
+
+    compressed = open_compressed_writer(_CountingWriter(out, stats), compression, workers)
+    for chunk in iter_files_tar(entries()):
+        compressed.write(chunk)
+        stats.tar_bytes += len(chunk)
+    compressed.close()
+    out.flush()
+    return stats
+
+
+def _export(
+    ctx,
+    since: Optional[str],
+    until: Optional[str],
+    sources: Sequence[str],
+    output: str,
+    compression: str,
+    jobs: int,
+    update: bool,
+):
+    """Export the files of a time range as a compressed tar archive
+
+    Selects files in the active project's data directory by mtime and source, like
+    `data query`, updating the catalog first. Use -o - to write the archive to stdout.
+    """
+    root = os.path.abspath(get_project_data_directory(get_active_project_config(ctx.obj["config"])))
+    try:
+        since_time = None if since is None else parse_time(since)
+        until_time = None if until is None else parse_time(until)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    if compression == "auto":
+        compression = get_default_compression()
+
+    catalog = DataCatalog(get_catalog_file())
+    try:
+        if update:
+            # A data directory inside an indexed root is updated with the rest of that root
+            start = time.monotonic()
+            try:
+                stats = index_trees(catalog, [catalog.get_root(root) or root])
+            except ValueError as e:
+                click.echo(f"Error: {e}", err=True)
+                sys.exit(1)
+            print_index_stats(stats, time.monotonic() - start)
+        if not catalog.is_indexed(root):
+            click.echo(f"Error: not indexed: {root}", err=True)
+            click.echo("Run `arm-cli system data index` first, or drop --no-update.", err=True)
+            sys.exit(1)
+
+        files = catalog.query([root], since_time, until_time, sources)
+        # Progress goes to stderr so the archive itself can be streamed to stdout
+        click.echo(f"Exporting from {root} ({compression}, {jobs} workers)...", err=True)
+        try:
+            if output == "-":
+                stats = export_files(files, root, sys.stdout.buffer, compression, jobs)
+            else:
+                with open(output, "wb") as f:
+                    stats = export_files(files, root, f, compression, jobs)
+        except (OSError, RuntimeError) as e:
+            click.echo(f"Error exporting: {e}", err=True)
+            sys.exit(1)
+    finally:
+        catalog.close()
+
+    elapsed = max(time.monotonic() - stats.start, 1e-6)
+    click.echo(
+        f"Exported {stats.files} files: {stats.tar_bytes / 1e6:.1f} MB compressed to "
+        f"{stats.written_bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+        f"({stats.tar_bytes / 1e6 / elapsed:.1f} MB/s in, "
+        f"{stats.written_bytes / 1e6 / elapsed:.1f} MB/s out)",
+        err=True,
+    )
+
+
+# Create the command object
+export = click.command(name="export")(
+    click.option("--since", default=None, help="Files modified at or after this time")(
+        click.option("--until", default=None, help="Files modified before this time")(
+            click.option(
+                "--source",
+                "sources",
+                multiple=True,
+                help="Source directory or glob, e.g. images/front (repeatable)",
+            )(
+                click.option(
+                    "-o", "--output", required=True, help="Archive file to write, or '-' for stdout"
+                )(
+                    click.option(
+                        "--compression",
+                        type=click.Choice(["auto", "zstd", "gzip", "none"]),
+                        default="auto",
+                        show_default=True,
+                        help="Compression codec (auto uses zstd when the zstandard package is "
+                        "installed)",
+                    )(
+                        click.option(
+                            "-j",
+                            "--jobs",
+                            default=os.cpu_count() or 1,
+                            show_default=True,
+                            type=click.IntRange(min=1),
+                            help="Compression threads",
+                        )(
+                            click.option(
+                                "--update/--no-update",
+                                default=True,
+                                show_default=True,
+                                help="Update the catalog before selecting files",
+                            )(click.pass_context(_export))
+                        )
+                    )
+                )
+            )
+        )
+    )
+)
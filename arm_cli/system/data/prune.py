@@ -0,0 +1,379 @@
+"""Delete old recordings under the data directory by age, total size and newest N kept.
+
+The retention policy comes from the project config:
+
+    "retention_directory": "images",     (under data_directory, the default)
+    "retention_max_age": "30d",          (files last modified longer ago are deleted)
+    "retention_max_size": "200G",        (oldest files are deleted beyond this size)
+    "retention_keep_latest": 100         (newest files per camera are always kept)
+
+Cameras are the directories right under the retention directory. The tree is walked
+without collecting the list of files: a heap per camera holds its newest files, files
+pushed out of it can be deleted by age right away, and the rest only add to a
+histogram of sizes by minute. If the survivors exceed the size quota, the histogram
+gives the age to cut at and a second walk deletes the files older than that.
+Deletions go in batches, rate limited so recorders still get their share of I/O.
+"""
+
+import heapq
+import math
+import os
+import re
+import stat
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import click
+
+from arm_cli.config import get_active_project_config
+from arm_cli.system.data.usage import disk_usage
+from arm_cli.system.registry_cache import parse_size
+from arm_cli.system.setup_utils import get_project_data_directory
+from arm_cli.utils.walk import WALK_WORKERS, walk_parallel
+
+DEFAULT_RETENTION_DIRECTORY = "images"
+DELETE_BATCH_SIZE = 200
+DEFAULT_DELETE_RATE = 500.0
+# Granularity of the quota cut: at most one minute of extra files is deleted
+_BUCKET_SECONDS = 60
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*$", re.IGNORECASE)
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration such as 90m, 12h, 30d or 2w into seconds (plain numbers are days)."""
+    match = _DURATION_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    number, unit = match.groups()
+    return float(number) * _DURATION_UNITS[unit.lower() or "d"]
+
+
+class RetentionPolicy(NamedTuple):
+    directory: str
+    max_age: Optional[float] = None
+    max_size: Optional[int] = None
+    keep_latest: Optional[int] = None
+
+    def describe(self) -> str:
+        rules = []
+        if self.max_age is not None:
+            rules.append(f"older than {self.max_age / 86400:g} days")
+        if self.max_size is not None:
+            rules.append(f"oldest beyond {self.max_size / 1e6:.1f} MB")
+        if self.keep_latest is not None:
+            rules.append(f"keeping the newest {self.keep_latest} per camera")
+        return ", ".join(rules)
+
+
+def get_retention_policy(
+    project_config,
+    directory: Optional[str] = None,
+    max_age: Optional[str] = None,
+    max_size: Optional[str] = None,
+    keep_latest: Optional[int] = None,
+) -> RetentionPolicy:
+    """Get the retention policy of a project, with the given values overriding it.
+
+    Raises:
+        ValueError: If a duration or size is invalid.
+    """
+
+    def setting(value, name):
+        if value is not None:
+            return value
+        return getattr(project_config, name, None) if project_config else None
+
+    directory = setting(directory, "retention_directory") or DEFAULT_RETENTION_DIRECTORY
+    directory = os.path.join(get_project_data_directory(project_config), directory)
+    max_age = setting(max_age, "retention_max_age")
+    max_size = setting(max_size, "retention_max_size")
+    return RetentionPolicy(
+        directory=os.path.abspath(os.path.expanduser(directory)),
+        max_age=None if max_age is None else parse_duration(max_age),
+        max_size=None if max_size is None else parse_size(max_size),
+        keep_latest=setting(keep_latest, "retention_keep_latest"),
+    )
+
+
+class PruneStats:
+    """What a prune deleted (or would delete) and kept."""
+
+    def __init__(self) -> None:
+        self.scanned = 0
+        self.deleted: Dict[str, List[int]] = {"age": [0, 0], "quota": [0, 0]}
+        self.kept = [0, 0]
+        self.errors: List[str] = []
+        self.start = time.monotonic()
+
+    @property
+    def deleted_files(self) -> int:
+        return sum(files for files, _ in self.deleted.values())
+
+    @property
+    def deleted_bytes(self) -> int:
+        return sum(size for _, size in self.deleted.values())
+
+
+class BatchDeleter:
+    """Delete files in batches of batch_size, at most `rate` files per second."""
+
+    def __init__(
+        self,
+        stats: PruneStats,
+        dry_run: bool = False,
+        rate: float = DEFAULT_DELETE_RATE,
+        batch_size: int = DELETE_BATCH_SIZE,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.stats = stats
+        self.dry_run = dry_run
+        self.rate = rate
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.emptied_dirs: Set[str] = set()
+        self._batch: List[Tuple[str, int, str]] = []
+        self._batch_start = time.monotonic()
+
+    def add(self, path: str, size: int, reason: str) -> None:
+        self._batch.append((path, size, reason))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for path, size, reason in self._batch:
+            if not self.dry_run:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    self.stats.errors.append(f"{path}: {e.strerror}")
+                    continue
+                self.emptied_dirs.add(os.path.dirname(path))
+            self.stats.deleted[reason][0] += 1
+            self.stats.deleted[reason][1] += size
+        if self._batch and not self.dry_run:
+            # Spread deletions out so that the batch took at least batch / rate seconds
+            remaining = len(self._batch) / self.rate - (time.monotonic() - self._batch_start)
+            if remaining > 0:
+                self.sleep(remaining)
+        self._batch = []
+        self._batch_start = time.monotonic()
+
+
+def _iter_files(root: str, workers: int):
+    """Yield (camera, path, stat) for every regular file under root, streaming."""
+    for walked in walk_parallel([root], workers):
+        if walked.error is not None:
+            yield None, walked.path, walked.error
+            continue
+        rel = os.path.relpath(walked.path, root)
+        camera = "." if rel == "." else rel.split(os.sep, 1)[0]
+        for entry, st in walked.entries:
+            if stat.S_ISREG(st.st_mode):
+                yield camera, entry.path, st
+
+
+def remove_empty_dirs(dirs: Set[str], root: str) -> None:
+    """Remove directories left empty, deepest first, keeping root and the cameras."""
+    min_depth = root.rstrip(os.sep).count(os.sep) + 2
+    # Deepest first, so a parent is only tried once its emptied children are gone
+    pending = [(-d.count(os.sep), d) for d in dirs]
+    heapq.heapify(pending)
+    queued = set(dirs)
+    while pending:
+        negative_depth, directory = heapq.heappop(pending)
+        if -negative_depth < min_depth:
+            continue
+        try:
+            os.rmdir(directory)
+        except OSError:
+            continue
+        parent = os.path.dirname(directory)
+        if parent not in queued:
+            queued.add(parent)
+            heapq.heappush(pending, (negative_depth + 1, parent))
+
+
+def prune(
+    policy: RetentionPolicy,
+    dry_run: bool = False,
+    rate: float = DEFAULT_DELETE_RATE,
+    workers: int = WALK_WORKERS,
+    now: Optional[float] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> PruneStats:
+    """Apply a retention policy to its directory."""
+    stats = PruneStats()
+    deleter = BatchDeleter(stats, dry_run=dry_run, rate=rate, sleep=sleep)
+    age_cutoff = -math.inf if policy.max_age is None else (now or time.time()) - policy.max_age
+    keep = policy.keep_latest or 0
+    newest: Dict[str, List[Tuple[float, str, int]]] = {}
+    histogram: Dict[int, int] = {}
+    survivors = 0
+
+    def unprotected(mtime: float, path: str, size: int) -> None:
+        nonlocal survivors
+        if mtime < age_cutoff:
+            deleter.add(path, size, "age")
+        else:
+            survivors += size
+            bucket = int(mtime // _BUCKET_SECONDS)
+            histogram[bucket] = histogram.get(bucket, 0) + size
+
+    for camera, path, st in _iter_files(policy.directory, workers):
+        if camera is None:
+            stats.errors.append(f"{path}: {st.strerror}")
+            continue
+        stats.scanned += 1
+        item = (st.st_mtime, path, disk_usage(st))
+        if keep:
+            heap = newest.setdefault(camera, [])
+            if len(heap) < keep:
+                heapq.heappush(heap, item)
+                continue
+            # The oldest of the newest files plus this one can no longer be kept for being new
+            item = heapq.heappushpop(heap, item)
+        unprotected(*item)
+    deleter.flush()
+
+    protected = {path for heap in newest.values() for _, path, _ in heap}
+    protected_bytes = sum(size for heap in newest.values() for _, _, size in heap)
+
+    quota_cutoff = -math.inf
+    if policy.max_size is not None and survivors + protected_bytes > policy.max_size:
+        excess = survivors + protected_bytes - policy.max_size
+        freed = 0
+        for bucket in sorted(histogram):
+            freed += histogram[bucket]
+            quota_cutoff = (bucket + 1) * _BUCKET_SECONDS
+            if freed >= excess:
+                break
+        if freed < excess:
+            stats.errors.append(f"the newest {keep} files per camera alone exceed the size quota")
+
+    if quota_cutoff > -math.inf:
+        for camera, path, st in _iter_files(policy.directory, workers):
+            if camera is None or path in protected or st.st_mtime < age_cutoff:
+                continue
+            if st.st_mtime < quota_cutoff:
+                deleter.add(path, disk_usage(st), "quota")
+        deleter.flush()
+
+    stats.kept = [
+        stats.scanned - stats.deleted_files,
+        survivors + protected_bytes - stats.deleted["quota"][1],
+    ]
+    if not dry_run:
+        remove_empty_dirs(deleter.emptied_dirs, policy.directory)
+    return stats
+
+
+def _prune(
+    ctx,
+    directory: Optional[str],
+    max_age: Optional[str],
+    max_size: Optional[str],
+    keep_latest: Optional[int],
+    dry_run: bool,
+    rate: float,
+    yes: bool,
+    jobs: int,
+):
+    """Delete old recordings by the project's retention policy
+
+    The policy is read from the project config (retention_max_age,
+    retention_max_size, retention_keep_latest and retention_directory, which
+    defaults to images under the data directory); options override it.
+    """
+    config = ctx.obj["config"]
+    project_config = get_active_project_config(config)
+    try:
+        policy = get_retention_policy(project_config, directory, max_age, max_size, keep_latest)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if policy.max_age is None and policy.max_size is None:
+        print("No retention policy: set retention_max_age or retention_max_size in the")
+        print("project config, or pass --max-age or --max-size.")
+        sys.exit(1)
+    if not os.path.isdir(policy.directory):
+        print(f"Error: not a directory: {policy.directory}")
+        sys.exit(1)
+
+    print(f"Pruning {policy.directory}: {policy.describe()}")
+    if not dry_run and not yes and not click.confirm("Delete the matching files?"):
+        print("Prune cancelled.")
+        return
+
+    stats = prune(policy, dry_run=dry_run, rate=rate, workers=jobs)
+    verb = "Would delete" if dry_run else "Deleted"
+    details = ", ".join(
+        f"{files} by {reason} ({size / 1e6:.1f} MB)"
+        for reason, (files, size) in stats.deleted.items()
+        if files
+    )
+    print(
+        f"{verb} {stats.deleted_files} of {stats.scanned} files, "
+        f"reclaiming {stats.deleted_bytes / 1e6:.1f} MB"
+        + (f": {details}" if details else "")
+        + f", in {time.monotonic() - stats.start:.1f}s."
+    )
+    print(f"Kept {stats.kept[0]} files ({stats.kept[1] / 1e6:.1f} MB).")
+    if stats.errors:
+        for error in stats.errors[:10]:
+            print(f"  {error}")
+        print(f"{len(stats.errors)} error(s).")
+        sys.exit(1)
+
+
+# Create the command object
+prune_cmd = click.command(name="prune")(
+    click.option(
+        "--directory",
+        default=None,
+        help="Directory to prune, relative to the data directory [default: images]",
+    )(
+        click.option("--max-age", default=None, help="Delete files older than this, e.g. 30d")(
+            click.option(
+                "--max-size", default=None, help="Delete the oldest files beyond this, e.g. 200G"
+            )(
+                click.option(
+                    "--keep-latest",
+                    default=None,
+                    type=click.IntRange(min=0),
+                    help="Always keep this many newest files per camera directory",
+                )(
+                    click.option(
+                        "-n", "--dry-run", is_flag=True, help="Only report what would be deleted"
+                    )(
+                        click.option(
+                            "--rate",
+                            default=DEFAULT_DELETE_RATE,
+                            show_default=True,
+                            type=click.FloatRange(min=1),
+                            help="Most files deleted per second",
+                        )(
+                            click.option(
+                                "-y", "--yes", is_flag=True, help="Skip the confirmation prompt"
+                            )(
+                                click.option(
+                                    "-j",
+                                    "--jobs",
+                                    default=WALK_WORKERS,
+                                    show_default=True,
+                                    type=click.IntRange(min=1),
+                                    help="Directories scanned at once",
+                                )(click.pass_context(_prune))
+                            )
+                        )
+                    )
+                )
+            )
+        )
+    )
+)
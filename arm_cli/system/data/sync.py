@@ -0,0 +1,453 @@
+"""Copy new and changed files from one data directory to another, resumably.
+
+Source and destination directories are scanned side by side with the parallel walker
+(see `arm_cli.utils.walk`): a file is copied when it is missing from the destination
+or differs in size or mtime (to the second), or with --checksum when its SHA-256
+differs. Copies run in a pool of workers as soon as their directory is compared, go
+through `copy_file_range` or `sendfile` so the data never enters Python, and land in
+a temporary file renamed into place with the source's mode and mtime.
+
+The files to copy and those copied are appended to a checkpoint. A sync interrupted
+after the scan resumes with the remaining files, without scanning again; one
+interrupted during the scan, or that ran to the end with errors, scans again,
+skipping the files already copied. Files only in the destination are left alone.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import stat
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, TextIO, Tuple
+
+import appdirs
+import click
+
+from arm_cli.utils.walk import map_tree, scan_dir
+
+SYNC_WORKERS = 4
+# Bytes copied per copy_file_range or sendfile call, and per read when hashing
+COPY_CHUNK = 8 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+_TMP_SUFFIX = ".arm-sync"
+# Errors that mean the kernel cannot do an in-kernel copy between these files
+_NO_KERNEL_COPY = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+# A file to sync: "copy" when it differs, "hash" to copy it if its content differs
+SyncTask = Tuple[str, str, int]
+
+
+def get_sync_checkpoint_file(src: str, dst: str) -> Path:
+    """Get the checkpoint of an interrupted sync from src to dst."""
+    key = hashlib.sha256(f"{src}\0{dst}".encode()).hexdigest()[:16]
+    return Path(appdirs.user_cache_dir("arm-cli")) / "data_sync" / f"{key}.checkpoint"
+
+
+def _copy_with(copy: Callable[[int, int, int, int], int], fsrc: int, fdst: int, size: int) -> int:
+    """Copy from the current offset with copy(fsrc, fdst, offset, count); return the offset."""
+    offset = os.lseek(fdst, 0, os.SEEK_CUR)
+    while offset < size:
+        copied = copy(fsrc, fdst, offset, min(COPY_CHUNK, size - offset))
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def copy_data(fsrc: int, fdst: int, size: int) -> None:
+    """Copy size bytes between file descriptors, in the kernel when it can."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            _copy_with(
+                lambda s, d, offset, count: os.copy_file_range(s, d, count, offset),
+                fsrc,
+                fdst,
+                size,
+            )
+        except OSError as e:
+            if e.errno not in _NO_KERNEL_COPY:
+                raise
+    if hasattr(os, "sendfile") and os.lseek(fdst, 0, os.SEEK_CUR) < size:
+        try:
+            _copy_with(
+                lambda s, d, offset, count: os.sendfile(d, s, offset, count), fsrc, fdst, size
+            )
+        except OSError as e:
+            if e.errno not in _NO_KERNEL_COPY:
+                raise
+    # The file may have grown since it was opened, so read the rest to the end
+    os.lseek(fsrc, os.lseek(fdst, 0, os.SEEK_CUR), os.SEEK_SET)
+    while True:
+        chunk = os.read(fsrc, COPY_CHUNK)
+        if not chunk:
+            break
+        os.write(fdst, chunk)
+
+
+def copy_file(src: str, dst: str) -> int:
+    """Copy a file with its mode and mtime through a temporary file; return its size."""
+    tmp = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}{_TMP_SUFFIX}")
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    with open(src, "rb") as fsrc:
+        st = os.fstat(fsrc.fileno())
+        try:
+            with open(tmp, "wb") as fdst:
+                copy_data(fsrc.fileno(), fdst.fileno(), st.st_size)
+                os.fchmod(fdst.fileno(), stat.S_IMODE(st.st_mode))
+                size = fdst.tell()
+            os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(tmp, dst)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    return size
+
+
+def file_digest(path: str) -> str:
+    """Get the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SyncStats:
+    """Counters of a sync, read by progress reports."""
+
+    def __init__(self) -> None:
+        self.scanned = 0
+        self.planned = 0
+        self.planned_bytes = 0
+        self.copied = 0
+        self.copied_bytes = 0
+        self.unchanged = 0
+        self.resumed = 0
+        self.errors: List[str] = []
+        self.start = time.monotonic()
+
+
+class DirPlan(NamedTuple):
+    """The files of a source directory to sync, and its subdirectories, relative to src."""
+
+    rel: str
+    files: int
+    tasks: List[SyncTask]
+    subdirs: List[str]
+    error: Optional[str] = None
+
+
+class DataSync:
+    """Copy the files under src that are missing or different under dst."""
+
+    def __init__(
+        self,
+        src: str,
+        dst: str,
+        checksum: bool = False,
+        dry_run: bool = False,
+        checkpoint_file: Optional[Path] = None,
+        workers: int = SYNC_WORKERS,
+        progress: Optional[Callable[[SyncStats], None]] = None,
+    ):
+        self.src = os.path.abspath(src)
+        self.dst = os.path.abspath(dst)
+        self.checksum = checksum
+        self.dry_run = dry_run
+        self.checkpoint_file = None if dry_run else checkpoint_file
+        self.workers = workers
+        self.progress = progress
+        self.stats = SyncStats()
+        self._checkpoint: Optional[TextIO] = None
+
+    def _checkpoint_header(self) -> str:
+        return json.dumps({"src": self.src, "dst": self.dst, "checksum": self.checksum})
+
+    def _load_checkpoint(self) -> Tuple[Dict[str, SyncTask], Set[str], bool]:
+        """Get the files planned, those done and whether the scan had finished."""
+        planned: Dict[str, SyncTask] = {}
+        done: Set[str] = set()
+        scanned = False
+        if self.checkpoint_file is None:
+            return planned, done, scanned
+        try:
+            with open(self.checkpoint_file) as f:
+                if f.readline().rstrip("\n") != self._checkpoint_header():
+                    return planned, done, scanned
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line cut short by the interruption
+                        continue
+                    if record[0] in ("copy", "hash"):
+                        planned[record[1]] = (record[0], record[1], record[2])
+                    elif record[0] == "done":
+                        done.add(record[1])
+                    elif record[0] == "scanned":
+                        scanned = True
+                    elif record[0] == "rescan":
+                        # Every planned file was tried, so new files need a scan to be found
+                        planned.clear()
+                        scanned = False
+        except OSError:
+            pass
+        return planned, done, scanned
+
+    def _record(self, records: List[list]) -> None:
+        if self.checkpoint_file is None or not records:
+            return
+        try:
+            if self._checkpoint is None:
+                self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+                new = not self.checkpoint_file.exists()
+                self._checkpoint = open(self.checkpoint_file, "a")
+                if new:
+                    self._checkpoint.write(self._checkpoint_header() + "\n")
+            self._checkpoint.writelines(json.dumps(record) + "\n" for record in records)
+            self._checkpoint.flush()
+        except OSError:
+            pass
+
+    def _plan_dir(self, rel: str) -> DirPlan:
+        """Compare a source directory with its destination."""
+        src_dir = os.path.join(self.src, rel)
+        walked = scan_dir(src_dir)
+        if walked.error is not None:
+            return DirPlan(rel, 0, [], [], f"{src_dir}: {walked.error.strerror}")
+        dst_walked = scan_dir(os.path.join(self.dst, rel))
+        dst_entries = {entry.name: st for entry, st in dst_walked.entries}
+        files = 0
+        tasks: List[SyncTask] = []
+        subdirs = []
+        for entry, st in walked.entries:
+            path = os.path.join(rel, entry.name) if rel else entry.name
+            if stat.S_ISDIR(st.st_mode):
+                subdirs.append(path)
+                continue
+            if not stat.S_ISREG(st.st_mode) or entry.name.endswith(_TMP_SUFFIX):
+                continue
+            files += 1
+            dst_st = dst_entries.get(entry.name)
+            if dst_st is None or not stat.S_ISREG(dst_st.st_mode) or dst_st.st_size != st.st_size:
+                tasks.append(("copy", path, st.st_size))
+            elif self.checksum:
+                tasks.append(("hash", path, st.st_size))
+            elif int(dst_st.st_mtime) != int(st.st_mtime):
+                tasks.append(("copy", path, st.st_size))
+        return DirPlan(rel, files, tasks, subdirs)
+
+    def _sync_file(self, task: SyncTask) -> int:
+        """Copy one file, or with "hash" only if the contents differ; return bytes copied."""
+        action, rel, _ = task
+        src = os.path.join(self.src, rel)
+        dst = os.path.join(self.dst, rel)
+        if action == "hash" and file_digest(src) == file_digest(dst):
+            return -1
+        if self.dry_run:
+            return os.path.getsize(src)
+        return copy_file(src, dst)
+
+    def _scan(self, done: Set[str]):
+        """Yield the files to sync as their directories are compared, recording the plan."""
+        complete = True
+        for plan in map_tree([""], self._plan_dir, lambda plan: plan.subdirs, self.workers):
+            if plan.error is not None:
+                self.stats.errors.append(plan.error)
+                complete = False
+                continue
+            self.stats.scanned += plan.files
+            tasks = [task for task in plan.tasks if task[1] not in done]
+            self.stats.resumed += len(plan.tasks) - len(tasks)
+            self._record([list(task) for task in tasks])
+            yield from tasks
+        if complete:
+            self._record([["scanned"]])
+
+    def run(self) -> SyncStats:
+        """Sync src to dst, resuming from the checkpoint, which is removed once all is done."""
+        planned, done, scanned = self._load_checkpoint()
+        if scanned:
+            tasks = iter([task for rel, task in planned.items() if rel not in done])
+            self.stats.resumed = len(done)
+        else:
+            tasks = self._scan(done)
+
+        pending: Dict[Future, SyncTask] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                for task in tasks:
+                    self.stats.planned += 1
+                    self.stats.planned_bytes += task[2]
+                    pending[executor.submit(self._sync_file, task)] = task
+                    # Keep the scan a little ahead of the copies, not the whole tree ahead
+                    if len(pending) >= self.workers * 4:
+                        self._collect(pending, FIRST_COMPLETED)
+                self._collect(pending, None)
+                if self.stats.errors:
+                    # The retry scans again, skipping only the files already copied
+                    self._record([["rescan"]])
+            finally:
+                for future in pending:
+                    future.cancel()
+                if self._checkpoint is not None:
+                    self._checkpoint.close()
+                    self._checkpoint = None
+
+        if not self.dry_run and not self.stats.errors and self.checkpoint_file is not None:
+            try:
+                self.checkpoint_file.unlink()
+            except FileNotFoundError:
+                pass
+        return self.stats
+
+    def _collect(self, pending: Dict[Future, SyncTask], return_when: Optional[str]) -> None:
+        """Wait for copies to finish (the first or all of them) and record them as done."""
+        if return_when is None:
+            finished, _ = wait(pending)
+        else:
+            finished, _ = wait(pending, return_when=return_when)
+        records = []
+        for future in finished:
+            _, rel, _ = pending.pop(future)
+            try:
+                copied = future.result()
+            except OSError as e:
+                self.stats.errors.append(f"{os.path.join(self.src, rel)}: {e.strerror}")
+                continue
+            if copied < 0:
+                self.stats.unchanged += 1
+            else:
+                self.stats.copied += 1
+                self.stats.copied_bytes += copied
+            records.append(["done", rel])
+        self._record(records)
+        if self.progress is not None:
+            self.progress(self.stats)
+
+
+class SyncProgress:
+    """Show how far a sync got on one line, redrawn at most every interval."""
+
+    def __init__(self, min_interval: float = 0.5):
+        self.min_interval = min_interval
+        self._last_render = 0.0
+
+    def __call__(self, stats: SyncStats, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_render < self.min_interval:
+            return
+        self._last_render = now
+        rate = stats.copied_bytes / max(now - stats.start, 1e-6)
+        click.echo(
+            f"\rScanned {stats.scanned} files, copied {stats.copied} of {stats.planned} "
+            f"({stats.copied_bytes / 1e6:.1f} MB, {rate / 1e6:.1f} MB/s)",
+            nl=False,
+            err=True,
+        )
+
+    def finish(self, stats: SyncStats) -> None:
+        self(stats, force=True)
+        click.echo("", err=True)
+
+
+def _sync(
+    ctx,
+    src: str,
+    dst: str,
+    checksum: bool,
+    dry_run: bool,
+    restart: bool,
+    jobs: int,
+):
+    """Copy new and changed files from SRC to DST
+
+    Files are compared by size and mtime, or by content with --checksum, and copied
+    by JOBS workers. An interrupted sync resumes where it stopped; --restart
+    scans again from scratch. Files only in DST are kept.
+    """
+    src = os.path.abspath(src)
+    dst = os.path.abspath(dst)
+    if dst == src or dst.startswith(src.rstrip(os.sep) + os.sep):
+        print(f"Error: {dst} is inside {src}")
+        sys.exit(1)
+
+    checkpoint_file = get_sync_checkpoint_file(src, dst)
+    if restart and checkpoint_file.exists():
+        checkpoint_file.unlink()
+    progress = SyncProgress() if sys.stderr.isatty() else None
+    syncer = DataSync(
+        src,
+        dst,
+        checksum=checksum,
+        dry_run=dry_run,
+        checkpoint_file=checkpoint_file,
+        workers=jobs,
+        progress=progress,
+    )
+    try:
+        stats = syncer.run()
+    except KeyboardInterrupt:
+        if progress is not None:
+            progress.finish(syncer.stats)
+        print("Sync interrupted; run it again to resume.")
+        sys.exit(130)
+    if progress is not None:
+        progress.finish(stats)
+
+    elapsed = time.monotonic() - stats.start
+    rate = stats.copied_bytes / max(elapsed, 1e-6)
+    verb = "Would copy" if dry_run else "Copied"
+    print(
+        f"{verb} {stats.copied} files ({stats.copied_bytes / 1e6:.1f} MB) "
+        f"in {elapsed:.1f}s, {rate / 1e6:.1f} MB/s."
+    )
+    if stats.scanned:
+        print(f"Compared {stats.scanned} files.")
+    if stats.unchanged:
+        print(f"{stats.unchanged} files of the same size had the same content.")
+    if stats.resumed:
+        print(f"Resumed: {stats.resumed} files were already copied.")
+    if stats.errors:
+        for error in stats.errors[:10]:
+            print(f"  {error}")
+        print(f"{len(stats.errors)} error(s); run the sync again to retry them.")
+        sys.exit(1)
+
+
+# Create the command object
+sync = click.command(name="sync")(
+    click.argument("src", type=click.Path(exists=True, file_okay=False))(
+        click.argument("dst", type=click.Path(file_okay=False))(
+            click.option(
+                "-c", "--checksum", is_flag=True, help="Compare files of the same size by SHA-256"
+            )(
+                click.option(
+                    "-n", "--dry-run", is_flag=True, help="Only report what would be copied"
+                )(
+                    click.option(
+                        "--restart",
+                        is_flag=True,
+                        help="Ignore the checkpoint of an interrupted sync",
+                    )(
+                        click.option(
+                            "-j",
+                            "--jobs",
+                            default=SYNC_WORKERS,
+                            show_default=True,
+                            type=click.IntRange(min=1),
+                            help="Directories compared and files copied at once",
+                        )(click.pass_context(_sync))
+                    )
+                )
+            )
+        )
+    )
+)
@@ -0,0 +1,272 @@
+"""Disk usage of the data directories, per subdirectory or per day.
+
+Directories are summarized in parallel (see `arm_cli.utils.walk`) and each summary, the
+size of the directory's own files by day plus its subdirectories, is cached keyed on
+the directory's mtime. Adding, removing or renaming an entry changes the mtime of its
+directory, so a repeat run only scans the directories that changed and takes a
+single stat for the others. Files rewritten in place do not change it; use --refresh
+to rescan everything.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import appdirs
+import click
+
+from arm_cli.config import get_active_project_config
+from arm_cli.system.setup_utils import get_project_data_directory
+from arm_cli.utils.walk import WALK_WORKERS, map_tree, scan_dir
+
+USAGE_CACHE_VERSION = 1
+
+
+def get_usage_cache_file() -> Path:
+    """Get the file caching directory summaries between runs."""
+    return Path(appdirs.user_cache_dir("arm-cli")) / "data_usage.json"
+
+
+class DirSummary(NamedTuple):
+    """Usage of a directory's own files (not of its subdirectories)."""
+
+    path: str
+    mtime_ns: int
+    files: int
+    bytes: int
+    # [files, bytes] by the local day the files were last modified, as YYYY-MM-DD
+    days: Dict[str, List[int]]
+    subdirs: List[str]
+    scanned: bool = True
+    error: Optional[str] = None
+
+
+def disk_usage(st: os.stat_result) -> int:
+    """Get the bytes an entry takes on disk, as du counts them."""
+    return st.st_blocks * 512
+
+
+def summarize_dir(path: str, cached: Optional[DirSummary] = None) -> DirSummary:
+    """Summarize a directory, reusing the cached summary if its mtime did not change."""
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        return DirSummary(path, 0, 0, 0, {}, [], error=e.strerror)
+    if cached is not None and cached.mtime_ns == st.st_mtime_ns:
+        return cached._replace(path=path, scanned=False)
+
+    # The mtime from before the scan, so that changes made during it show next time
+    walked = scan_dir(path)
+    if walked.error is not None:
+        return DirSummary(path, st.st_mtime_ns, 0, 0, {}, [], error=walked.error.strerror)
+    files = 0
+    size = disk_usage(st)
+    days: Dict[str, List[int]] = {}
+    subdirs = []
+    for entry, entry_st in walked.entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.name)
+            continue
+        files += 1
+        size += disk_usage(entry_st)
+        day_name = time.strftime("%Y-%m-%d", time.localtime(entry_st.st_mtime))
+        day = days.setdefault(day_name, [0, 0])
+        day[0] += 1
+        day[1] += disk_usage(entry_st)
+    return DirSummary(path, st.st_mtime_ns, files, size, days, sorted(subdirs))
+
+
+class UsageCache:
+    """Directory summaries from earlier runs, by absolute path."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._dirs: Dict[str, list] = {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") == USAGE_CACHE_VERSION:
+                self._dirs = data["dirs"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def get(self, path: str) -> Optional[DirSummary]:
+        entry = self._dirs.get(path)
+        if entry is None:
+            return None
+        try:
+            return DirSummary(path, *entry)
+        except TypeError:
+            return None
+
+    def save(self, roots: Sequence[str], summaries: Iterable[DirSummary]) -> None:
+        """Replace the summaries under the roots, dropping directories that are gone."""
+        dirs = {
+            path: entry for path, entry in self._dirs.items() if _find_root(path, roots) is None
+        }
+        for s in summaries:
+            if s.error is None:
+                dirs[s.path] = [s.mtime_ns, s.files, s.bytes, s.days, s.subdirs]
+        self._dirs = dirs
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_name(self._path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"version": USAGE_CACHE_VERSION, "dirs": dirs}, f)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            pass
+
+
+def _find_root(path: str, roots: Sequence[str]) -> Optional[str]:
+    """Get the longest root a path is in."""
+    matches = [r for r in roots if path == r or path.startswith(r.rstrip(os.sep) + os.sep)]
+    return max(matches, key=len, default=None)
+
+
+def summarize_trees(
+    roots: Sequence[str],
+    cache: Optional[UsageCache] = None,
+    workers: int = WALK_WORKERS,
+) -> List[DirSummary]:
+    """Summarize every directory under the roots, in parallel."""
+
+    def visit(path: str) -> DirSummary:
+        return summarize_dir(path, None if cache is None else cache.get(path))
+
+    def children(summary: DirSummary) -> List[str]:
+        return [os.path.join(summary.path, name) for name in summary.subdirs]
+
+    return list(map_tree(roots, visit, children, workers))
+
+
+def usage_by_dir(
+    summaries: Iterable[DirSummary], roots: Sequence[str], depth: int
+) -> Dict[str, Tuple[int, int]]:
+    """Get (files, bytes) of each directory `depth` levels below the roots, subtrees included."""
+    usage: Dict[str, Tuple[int, int]] = {}
+    for s in summaries:
+        root = _find_root(s.path, roots)
+        if root is None:
+            continue
+        rel = os.path.relpath(s.path, root)
+        parts = [] if rel == "." else rel.split(os.sep)
+        key = os.path.join(root, *parts[:depth])
+        files, size = usage.get(key, (0, 0))
+        usage[key] = (files + s.files, size + s.bytes)
+    return usage
+
+
+def usage_by_day(summaries: Iterable[DirSummary]) -> Dict[str, Tuple[int, int]]:
+    """Get (files, bytes) of the files last modified on each day."""
+    usage: Dict[str, Tuple[int, int]] = {}
+    for s in summaries:
+        for day, (files, size) in s.days.items():
+            total_files, total_size = usage.get(day, (0, 0))
+            usage[day] = (total_files + files, total_size + size)
+    return usage
+
+
+def _usage(
+    ctx,
+    paths: Sequence[str],
+    by: str,
+    depth: int,
+    sort: str,
+    as_json: bool,
+    refresh: bool,
+    jobs: int,
+):
+    """Show how much space the data directories use, per subdirectory or per day
+
+    Without PATHS, measures the active project's data directory. Repeat runs only
+    rescan directories whose entries changed; --refresh rescans everything.
+    """
+    config = ctx.obj["config"]
+    if not paths:
+        paths = [get_project_data_directory(get_active_project_config(config))]
+    roots = [os.path.abspath(path) for path in paths]
+    missing = [root for root in roots if not os.path.isdir(root)]
+    if missing:
+        print(f"Error: not a directory: {', '.join(missing)}")
+        sys.exit(1)
+
+    start = time.monotonic()
+    cache = UsageCache(get_usage_cache_file())
+    summaries = summarize_trees(roots, None if refresh else cache, workers=jobs)
+    cache.save(roots, summaries)
+    elapsed = time.monotonic() - start
+
+    key_name = "path" if by == "dir" else "day"
+    usage = usage_by_dir(summaries, roots, depth) if by == "dir" else usage_by_day(summaries)
+    if sort == "size":
+        items = sorted(usage.items(), key=lambda item: (-item[1][1], item[0]))
+    else:
+        items = sorted(usage.items())
+
+    if as_json:
+        entries = [{key_name: key, "bytes": size, "files": files} for key, (files, size) in items]
+        print(json.dumps(entries, indent=2))
+    else:
+        rows = [(f"{size / 1e6:.1f} MB", str(files), key) for key, (files, size) in items]
+        headers = ("SIZE", "FILES", key_name.upper())
+        widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+        for row in [headers] + rows:
+            print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+        total_files = sum(files for files, _ in usage.values())
+        total_size = sum(size for _, size in usage.values())
+        scanned = sum(1 for s in summaries if s.scanned)
+        print(
+            f"\n{total_size / 1e6:.1f} MB in {total_files} files; scanned {scanned} of "
+            f"{len(summaries)} directories in {elapsed:.2f}s."
+        )
+
+    errors = [s for s in summaries if s.error is not None]
+    for s in errors:
+        print(f"Warning: could not read {s.path}: {s.error}", file=sys.stderr)
+
+
+# Create the command object
+usage = click.command(name="usage")(
+    click.argument("paths", nargs=-1, type=click.Path(file_okay=False))(
+        click.option(
+            "--by",
+            type=click.Choice(["dir", "day"]),
+            default="dir",
+            show_default=True,
+            help="Group by subdirectory or by the day files were last modified",
+        )(
+            click.option(
+                "--depth",
+                default=1,
+                show_default=True,
+                type=click.IntRange(min=0),
+                help="Subdirectory levels below each path to list (with --by dir)",
+            )(
+                click.option(
+                    "--sort",
+                    type=click.Choice(["size", "name"]),
+                    default="size",
+                    show_default=True,
+                    help="Largest first, or by path or day",
+                )(
+                    click.option("--json", "as_json", is_flag=True, help="Output JSON")(
+                        click.option("--refresh", is_flag=True, help="Rescan every directory")(
+                            click.option(
+                                "-j",
+                                "--jobs",
+                                default=WALK_WORKERS,
+                                show_default=True,
+                                type=click.IntRange(min=1),
+                                help="Directories scanned at once",
+                            )(click.pass_context(_usage))
+                        )
+                    )
+                )
+            )
+        )
+    )
+)
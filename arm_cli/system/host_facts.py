@@ -0,0 +1,121 @@
+"""Facts about the host and its users, read in-process and memoized per process.
+
+These used to come from `id -u`, `id -g`, `id -nG` and `who am i`, each a subprocess
+costing 5-20 ms on small ARM boards. The standard library reads the same databases
+(passwd, group and utmp) directly.
+"""
+
+import grp
+import os
+import pwd
+import struct
+import sys
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+UTMP_FILES = ("/run/utmp", "/var/run/utmp")
+
+# struct utmp on Linux (the same on 32 and 64 bit): type, pid, line, id, user, host,
+# exit status, session, time, address and reserved bytes
+_UTMP_RECORD = struct.Struct("<h2xi32s4s32s256s2hi2i4i20x")
+_USER_PROCESS = 7
+
+
+def _decode(field: bytes) -> str:
+    return field.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+
+def read_utmp(path: str) -> List[Tuple[str, str]]:
+    """Get the (terminal, user) of every login session recorded in a utmp file."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    sessions = []
+    for offset in range(0, len(data) - _UTMP_RECORD.size + 1, _UTMP_RECORD.size):
+        record = _UTMP_RECORD.unpack_from(data, offset)
+        if record[0] == _USER_PROCESS:
+            sessions.append((_decode(record[2]), _decode(record[4])))
+    return sessions
+
+
+def get_terminal() -> Optional[str]:
+    """Get our controlling terminal relative to /dev (e.g. pts/0), as utmp records it."""
+    for stream in (sys.stdin, sys.stdout, sys.stderr):
+        try:
+            return os.ttyname(stream.fileno())[len("/dev/") :]
+        except (AttributeError, OSError, ValueError):
+            continue
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_login_user() -> Optional[str]:
+    """Get the user logged in on our terminal, as `who am i` reports it."""
+    terminal = get_terminal()
+    if terminal is None:
+        return None
+    for path in UTMP_FILES:
+        for line, user in read_utmp(path):
+            if line == terminal and user:
+                return user
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_original_user() -> str:
+    """Get the user who ran the CLI, also when it runs with sudo."""
+    original_user = os.getenv("SUDO_USER") or get_login_user()
+    if original_user:
+        return original_user
+    user = os.getenv("USER") or os.getenv("LOGNAME")
+    if user:
+        return user
+    try:
+        return pwd.getpwuid(os.getuid()).pw_name
+    except KeyError:
+        return str(os.getuid())
+
+
+@lru_cache(maxsize=None)
+def get_user_ids(user: str) -> Tuple[int, int]:
+    """Get a user's UID and primary GID, or ours if the user is unknown."""
+    try:
+        entry = pwd.getpwnam(user)
+    except KeyError:
+        return os.getuid(), os.getgid()
+    return entry.pw_uid, entry.pw_gid
+
+
+@lru_cache(maxsize=None)
+def get_user_groups(user: str) -> Tuple[str, ...]:
+    """Get the names of every group a user belongs to, as `id -nG <user>` lists them."""
+    try:
+        gids = os.getgrouplist(user, get_user_ids(user)[1])
+    except OSError:
+        gids = os.getgroups()
+    names = []
+    for gid in gids:
+        try:
+            names.append(grp.getgrgid(gid).gr_name)
+        except KeyError:
+            names.append(str(gid))
+    return tuple(names)
+
+
+@lru_cache(maxsize=None)
+def is_in_docker_container() -> bool:
+    return os.path.exists("/.dockerenv")
+
+
+def clear_cache() -> None:
+    """Forget memoized facts, e.g. after changing a user's groups."""
+    for fact in (
+        get_login_user,
+        get_original_user,
+        get_user_ids,
+        get_user_groups,
+        is_in_docker_container,
+    ):
+        fact.cache_clear()
@@ -0,0 +1,459 @@
+"""Local pull-through cache for a Docker registry.
+
+Serves the read-only part of the registry v2 API. Blobs and manifests are fetched from
+the upstream registry once, stored in a content-addressed blob store and served from
+disk afterwards, so a lab full of robots pulls each layer from upstream only once.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+DEFAULT_UPSTREAM = "https://registry-1.docker.io"
+# Listen on all interfaces since other machines in the lab connect to the cache
+DEFAULT_HOST = "0.0.0.0"  # nosec B104
+CHUNK_SIZE = 1024 * 1024
+
+MANIFEST_TYPES = ", ".join(
+    [
+        "application/vnd.docker.distribution.manifest.v2+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.oci.image.index.v1+json",
+    ]
+)
+
+_PATH_RE = re.compile(r"^/v2/(?P<name>.+)/(?P<kind>manifests|blobs)/(?P<ref>[^/]+)$")
+_DIGEST_RE = re.compile(r"^sha256:[0-9a-f]{64}$")
+# Repository names and tags as the distribution spec defines them
+_NAME_COMPONENT = r"[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*"
+_NAME_RE = re.compile(rf"^{_NAME_COMPONENT}(?:/{_NAME_COMPONENT})*$")
+_TAG_RE = re.compile(r"^\w[\w.-]{0,127}$", re.ASCII)
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$", re.IGNORECASE)
+
+
+def parse_size(value: str) -> int:
+    """Parse a human readable size such as 500M or 50G into bytes."""
+    match = _SIZE_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    number, unit = match.groups()
+    return int(float(number) * 1024 ** " KMGT".index(unit.upper() or " "))
+
+
+class BlobStore:
+    """Content-addressed blob store with least-recently-used eviction by total size.
+
+    Blobs live at <root>/blobs/sha256/<ab>/<digest>. Access order is kept in memory and
+    mirrored to file mtimes, so it survives restarts of the cache.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.blob_dir = root / "blobs" / "sha256"
+        self.tmp_dir = root / "tmp"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # digest -> (lock, number of requests holding or waiting for it)
+        self._fetch_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        # digest -> size, ordered from least to most recently used
+        self._lru: Dict[str, int] = OrderedDict()
+        self.total_bytes = 0
+
+        blobs = []
+        for path in self.blob_dir.glob("*/*"):
+            if path.suffix == ".type":
+                continue
+            stat_info = path.stat()
+            blobs.append((stat_info.st_mtime, f"sha256:{path.name}", stat_info.st_size))
+        for _, digest, size in sorted(blobs):
+            self._lru[digest] = size
+            self.total_bytes += size
+
+    def path(self, digest: str) -> Path:
+        """Get the on-disk path of a blob."""
+        hex_digest = digest.split(":", 1)[1]
+        return self.blob_dir / hex_digest[:2] / hex_digest
+
+    def get(self, digest: str) -> Optional[Path]:
+        """Get the path of a cached blob and mark it as recently used."""
+        with self._lock:
+            if digest not in self._lru:
+                return None
+            self._lru.move_to_end(digest)
+        path = self.path(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    @contextmanager
+    def fetch_lock(self, digest: str) -> Iterator[None]:
+        """Hold the lock that makes concurrent requests for one blob fetch it only once.
+
+        The lock is dropped once no request needs it, so only blobs being fetched have one.
+        """
+        with self._lock:
+            lock, users = self._fetch_locks.get(digest, (threading.Lock(), 0))
+            self._fetch_locks[digest] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._fetch_locks[digest]
+                if users == 1:
+                    del self._fetch_locks[digest]
+                else:
+                    self._fetch_locks[digest] = (lock, users - 1)
+
+    def put(self, digest: str, stream, media_type: Optional[str] = None) -> Path:
+        """Store a blob from a readable stream, verifying its digest.
+
+        Data is written to a temporary file and renamed into place, so readers never
+        see a partially written blob.
+        """
+        if not _DIGEST_RE.match(digest):
+            raise ValueError(f"Unsupported digest: {digest}")
+        hasher = hashlib.sha256()
+        size = 0
+        tmp_path = self.tmp_dir / f"{digest.split(':', 1)[1]}.{threading.get_ident()}"
+        try:
+            with open(tmp_path, "wb") as f:
+                while True:
+                    block = stream.read(CHUNK_SIZE)
+                    if not block:
+                        break
+                    hasher.update(block)
+                    size += len(block)
+                    f.write(block)
+            if f"sha256:{hasher.hexdigest()}" != digest:
+                raise ValueError(f"Digest mismatch for {digest}")
+            path = self.path(digest)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if media_type:
+                path.with_suffix(".type").write_text(media_type)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        with self._lock:
+            if digest not in self._lru:
+                self.total_bytes += size
+            self._lru[digest] = size
+            self._lru.move_to_end(digest)
+        self.evict()
+        return path
+
+    def media_type(self, digest: str) -> Optional[str]:
+        """Get the stored media type of a cached manifest."""
+        try:
+            return self.path(digest).with_suffix(".type").read_text()
+        except FileNotFoundError:
+            return None
+
+    def discard(self, digest: str) -> None:
+        """Forget a blob whose file is gone, so the next request fetches it again."""
+        with self._lock:
+            size = self._lru.pop(digest, None)
+            if size is not None:
+                self.total_bytes -= size
+
+    def evict(self) -> None:
+        """Delete least recently used blobs until the store fits its size budget."""
+        while True:
+            with self._lock:
+                # Never evict the most recently stored blob, it is about to be served
+                if self.total_bytes <= self.max_bytes or len(self._lru) <= 1:
+                    return
+                digest, size = self._lru.popitem(last=False)
+                self.total_bytes -= size
+            path = self.path(digest)
+            for stale in (path, path.with_suffix(".type")):
+                try:
+                    stale.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+class Upstream:
+    """Minimal registry v2 client supporting anonymous bearer token authentication."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._tokens: Dict[str, str] = {}
+
+    def _get_token(self, challenge: str) -> Optional[str]:
+        params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+        realm = params.pop("realm", None)
+        if realm is None:
+            return None
+        url = f"{realm}?{urllib.parse.urlencode(params)}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:  # nosec B310
+            data = json.load(response)
+        return data.get("token") or data.get("access_token")
+
+    def open(self, path: str, method: str = "GET"):
+        """Open an upstream URL, authenticating once if the registry asks for a token."""
+        scope = path.rsplit("/", 2)[0]
+        for attempt in range(2):
+            request = urllib.request.Request(f"{self.url}{path}", method=method)
+            request.add_header("Accept", MANIFEST_TYPES)
+            if scope in self._tokens:
+                request.add_header("Authorization", f"Bearer {self._tokens[scope]}")
+            try:
+                return urllib.request.urlopen(request, timeout=self.timeout)  # nosec B310
+            except urllib.error.HTTPError as e:
+                challenge = e.headers.get("WWW-Authenticate", "")
+                if e.code != 401 or attempt or not challenge.lower().startswith("bearer"):
+                    raise
+                token = self._get_token(challenge[len("bearer") :].strip())
+                if token is None:
+                    raise
+                self._tokens[scope] = token
+        raise RuntimeError("unreachable")
+
+
+class RegistryCache:
+    """Pull-through cache state shared by all request handler threads."""
+
+    def __init__(self, store: BlobStore, upstream: Upstream):
+        self.store = store
+        self.upstream = upstream
+        self.tags_dir = store.root / "tags"
+        self.stats = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def get_blob(self, name: str, kind: str, digest: str) -> Path:
+        """Get a blob or manifest from the cache, fetching it from upstream on a miss."""
+        path = self.store.get(digest)
+        if path is not None:
+            self._count("hits")
+            return path
+        with self.store.fetch_lock(digest):
+            # Another request may have fetched it while we waited
+            path = self.store.get(digest)
+            if path is not None:
+                self._count("hits")
+                return path
+            self._count("misses")
+            with self.upstream.open(f"/v2/{name}/{kind}/{digest}") as response:
+                media_type = None
+                if kind == "manifests":
+                    media_type = response.headers.get("Content-Type")
+                return self.store.put(digest, response, media_type)
+
+    def open_blob(self, name: str, kind: str, digest: str) -> BinaryIO:
+        """Open a blob or manifest to serve it, fetching it again if it was just evicted.
+
+        Once open, the blob can be read to the end even if eviction unlinks it meanwhile.
+        """
+        path = self.get_blob(name, kind, digest)
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            self.store.discard(digest)
+        return open(self.get_blob(name, kind, digest), "rb")
+
+    def tag_file(self, name: str, tag: str) -> Path:
+        """Get the file remembering the digest of a tag, which is always under tags_dir."""
+        if not _NAME_RE.match(name) or not _TAG_RE.match(tag):
+            raise ValueError(f"Invalid repository or tag: {name}:{tag}")
+        tags_dir = self.tags_dir.resolve()
+        tag_file = (tags_dir / name / tag).resolve()
+        if tags_dir not in tag_file.parents:
+            raise ValueError(f"Invalid repository or tag: {name}:{tag}")
+        return tag_file
+
+    def resolve_tag(self, name: str, tag: str) -> Tuple[str, str]:
+        """Resolve a tag to (digest, media type), falling back to the last known value
+        when the upstream registry cannot be reached."""
+        tag_file = self.tag_file(name, tag)
+        try:
+            with self.upstream.open(f"/v2/{name}/manifests/{tag}", method="HEAD") as response:
+                digest = response.headers["Docker-Content-Digest"]
+                media_type = response.headers.get("Content-Type", "")
+        except (urllib.error.URLError, OSError, KeyError):
+            if not tag_file.exists():
+                raise
+            data = json.loads(tag_file.read_text())
+            return data["digest"], data["media_type"]
+
+        tag_file.parent.mkdir(parents=True, exist_ok=True)
+        tag_file.write_text(json.dumps({"digest": digest, "media_type": media_type}))
+        return digest, media_type
+
+
+class RegistryCacheHandler(BaseHTTPRequestHandler):
+    """HTTP handler for the read-only registry v2 endpoints."""
+
+    server_version = "arm-cli-registry-cache"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def cache(self) -> RegistryCache:
+        return self.server.cache  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args):
+        if self.server.verbose:  # type: ignore[attr-defined]
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def _send_error(self, code: int, message: str) -> None:
+        body = json.dumps({"errors": [{"code": str(code), "message": message}]}).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _handle(self, send_body: bool) -> None:
+        if self.path.rstrip("/") == "/v2":
+            self.send_response(200)
+            self.send_header("Docker-Distribution-API-Version", "registry/2.0")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            if send_body:
+                self.wfile.write(b"{}")
+            return
+
+        match = _PATH_RE.match(urllib.parse.urlsplit(self.path).path)
+        if not match:
+            self._send_error(404, "not found")
+            return
+        name, kind, ref = match.group("name", "kind", "ref")
+        if not _NAME_RE.match(name):
+            self._send_error(400, f"invalid repository name {name}")
+            return
+
+        try:
+            media_type = None
+            if _DIGEST_RE.match(ref):
+                digest = ref
+            elif kind == "manifests" and _TAG_RE.match(ref):
+                digest, media_type = self.cache.resolve_tag(name, ref)
+            else:
+                self._send_error(400, f"invalid {'tag' if kind == 'manifests' else 'digest'} {ref}")
+                return
+            blob = self.cache.open_blob(name, kind, digest)
+        except urllib.error.HTTPError as e:
+            self._send_error(e.code, f"upstream: {e.reason}")
+            return
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            self._send_error(502, f"upstream unavailable: {e}")
+            return
+
+        if kind == "manifests":
+            media_type = self.cache.store.media_type(digest) or media_type
+        with blob:
+            self._send_file(blob, digest, media_type or "application/octet-stream", send_body)
+
+    def _send_file(self, f: BinaryIO, digest: str, content_type: str, send_body: bool) -> None:
+        size = os.fstat(f.fileno()).st_size
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header:
+            match = re.match(r"bytes=(\d*)-(\d*)$", range_header.strip())
+            if not match or not (match.group(1) or match.group(2)):
+                self._send_error(416, "invalid range")
+                return
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(size - int(match.group(2)), 0)
+            if start > end:
+                self._send_error(416, "range not satisfiable")
+                return
+            status = 206
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Docker-Content-Digest", digest)
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if not send_body:
+            return
+
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining:
+            block = f.read(min(CHUNK_SIZE, remaining))
+            if not block:
+                break
+            self.wfile.write(block)
+            remaining -= len(block)
+
+
+class RegistryCacheServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the shared cache state for its handlers."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], cache: RegistryCache, verbose: bool = False):
+        super().__init__(address, RegistryCacheHandler)
+        self.cache = cache
+        self.verbose = verbose
+
+
+def create_server(
+    cache_dir: Path,
+    max_bytes: int,
+    upstream: str = DEFAULT_UPSTREAM,
+    host: str = DEFAULT_HOST,
+    port: int = 5000,
+    verbose: bool = False,
+) -> RegistryCacheServer:
+    """Create (but do not start) a pull-through cache server."""
+    cache = RegistryCache(BlobStore(cache_dir, max_bytes), Upstream(upstream))
+    return RegistryCacheServer((host, port), cache, verbose)
+
+
+def add_registry_mirror(daemon_config: Dict, mirror_url: str) -> Dict:
+    """Add a registry mirror to a Docker daemon.json configuration.
+
+    Plain HTTP mirrors are also listed as insecure registries, which the daemon
+    requires before it will talk to them.
+    """
+    config = dict(daemon_config)
+    mirrors = list(config.get("registry-mirrors", []))
+    if mirror_url not in mirrors:
+        mirrors.append(mirror_url)
+    config["registry-mirrors"] = mirrors
+
+    parsed = urllib.parse.urlsplit(mirror_url)
+    if parsed.scheme == "http":
+        insecure = list(config.get("insecure-registries", []))
+        if parsed.netloc not in insecure:
+            insecure.append(parsed.netloc)
+        config["insecure-registries"] = insecure
+    return config
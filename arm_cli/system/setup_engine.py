@@ -0,0 +1,302 @@
+"""Run `system setup` as a graph of steps over host facts gathered once.
+
+Host facts (xhost state, group membership, the original user...) are each gathered
+once, all at the same time, in a thread pool. Setup steps then run as a dependency
+graph: every step first checks its facts and returns at once when nothing has to
+change, so an already set up host costs about as much as its slowest fact. Steps that
+do have to change something apply one at a time, since they may prompt or ask sudo
+for a password.
+
+Steps that succeeded are recorded in the setup ledger; while their inputs stay the
+same, later runs skip them without gathering facts at all.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from arm_cli.system import host_facts
+from arm_cli.system.setup_ledger import SetupLedger, base_fingerprint, get_boot_id, stat_fingerprint
+from arm_cli.system.setup_utils import (
+    check_data_directories_setup,
+    check_docker_group_setup,
+    check_shell_setup,
+    check_xhost_setup,
+    get_bashrc_path,
+    get_data_directories,
+    setup_data_directories,
+    setup_docker_group,
+    setup_shell,
+    setup_xhost,
+)
+from arm_cli.system.shell_scripts import get_script_dir
+
+STATUS_OK = "ok"
+STATUS_CHANGED = "changed"
+STATUS_INCOMPLETE = "incomplete"
+STATUS_ERROR = "error"
+STATUS_SKIPPED = "skipped"
+STATUS_UNCHANGED = "unchanged"
+STATUS_DRIFT = "drift"
+
+# Statuses after which the steps that require the step are skipped
+_FAILED_STATUSES = (STATUS_INCOMPLETE, STATUS_ERROR, STATUS_SKIPPED)
+
+
+class HostFacts:
+    """Host facts, each gathered once and all of them concurrently.
+
+    Gatherers receive the facts themselves, so one fact can build on another; reading
+    a fact waits for its gatherer and re-raises its exception, if any.
+    """
+
+    def __init__(self, gatherers: Dict[str, Callable[["HostFacts"], object]]):
+        self._timings: Dict[str, float] = {}
+        # One worker per fact, so a fact waiting on another never starves the pool
+        self._executor = ThreadPoolExecutor(max_workers=max(len(gatherers), 1))
+        self._futures: Dict[str, Future] = {
+            name: self._executor.submit(self._gather, name, gatherer)
+            for name, gatherer in gatherers.items()
+        }
+        self._executor.shutdown(wait=False)
+
+    def _gather(self, name: str, gatherer: Callable[["HostFacts"], object]) -> object:
+        start = time.monotonic()
+        try:
+            return gatherer(self)
+        finally:
+            self._timings[name] = time.monotonic() - start
+
+    def __getitem__(self, name: str) -> object:
+        return self._futures[name].result()
+
+    def timings(self) -> Dict[str, float]:
+        """Get the seconds each fact took to gather, waiting for all of them."""
+        for future in self._futures.values():
+            future.exception()
+        return dict(self._timings)
+
+
+def get_host_facts() -> HostFacts:
+    """Start gathering the facts the setup steps check."""
+    return HostFacts(
+        {
+            "in_docker": lambda facts: host_facts.is_in_docker_container(),
+            "xhost_configured": lambda facts: check_xhost_setup(),
+            "in_docker_group": lambda facts: check_docker_group_setup(),
+            "original_user": lambda facts: host_facts.get_original_user(),
+            "shell_configured": lambda facts: check_shell_setup(facts["original_user"]),
+        }
+    )
+
+
+class SetupStep(NamedTuple):
+    """A setup step: `check` tells from the facts whether `apply` has anything to do.
+
+    `fingerprint` gets the inputs the step depends on, cheaply and without the facts;
+    a step without one is checked on every run.
+    """
+
+    name: str
+    check: Callable[[HostFacts], bool]
+    apply: Callable[[bool], bool]
+    requires: Tuple[str, ...] = ()
+    fingerprint: Optional[Callable[[], Dict[str, Any]]] = None
+
+
+class StepResult(NamedTuple):
+    name: str
+    status: str
+    seconds: float
+    detail: Optional[str] = None
+
+
+def _get_x_socket(display: str) -> str:
+    # ":1.0" and "unix:1" are served by /tmp/.X11-unix/X1
+    number = display.rpartition(":")[2].split(".")[0]
+    return f"/tmp/.X11-unix/X{number}"
+
+
+def get_setup_steps(data_directory: str = "/DATA") -> List[SetupStep]:
+    """Get the steps of `system setup`."""
+
+    def xhost_inputs() -> Dict[str, Any]:
+        # xhost settings last as long as the X server, which comes back with a new socket
+        display = os.getenv("DISPLAY", "")
+        return {
+            **base_fingerprint(),
+            "in_docker": host_facts.is_in_docker_container(),
+            "boot_id": get_boot_id(),
+            "display": display,
+            "x_socket": stat_fingerprint(_get_x_socket(display)) if display else None,
+        }
+
+    def shell_inputs() -> Dict[str, Any]:
+        return {
+            **base_fingerprint(),
+            "addins": get_script_dir(),
+            "bashrc": stat_fingerprint(get_bashrc_path()),
+        }
+
+    def docker_group_inputs() -> Dict[str, Any]:
+        return {**base_fingerprint(), "group_file": stat_fingerprint("/etc/group")}
+
+    def data_directories_inputs() -> Dict[str, Any]:
+        # Only the top level, like the check, so recording the step stays cheap: drift
+        # deeper in the trees is left to fix-permissions
+        inputs = base_fingerprint()
+        for directory in get_data_directories(data_directory):
+            inputs[directory] = stat_fingerprint(directory)
+        return inputs
+
+    return [
+        SetupStep(
+            "xhost",
+            lambda facts: bool(facts["in_docker"] or facts["xhost_configured"]),
+            lambda force: setup_xhost(force=force),
+            fingerprint=xhost_inputs,
+        ),
+        SetupStep(
+            "shell",
+            lambda facts: bool(facts["shell_configured"]),
+            lambda force: setup_shell(force=force),
+            fingerprint=shell_inputs,
+        ),
+        SetupStep(
+            "docker_group",
+            lambda facts: bool(facts["in_docker_group"]),
+            lambda force: setup_docker_group(force=force),
+            fingerprint=docker_group_inputs,
+        ),
+        SetupStep(
+            "data_directories",
+            lambda facts: check_data_directories_setup(data_directory),
+            lambda force: setup_data_directories(force=force, data_directory=data_directory),
+            fingerprint=data_directories_inputs,
+        ),
+    ]
+
+
+def sort_steps(steps: Sequence[SetupStep]) -> List[SetupStep]:
+    """Order steps so that each comes after the steps it requires, otherwise keeping
+    their order.
+
+    Raises:
+        ValueError: If a step requires an unknown step or the requirements form a cycle.
+    """
+    by_name = {step.name: step for step in steps}
+    ordered: List[SetupStep] = []
+    visiting = set()
+    done = set()
+
+    def visit(step: SetupStep) -> None:
+        if step.name in done:
+            return
+        if step.name in visiting:
+            raise ValueError(f"Setup step '{step.name}' requires itself")
+        visiting.add(step.name)
+        for requirement in step.requires:
+            if requirement not in by_name:
+                raise ValueError(f"Setup step '{step.name}' requires unknown step '{requirement}'")
+            visit(by_name[requirement])
+        visiting.discard(step.name)
+        done.add(step.name)
+        ordered.append(step)
+
+    for step in steps:
+        visit(step)
+    return ordered
+
+
+def run_setup_steps(
+    steps: Sequence[SetupStep],
+    get_facts: Callable[[], HostFacts],
+    force: bool = False,
+    ledger: Optional[SetupLedger] = None,
+    verify: bool = False,
+    check_only: bool = False,
+) -> List[StepResult]:
+    """Run the steps, each as soon as the steps it requires are done.
+
+    With a ledger, a step whose fingerprint is unchanged since it last succeeded is
+    not checked again unless `verify` is set, and host facts are only gathered when
+    some step has to be checked. With `check_only`, steps that would change something
+    are reported as drift instead, and neither the host nor the ledger is changed.
+
+    A step whose requirement failed is skipped. Results are returned in the order of
+    `steps`.
+    """
+    ordered = sort_steps(steps)
+    apply_lock = threading.Lock()
+    facts_lock = threading.Lock()
+    gathered: List[HostFacts] = []
+    futures: Dict[str, Future] = {}
+
+    def facts() -> HostFacts:
+        with facts_lock:
+            if not gathered:
+                gathered.append(get_facts())
+            return gathered[0]
+
+    def run(step: SetupStep) -> StepResult:
+        requirements = [futures[name].result() for name in step.requires]
+        start = time.monotonic()
+        blocked = [r.name for r in requirements if r.status in _FAILED_STATUSES]
+        if blocked:
+            return StepResult(step.name, STATUS_SKIPPED, 0.0, f"requires {', '.join(blocked)}")
+
+        use_ledger = ledger is not None and step.fingerprint is not None
+        try:
+            changed = None
+            if use_ledger:
+                changed = ledger.changed_inputs(step.name, step.fingerprint())
+                if changed == [] and not verify:
+                    return StepResult(step.name, STATUS_UNCHANGED, time.monotonic() - start)
+
+            if step.check(facts()):
+                if use_ledger and not check_only:
+                    ledger.record(step.name, step.fingerprint())
+                return StepResult(step.name, STATUS_OK, time.monotonic() - start)
+
+            if check_only:
+                detail = "not set up" if not changed else f"changed: {', '.join(changed)}"
+                return StepResult(step.name, STATUS_DRIFT, time.monotonic() - start, detail)
+
+            with apply_lock:
+                applied = step.apply(force)
+            if use_ledger:
+                if applied:
+                    ledger.record(step.name, step.fingerprint())
+                else:
+                    ledger.forget(step.name)
+            status = STATUS_CHANGED if applied else STATUS_INCOMPLETE
+            return StepResult(step.name, status, time.monotonic() - start)
+        except Exception as e:
+            if use_ledger and not check_only:
+                ledger.forget(step.name)
+            return StepResult(step.name, STATUS_ERROR, time.monotonic() - start, str(e))
+
+    # Steps are submitted after their requirements and every step has its own worker,
+    # so waiting on a requirement never blocks the pool
+    with ThreadPoolExecutor(max_workers=max(len(ordered), 1)) as executor:
+        for step in ordered:
+            futures[step.name] = executor.submit(run, step)
+    if ledger is not None and not check_only:
+        ledger.save()
+    return [futures[step.name].result() for step in steps]
+
+
+def format_step_results(results: Sequence[StepResult]) -> List[str]:
+    """Format step results as table lines."""
+    rows = [
+        (result.name, result.status.upper(), f"{result.seconds:.2f}s", result.detail or "")
+        for result in results
+    ]
+    headers = ("STEP", "STATUS", "TIME", "")
+    widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+    return [
+        "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+        for row in [headers] + rows
+    ]
@@ -0,0 +1,102 @@
+"""Ledger of the setup steps that succeeded, with fingerprints of their inputs.
+
+A fingerprint holds what a step's outcome depends on: the CLI version, the user and
+their ids, the shell and the stat of the files and directories the step changes.
+When a step's fingerprint matches the one recorded after it last succeeded, nothing
+it looked at has changed and `system setup` skips it without checking the host again.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import appdirs
+
+from arm_cli import __version__
+from arm_cli.system import host_facts
+from arm_cli.system.shell_scripts import detect_shell
+
+BOOT_ID_FILE = "/proc/sys/kernel/random/boot_id"
+
+
+def get_setup_ledger_file() -> Path:
+    """Get the file holding the setup ledger."""
+    return Path(appdirs.user_cache_dir("arm-cli")) / "setup_ledger.json"
+
+
+def stat_fingerprint(path: str) -> Optional[List[int]]:
+    """Get what setup cares about in a path's stat: mtime, size, owner and mode."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_uid, st.st_gid, st.st_mode]
+
+
+def get_boot_id() -> str:
+    """Get the id of the current boot, which changes on every reboot."""
+    try:
+        with open(BOOT_ID_FILE) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def base_fingerprint() -> Dict[str, Any]:
+    """Get the inputs every setup step depends on."""
+    user = host_facts.get_original_user()
+    return {
+        "version": __version__,
+        "user": user,
+        "ids": list(host_facts.get_user_ids(user)),
+        "shell": detect_shell(),
+    }
+
+
+def _normalize(fingerprint: Dict[str, Any]) -> Dict[str, Any]:
+    # Compare fingerprints as they read back from JSON (tuples become lists)
+    return json.loads(json.dumps(fingerprint, sort_keys=True))
+
+
+class SetupLedger:
+    """The fingerprint each setup step had when it last succeeded."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        try:
+            with open(path) as f:
+                steps = json.load(f).get("steps", {})
+        except (OSError, ValueError, AttributeError):
+            steps = {}
+        self._steps: Dict[str, Dict[str, Any]] = steps if isinstance(steps, dict) else {}
+
+    def changed_inputs(self, name: str, fingerprint: Dict[str, Any]) -> Optional[List[str]]:
+        """Get the inputs of a step that changed since it last succeeded.
+
+        Returns:
+            None if the step never succeeded, otherwise the names of the changed inputs.
+        """
+        recorded = self._steps.get(name)
+        if not isinstance(recorded, dict):
+            return None
+        fingerprint = _normalize(fingerprint)
+        keys = sorted(set(recorded) | set(fingerprint))
+        return [key for key in keys if recorded.get(key) != fingerprint.get(key)]
+
+    def record(self, name: str, fingerprint: Dict[str, Any]) -> None:
+        self._steps[name] = _normalize(fingerprint)
+
+    def forget(self, name: str) -> None:
+        self._steps.pop(name, None)
+
+    def save(self) -> None:
+        """Write the ledger, ignoring errors: without it setup only checks everything."""
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_name(self._path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"steps": self._steps}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self._path)
+        except OSError:
+            pass
@@ -5,50 +5,22 @@ import sys
 
 import click
 
+from arm_cli.system import host_facts
+from arm_cli.system.permissions import fix_permissions
 from arm_cli.system.shell_scripts import detect_shell, get_current_shell_addins
 from arm_cli.utils.safe_subprocess import safe_run, sudo_run
 
 
 def get_original_user():
     """Get the original user's identity when running with sudo"""
-    # Get the original user from SUDO_USER environment variable
-    original_user = os.getenv("SUDO_USER")
-    if original_user:
-        return original_user
-
-    # Fallback: try to get from who am i
-    try:
-        result = safe_run(["who", "am", "i"], capture_output=True, text=True, check=True)
-        if result.stdout.strip():
-            return result.stdout.strip().split()[0]
-    except (subprocess.CalledProcessError, IndexError):
-        pass
-
-    # Final fallback: current user
-    return os.getenv("USER") or os.getenv("LOGNAME") or os.getlogin()
+    return host_facts.get_original_user()
 
 
-def get_original_user_uid_gid():
+def get_original_user_uid_gid(original_user=None):
     """Get the original user's UID and GID when running with sudo"""
-    original_user = get_original_user()
-
-    try:
-        # Get UID
-        uid_result = safe_run(
-            ["id", "-u", original_user], capture_output=True, text=True, check=True
-        )
-        uid = int(uid_result.stdout.strip())
-
-        # Get GID
-        gid_result = safe_run(
-            ["id", "-g", original_user], capture_output=True, text=True, check=True
-        )
-        gid = int(gid_result.stdout.strip())
-
-        return uid, gid
-    except (subprocess.CalledProcessError, ValueError):
-        # Fallback to current user if we can't get original user info
-        return os.getuid(), os.getgid()
+    if original_user is None:
+        original_user = get_original_user()
+    return host_facts.get_user_ids(original_user)
 
 
 def check_xhost_setup():
@@ -63,27 +35,29 @@ def check_xhost_setup():
 def setup_xhost(force=False):
     """Setup xhost for GUI applications"""
     # Skip xhost setup in Docker environment TODO: Handle this better in integration tests and remove this
-    if os.path.exists("/.dockerenv"):
+    if host_facts.is_in_docker_container():
         print("Skipping xhost setup in Docker environment.")
-        return
+        return True
 
     try:
         # Check if xhost is already configured
         if check_xhost_setup():
             print("X11 access for Docker containers is already configured.")
-            return
+            return True
 
         # Ensure xhost allows local Docker connections
         print("Setting up X11 access for Docker containers...")
         if not force:
             if not click.confirm("Do you want to configure X11 access for Docker containers?"):
                 print("X11 setup cancelled.")
-                return
+                return False
 
         safe_run(["xhost", "+local:docker"], check=True)
         print("xhost configured successfully.")
+        return True
     except subprocess.CalledProcessError as e:
         print(f"Error configuring xhost: {e}")
+        return False
 
 
 def check_sudo_privileges():
@@ -95,15 +69,33 @@ def check_sudo_privileges():
         return False
 
 
-def check_data_directories_setup(data_directory="/DATA"):
-    """Check if data directories are already properly set up"""
-    data_dirs = [
+DEFAULT_DATA_DIRECTORY = "/DATA"
+
+
+def get_project_data_directory(project_config=None):
+    """Get the data directory of a project, or the default one"""
+    if project_config and project_config.data_directory:
+        return project_config.data_directory
+    return DEFAULT_DATA_DIRECTORY
+
+
+def get_data_directories(data_directory="/DATA"):
+    """Get the directories setup creates under the data directory"""
+    return [
         os.path.join(data_directory, "influxdb2"),
         os.path.join(data_directory, "images"),
         os.path.join(data_directory, "node_exporter"),
     ]
-    current_uid = os.getuid()
-    current_gid = os.getgid()
+
+
+def check_data_directories_setup(data_directory="/DATA"):
+    """Check if data directories are already properly set up
+
+    Only the top-level directories are checked, so the check stays cheap; entries below
+    them are fixed by the single walk of setup_data_directories or by fix-permissions.
+    """
+    data_dirs = get_data_directories(data_directory)
+    current_uid, current_gid = get_original_user_uid_gid()
 
     for directory in data_dirs:
         # Check if directory exists
@@ -130,11 +122,8 @@ def check_data_directories_setup(data_directory="/DATA"):
 def setup_data_directories(force=False, data_directory="/DATA"):
     """Setup data directories for the ARM system"""
     try:
-        # Check if directories are already properly set up
-        if check_data_directories_setup(data_directory):
-            print("Data directories are already properly set up.")
-            return True
-
+        # The setup step checked the top level already; the fixer's walk below decides
+        # what else needs changing
         print("Setting up data directories...")
 
         # Check if user has sudo privileges
@@ -145,11 +134,7 @@ def setup_data_directories(force=False, data_directory="/DATA"):
 
         # Ask user for confirmation
         print("This will create the following directories:")
-        data_dirs = [
-            os.path.join(data_directory, "influxdb2"),
-            os.path.join(data_directory, "images"),
-            os.path.join(data_directory, "node_exporter"),
-        ]
+        data_dirs = get_data_directories(data_directory)
         for directory in data_dirs:
             print(f"  - {directory}")
         print("And set appropriate ownership and permissions.")
@@ -169,15 +154,17 @@ def setup_data_directories(force=False, data_directory="/DATA"):
         sudo_run(mkdir_cmd, check=True)
         print("Created directories.")
 
-        # Set ownership for all directories in one sudo command
-        chown_cmd = ["chown", "-R", f"{uid}:{gid}"] + data_dirs
-        sudo_run(chown_cmd, check=True)
-        print("Set ownership.")
-
-        # Set permissions for all directories in one sudo command
-        chmod_cmd = ["chmod", "-R", "775"] + data_dirs
-        sudo_run(chmod_cmd, check=True)
-        print("Set permissions.")
+        # Only change the entries whose owner or mode differ, in batched sudo commands
+        stats = fix_permissions(data_dirs, uid, gid)
+        print(
+            f"Set ownership of {stats.chowned} and permissions of {stats.chmodded} "
+            f"of {stats.scanned} entries."
+        )
+        if stats.errors:
+            for error in stats.errors[:10]:
+                print(f"  {error}")
+            print("Some entries could not be fixed; rerun to resume.")
+            return False
 
         print("Data directories setup completed successfully.")
         return True
@@ -193,12 +180,7 @@ def setup_data_directories(force=False, data_directory="/DATA"):
 
 def check_docker_group_setup():
     """Check if the user is already in the docker group"""
-    try:
-        result = safe_run(["id", "-nG"], capture_output=True, text=True, check=True)
-        groups = result.stdout.strip().split()
-        return "docker" in groups
-    except subprocess.CalledProcessError:
-        return False
+    return "docker" in host_facts.get_user_groups(get_original_user())
 
 
 def setup_docker_group(force=False):
@@ -227,6 +209,7 @@ def setup_docker_group(force=False):
         # Add user to docker group (use original user when running with sudo)
         username = get_original_user()
         sudo_run(["usermod", "-aG", "docker", username], check=True)
+        host_facts.clear_cache()
 
         print(f"Added {username} to docker group successfully.")
         print("Please log out and back in for the docker group changes to take effect,")
@@ -248,31 +231,50 @@ def is_line_in_file(line, filepath) -> bool:
         return any(line.strip() in file_line.strip() for file_line in f)
 
 
+def get_bashrc_path(original_user=None):
+    """Get the ~/.bashrc of the original user, also when running with sudo"""
+    if original_user is None:
+        original_user = get_original_user()
+    if original_user != os.getenv("USER"):
+        # We're running with sudo, use original user's home
+        return f"/home/{original_user}/.bashrc"
+    # Normal operation, use current user's home
+    return os.path.expanduser("~/.bashrc")
+
+
+def get_shell_addins_line():
+    """Get the line that sources the shell addins"""
+    return f"source {get_current_shell_addins()}"
+
+
+def check_shell_setup(original_user=None):
+    """Check if the shell addins are already sourced from ~/.bashrc"""
+    if "bash" not in detect_shell():
+        return False
+    bashrc_path = get_bashrc_path(original_user)
+    return os.path.exists(bashrc_path) and is_line_in_file(get_shell_addins_line(), bashrc_path)
+
+
 def setup_shell(force=False):
     """Setup shell addins for autocomplete"""
     shell = detect_shell()
 
     if "bash" in shell:
-        # Use original user's home directory when running with sudo
-        original_user = get_original_user()
-        if original_user != os.getenv("USER"):
-            # We're running with sudo, use original user's home
-            bashrc_path = f"/home/{original_user}/.bashrc"
-        else:
-            # Normal operation, use current user's home
-            bashrc_path = os.path.expanduser("~/.bashrc")
+        bashrc_path = get_bashrc_path()
 
-        line = f"source {get_current_shell_addins()}"
+        line = get_shell_addins_line()
         if not is_line_in_file(line, bashrc_path):
             print(f'Adding \n"{line}"\nto {bashrc_path}')
             if not force:
                 if not click.confirm("Do you want to add shell autocomplete to ~/.bashrc?"):
                     print("Shell setup cancelled.")
-                    return
+                    return False
 
             with open(bashrc_path, "a") as f:
                 f.write(f"\n{line}\n")
         else:
             print("Shell addins are already configured in ~/.bashrc")
+        return True
     else:
         print(f"Unsupported shell: {shell}", file=sys.stderr)
+        return False
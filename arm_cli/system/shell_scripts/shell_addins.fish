@@ -2,6 +2,20 @@
 # Setup autocomplete
 _ARM_CLI_COMPLETE=fish_source arm-cli | source
 
+# Export the active project's fields (ARM_PROJECT_NAME, ARM_PROJECT_DIRECTORY, ...)
+# with a single arm-cli call
+function arm_project_env
+    set -l lines (arm-cli projects info --format env); or return
+    for line in $lines
+        set -l pair (string split -m 1 = -- $line)
+        if test (count $pair) -ne 2
+            echo $line >&2
+            return 1
+        end
+        set -gx $pair[1] $pair[2]
+    end
+end
+
 # Export for use when launching Docker to match host file ownership
 set -x CURRENT_UID (id -u):(id -g)
 
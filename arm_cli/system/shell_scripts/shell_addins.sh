@@ -23,9 +23,40 @@ setup_arm_cli_completion() {
         else
             eval "$(_ARM_CLI_COMPLETE=bash_source arm-cli 2>/dev/null)" 2>/dev/null || true
         fi
+        complete -o default -F _arm_cli_cached_completion arm-cli 2>/dev/null || true
     fi
 }
 
+## Complete project, container and setting names from arm-cli's completion caches
+## without starting Python; anything else (or an expired cache) goes to click
+_arm_cli_cached_completion() {
+    local kind="" cache expires value
+    local cur="${COMP_WORDS[COMP_CWORD]}"
+    case "${COMP_WORDS[1]} ${COMP_WORDS[2]}" in
+        "projects activate"|"projects remove") [ "$COMP_CWORD" -eq 3 ] && kind=projects ;;
+        "container attach"|"container logs") [ "$COMP_CWORD" -eq 3 ] && kind=containers ;;
+        "self settings")
+            if [ "$COMP_CWORD" -eq 4 ] && [[ "${COMP_WORDS[3]}" == @(get|set) ]]; then
+                kind=settings
+            fi
+            ;;
+    esac
+    cache="${XDG_CACHE_HOME:-$HOME/.cache}/arm-cli/completion/$kind"
+    if [ -n "$kind" ] && [[ "$cur" != -* ]] && [ -r "$cache" ]; then
+        COMPREPLY=()
+        {
+            read -r expires
+            if [ "${expires:-0}" -gt "${EPOCHSECONDS:-$(date +%s)}" ]; then
+                while IFS= read -r value; do
+                    [[ "$value" == "$cur"* ]] && COMPREPLY+=("$value")
+                done
+                return 0
+            fi
+        } < "$cache"
+    fi
+    _arm_cli_completion "$@"
+}
+
 ## Setup alias and completion
 setup_alias() {
     local alias_name="aa"
@@ -35,10 +66,10 @@ setup_alias() {
     if [ -n "$cli_path" ]; then
         if [[ $- == *i* ]]; then  # Only define alias in interactive shells
             alias "$alias_name"="$cli_path"
-            complete -o default -F _arm_cli_completion "$alias_name" 2>/dev/null || true
+            complete -o default -F _arm_cli_cached_completion "$alias_name" 2>/dev/null || true
             
             # Add cdp alias to change to project directory
-            alias cdp='cd "$(arm-cli projects info --field "project_directory" | sed "s|^~|$HOME|")"'
+            alias cdp='arm_project_env && cd "$ARM_PROJECT_DIRECTORY"'
             
             # Add cdc alias to change to code directory
             alias cdc='cd "$(arm-cli self settings get cdc_path | sed "s|^~|$HOME|")"'
@@ -46,8 +77,19 @@ setup_alias() {
     fi
 }
 
-## Set UID for Docker
-export CURRENT_UID="$(id -u):$(id -g)"
+## Export the active project's fields (ARM_PROJECT_NAME, ARM_PROJECT_DIRECTORY, ...)
+## with a single arm-cli call
+arm_project_env() {
+    local exports
+    exports="$(arm-cli projects info --format shell)" || return
+    case "$exports" in
+        export\ *) eval "$exports" ;;
+        *) echo "$exports" >&2; return 1 ;;
+    esac
+}
+
+## Set UID for Docker (bash lists the primary group first in GROUPS)
+export CURRENT_UID="$UID:${GROUPS[0]}"
 
 ## Allow Docker containers to access X11
 allow_x11_docker_access() {
@@ -58,10 +100,18 @@ allow_x11_docker_access() {
 
 ## Check docker group membership
 check_docker_group() {
-    if ! id -nG "$USER" | grep -qw docker; then
-        echo "Warning: $USER is not in the docker group."
-        echo "To add yourself to the docker group, run: arm-cli system setup"
-    fi
+    # Read /etc/group rather than running `id -nG` on every shell start
+    local name password gid members group
+    while IFS=: read -r name password gid members; do
+        [ "$name" = docker ] || continue
+        case ",$members," in *",$USER,"*) return 0 ;; esac
+        for group in "${GROUPS[@]}"; do
+            [ "$group" = "$gid" ] && return 0
+        done
+        break
+    done < /etc/group
+    echo "Warning: $USER is not in the docker group."
+    echo "To add yourself to the docker group, run: arm-cli system setup"
 }
 
 # Run setup steps
@@ -1,12 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
 import click
 
 from arm_cli.config import get_active_project_config
-from arm_cli.system.setup_utils import (
-    setup_data_directories,
-    setup_docker_group,
-    setup_shell,
-    setup_xhost,
+from arm_cli.system.data.data import data
+from arm_cli.system.permissions import fix_permissions
+from arm_cli.system.registry_cache import (
+    DEFAULT_HOST,
+    DEFAULT_UPSTREAM,
+    add_registry_mirror,
+    create_server,
+    parse_size,
+)
+from arm_cli.system.setup_engine import (
+    STATUS_CHANGED,
+    STATUS_OK,
+    STATUS_UNCHANGED,
+    format_step_results,
+    get_host_facts,
+    get_setup_steps,
+    run_setup_steps,
 )
+from arm_cli.system.setup_ledger import SetupLedger, get_setup_ledger_file
+from arm_cli.system.setup_utils import get_data_directories, get_original_user_uid_gid
+from arm_cli.utils.safe_subprocess import sudo_run
+from arm_cli.utils.walk import WALK_WORKERS
 
 
 @click.group()
@@ -15,12 +38,28 @@ def system():
     pass
 
 
+system.add_command(data)
+
+
 @system.command()
 @click.option("-f", "--force", is_flag=True, help="Skip confirmation prompts")
+@click.option(
+    "--verify", is_flag=True, help="Check every step, also those unchanged since the last run"
+)
+@click.option(
+    "--check", "check_only", is_flag=True, help="Only report what setup would change (dry run)"
+)
+@click.option("-v", "--verbose", is_flag=True, help="Also show how long each host fact took")
 @click.pass_context
-def setup(ctx, force):
+def setup(ctx, force, verify, check_only, verbose):
+    """Set up this host for the CLI: X11, shell addins, docker group and data directories
+
+    Steps whose inputs (CLI version, user, shell, files they change) are unchanged
+    since they last succeeded are skipped; use --verify to check them anyway.
+    --check exits with 1 when some step would change something.
+    """
     config = ctx.obj["config"]
-    """Generic setup (will be refined later)"""
+    start = time.monotonic()
 
     # Load project configuration
     project_config = get_active_project_config(config)
@@ -31,24 +70,187 @@ def setup(ctx, force):
     else:
         print("No active project configuration found. Using default settings.")
 
-    setup_xhost(force=force)
+    data_directory = "/DATA"  # Default fallback
+    if project_config and project_config.data_directory:
+        data_directory = project_config.data_directory
+
+    gathered = []
+
+    def gather_facts():
+        gathered.append(get_host_facts())
+        return gathered[-1]
+
+    results = run_setup_steps(
+        get_setup_steps(data_directory),
+        gather_facts,
+        force=force,
+        ledger=SetupLedger(get_setup_ledger_file()),
+        verify=verify,
+        check_only=check_only,
+    )
 
-    setup_shell(force=force)
+    print()
+    for line in format_step_results(results):
+        print(line)
+    if verbose and gathered:
+        print("\nHost facts:")
+        for name, seconds in sorted(gathered[0].timings().items()):
+            print(f"  {name}: {seconds:.2f}s")
+    print(f"\n{'Check' if check_only else 'Setup'} finished in {time.monotonic() - start:.2f}s.")
 
-    # Setup docker group (may require sudo)
-    if not setup_docker_group(force=force):
-        print("Docker group setup was not completed.")
+    if check_only:
+        if any(result.status not in (STATUS_OK, STATUS_UNCHANGED) for result in results):
+            print("Run arm-cli system setup to apply the changes.")
+            sys.exit(1)
+    elif any(
+        result.status not in (STATUS_OK, STATUS_CHANGED, STATUS_UNCHANGED) for result in results
+    ):
+        print("Some setup steps were not completed.")
         print("You can run this setup again later with: arm-cli system setup")
 
-    # Setup data directories (may require sudo)
+
+@system.command("fix-permissions")
+@click.option("-n", "--dry-run", is_flag=True, help="Only count the entries that would change")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint of an interrupted run")
+@click.option(
+    "-j",
+    "--jobs",
+    default=WALK_WORKERS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Directories scanned at once",
+)
+@click.pass_context
+def fix_permissions_command(ctx, dry_run, restart, jobs):
+    """Give everything under the data directories the owner and mode setup uses
+
+    Only entries whose owner or mode differ are changed, through batched sudo
+    commands. An interrupted run resumes where it stopped unless --restart is given.
+    """
+    config = ctx.obj["config"]
     data_directory = "/DATA"  # Default fallback
+    project_config = get_active_project_config(config)
     if project_config and project_config.data_directory:
         data_directory = project_config.data_directory
 
-    if not setup_data_directories(force=force, data_directory=data_directory):
-        print("Data directory setup was not completed.")
-        print("You can run this setup again later with: arm-cli system setup")
+    roots = [d for d in get_data_directories(data_directory) if os.path.isdir(d)]
+    if not roots:
+        print(f"No data directories found under {data_directory}.")
+        print("Create them with: arm-cli system setup")
+        sys.exit(1)
 
-    # Additional setup code can go here (e.g., starting containers,
-    # attaching, etc.)
+    uid, gid = get_original_user_uid_gid()
+    stats = fix_permissions(roots, uid, gid, dry_run=dry_run, restart=restart, workers=jobs)
+    verb = "Would change" if dry_run else "Changed"
+    print(
+        f"{verb} owner of {stats.chowned} and mode of {stats.chmodded} "
+        f"of {stats.scanned} entries in {time.monotonic() - stats.start:.1f}s."
+    )
+    if stats.resumed:
+        print(f"Skipped {stats.resumed} director(ies) finished by an interrupted run.")
+    if stats.errors:
+        for error in stats.errors[:10]:
+            print(f"  {error}")
+        print(f"{len(stats.errors)} error(s); rerun to resume.")
+        sys.exit(1)
+
+
+@system.group("registry-cache")
+def registry_cache():
+    """Run and configure a local pull-through registry cache"""
     pass
+
+
+@registry_cache.command("serve")
+@click.option("--host", default=DEFAULT_HOST, show_default=True, help="Address to listen on")
+@click.option("--port", default=5000, show_default=True, help="Port to listen on")
+@click.option("--upstream", default=DEFAULT_UPSTREAM, show_default=True, help="Upstream registry")
+@click.option(
+    "--cache-dir",
+    default=None,
+    help="Blob store location (default: <data_directory>/registry-cache)",
+)
+@click.option("--max-size", default="50G", show_default=True, help="Cache size budget, e.g. 500M")
+@click.option("-v", "--verbose", is_flag=True, help="Log every request")
+@click.pass_context
+def serve_registry_cache(ctx, host, port, upstream, cache_dir, max_size, verbose):
+    """Serve a pull-through cache of the upstream registry"""
+    config = ctx.obj["config"]
+
+    if cache_dir is None:
+        data_directory = "/DATA"  # Default fallback
+        project_config = get_active_project_config(config)
+        if project_config and project_config.data_directory:
+            data_directory = project_config.data_directory
+        cache_dir = os.path.join(data_directory, "registry-cache")
+
+    try:
+        max_bytes = parse_size(max_size)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    server = create_server(Path(cache_dir), max_bytes, upstream, host, port, verbose)
+    print(f"Caching {upstream} in {cache_dir} (budget {max_size}) on http://{host}:{port}")
+    print("Point Docker daemons at it with:")
+    print(f"  arm-cli system registry-cache configure http://<this-host>:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping registry cache.")
+    finally:
+        server.server_close()
+
+
+@registry_cache.command("configure")
+@click.argument("mirror_url")
+@click.option(
+    "--daemon-config",
+    default="/etc/docker/daemon.json",
+    show_default=True,
+    help="Docker daemon configuration file to update",
+)
+@click.option("-f", "--force", is_flag=True, help="Skip confirmation prompts")
+@click.pass_context
+def configure_registry_cache(ctx, mirror_url, daemon_config, force):
+    """Configure the local Docker daemon to pull through a registry cache"""
+    daemon_config_path = Path(daemon_config)
+    current = {}
+    if daemon_config_path.exists():
+        try:
+            current = json.loads(daemon_config_path.read_text() or "{}")
+        except json.JSONDecodeError as e:
+            print(f"Error: {daemon_config_path} is not valid JSON: {e}")
+            sys.exit(1)
+
+    updated = add_registry_mirror(current, mirror_url)
+    if updated == current:
+        print(f"{mirror_url} is already configured as a registry mirror.")
+        return
+
+    content = json.dumps(updated, indent=2) + "\n"
+    print(f"New {daemon_config_path}:")
+    print(content)
+    if not force:
+        if not click.confirm("Do you want to write this configuration?"):
+            print("Registry cache configuration cancelled.")
+            return
+
+    try:
+        if os.access(daemon_config_path.parent, os.W_OK) and (
+            not daemon_config_path.exists() or os.access(daemon_config_path, os.W_OK)
+        ):
+            daemon_config_path.write_text(content)
+        else:
+            sudo_run(
+                ["tee", str(daemon_config_path)],
+                input=content,
+                text=True,
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error writing {daemon_config_path}: {e}")
+        sys.exit(1)
+
+    print("Registry mirror configured. Restart Docker to apply it: sudo systemctl restart docker")
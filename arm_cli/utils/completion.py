@@ -0,0 +1,116 @@
+"""Dynamic shell completion served from small precomputed caches.
+
+Completing project, container or setting names must not load every project config or
+query Docker on each TAB. Instead, commands that change these names write them to a
+cache file per kind, and click's shell_complete callbacks only read that file. A cache
+past its TTL is rebuilt on the next completion.
+
+Cache files hold the expiry time (seconds since the epoch) on the first line and one
+name per line after it, so the shell addins can complete from them without starting
+Python at all.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import appdirs
+from click.shell_completion import CompletionItem
+
+# Seconds a cache is trusted before it is rebuilt. Projects and settings are also
+# rewritten whenever the CLI changes them; containers change outside of the CLI.
+COMPLETION_TTL = {"projects": 3600.0, "settings": 3600.0, "containers": 30.0}
+
+# Seconds to wait for the Docker daemon when refreshing the container cache
+CONTAINER_QUERY_TIMEOUT = 1.0
+
+
+def get_completion_dir() -> Path:
+    """Get the directory holding the completion caches."""
+    return Path(appdirs.user_cache_dir("arm-cli")) / "completion"
+
+
+def write_completion_cache(kind: str, values: Iterable[str]) -> None:
+    """Replace the cached names of a kind, ignoring errors: completion is best effort."""
+    cache_dir = get_completion_dir()
+    expires = int(time.time() + COMPLETION_TTL[kind])
+    lines = [str(expires)] + [value for value in values if value and "\n" not in value]
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_dir / f"{kind}.tmp"
+        tmp_file.write_text("\n".join(lines) + "\n")
+        os.replace(tmp_file, cache_dir / kind)
+    except OSError:
+        pass
+
+
+def read_completion_cache(kind: str) -> Optional[List[str]]:
+    """Get the cached names of a kind, or None if the cache is missing or expired."""
+    try:
+        lines = (get_completion_dir() / kind).read_text().splitlines()
+        if not lines or int(lines[0]) <= time.time():
+            return None
+    except (OSError, ValueError):
+        return None
+    return lines[1:]
+
+
+def invalidate_completion_cache(kind: str) -> None:
+    """Drop a cache so the next completion rebuilds it."""
+    try:
+        (get_completion_dir() / kind).unlink()
+    except OSError:
+        pass
+
+
+def _complete(kind: str, load: Callable[[], List[str]], incomplete: str) -> List[CompletionItem]:
+    values = read_completion_cache(kind)
+    if values is None:
+        try:
+            values = load()
+        except Exception:
+            # A failing refresh must never break the shell's completion
+            return []
+        write_completion_cache(kind, values)
+    return [CompletionItem(value) for value in values if value.startswith(incomplete)]
+
+
+def _load_project_names() -> List[str]:
+    from arm_cli.config import get_available_projects, load_config
+
+    return [project.name for project in get_available_projects(load_config())]
+
+
+def _load_container_names() -> List[str]:
+    from arm_cli.container.endpoints import DEFAULT_ENDPOINT, Endpoint, connect
+
+    client = connect(Endpoint(DEFAULT_ENDPOINT), CONTAINER_QUERY_TIMEOUT)
+    try:
+        return [
+            (summary.get("Names") or ["/" + summary["Id"][:12]])[0].lstrip("/")
+            for summary in client.api.containers()
+        ]
+    finally:
+        client.close()
+
+
+def _load_setting_names() -> List[str]:
+    from arm_cli.settings import Settings
+
+    return list(Settings.model_fields)
+
+
+def complete_projects(ctx, param, incomplete: str) -> List[CompletionItem]:
+    """shell_complete callback for project names."""
+    return _complete("projects", _load_project_names, incomplete)
+
+
+def complete_containers(ctx, param, incomplete: str) -> List[CompletionItem]:
+    """shell_complete callback for the names of running containers."""
+    return _complete("containers", _load_container_names, incomplete)
+
+
+def complete_settings(ctx, param, incomplete: str) -> List[CompletionItem]:
+    """shell_complete callback for setting keys."""
+    return _complete("settings", _load_setting_names, incomplete)
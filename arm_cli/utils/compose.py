@@ -0,0 +1,76 @@
+"""Helpers for reading a project's docker compose file."""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from arm_cli.config import ProjectConfig
+from arm_cli.utils.safe_subprocess import safe_run
+
+
+def get_compose_file(project_config: ProjectConfig) -> Optional[Path]:
+    """Get the project's docker compose file resolved to an absolute path.
+
+    Relative compose paths are resolved against the project directory, or against the
+    directory of the project config file when no project directory is set.
+
+    Returns:
+        Absolute path to the compose file, or None if docker_compose_file is not set.
+    """
+    if not project_config.docker_compose_file:
+        return None
+
+    compose_path = Path(os.path.expanduser(project_config.docker_compose_file))
+    if compose_path.is_absolute():
+        return compose_path
+
+    config_file_path = getattr(project_config, "_config_file_path", None)
+    base_dir = None
+    if project_config.project_directory:
+        base_dir = project_config.get_resolved_project_directory(config_file_path)
+    elif config_file_path is not None:
+        base_dir = str(Path(config_file_path).parent)
+
+    if base_dir is None:
+        return compose_path.resolve()
+    return (Path(base_dir) / compose_path).resolve()
+
+
+def get_compose_images(compose_file: Path) -> List[str]:
+    """Get the unique image references used by the services in a compose file.
+
+    Uses `docker compose config` so that variable interpolation, `extends` and profiles
+    are handled exactly as compose itself would.
+    """
+    try:
+        result = safe_run(
+            ["docker", "compose", "-f", str(compose_file), "config", "--images"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to read images from {compose_file}: {e.stderr}") from e
+
+    images: List[str] = []
+    for line in result.stdout.splitlines():
+        image = line.strip()
+        if image and image not in images:
+            images.append(image)
+    return images
+
+
+def get_compose_config(compose_file: Path) -> Dict[str, Any]:
+    """Get the fully resolved compose model (services, dependencies, project name)."""
+    try:
+        result = safe_run(
+            ["docker", "compose", "-f", str(compose_file), "config", "--format", "json"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to read compose config from {compose_file}: {e.stderr}") from e
+    return json.loads(result.stdout)
@@ -0,0 +1,234 @@
+"""Interactive picker that scales to thousands of choices.
+
+Only the window of choices that fits on a page is rendered, and typing filters the
+choices incrementally over an index built once when the picker opens: each keystroke
+narrows the previous matches instead of rescanning every choice, and deleting a
+character restores the matches remembered for the shorter query.
+"""
+
+import shutil
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import readchar
+
+from arm_cli.settings import get_setting
+
+DEFAULT_PAGE_SIZE = 20
+
+_UP_KEYS = (readchar.key.UP, readchar.key.CTRL_P)
+_DOWN_KEYS = (readchar.key.DOWN, readchar.key.CTRL_N)
+_ENTER_KEYS = (readchar.key.ENTER, readchar.key.CR, readchar.key.LF)
+_BACKSPACE_KEYS = (readchar.key.BACKSPACE, "\x08")
+_CANCEL_KEYS = (readchar.key.ESC, readchar.key.CTRL_C, readchar.key.CTRL_D)
+
+
+class ChoiceIndex:
+    """Case-insensitive index over choice labels, matching every space-separated term."""
+
+    def __init__(self, labels: Sequence[str]):
+        self._keys = [label.lower() for label in labels]
+        self._matches: Dict[str, List[int]] = {"": list(range(len(self._keys)))}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def filter(self, query: str) -> List[int]:
+        """Get the indices of the labels matching a query, in their original order."""
+        query = query.lower()
+        matches = self._matches.get(query)
+        if matches is not None:
+            return matches
+
+        # Narrow down the matches of the longest cached prefix of this query
+        prefix = query[:-1]
+        while prefix not in self._matches:
+            prefix = prefix[:-1]
+        terms = query.split()
+        keys = self._keys
+        matches = [i for i in self._matches[prefix] if all(term in keys[i] for term in terms)]
+        self._matches[query] = matches
+        return matches
+
+
+class Picker:
+    """State of a picker: the query, the filtered matches, the cursor and the page window."""
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        page_size: int = DEFAULT_PAGE_SIZE,
+        default: Optional[int] = None,
+    ):
+        self.labels = labels
+        self.index = ChoiceIndex(labels)
+        self.page_size = max(1, page_size)
+        self.query = ""
+        self.matches = self.index.filter("")
+        self.cursor = 0
+        self.top = 0
+        if default is not None and 0 <= default < len(labels):
+            self.cursor = default
+            self._scroll()
+
+    @property
+    def selected(self) -> Optional[int]:
+        """Index (into labels) of the highlighted choice, or None if nothing matches."""
+        return self.matches[self.cursor] if self.matches else None
+
+    def set_query(self, query: str) -> None:
+        """Filter the choices, keeping the highlighted choice if it still matches."""
+        selected = self.selected
+        self.query = query
+        self.matches = self.index.filter(query)
+        self.cursor = 0
+        if selected is not None and self.matches:
+            # Matches are in label order, so the previous selection can be found by bisection
+            lo, hi = 0, len(self.matches)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.matches[mid] < selected:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo < len(self.matches) and self.matches[lo] == selected:
+                self.cursor = lo
+        self.top = 0
+        self._scroll()
+
+    def move(self, delta: int, wrap: bool = True) -> None:
+        """Move the cursor, wrapping around the ends like a carousel when requested."""
+        if not self.matches:
+            return
+        cursor = self.cursor + delta
+        if wrap and abs(delta) == 1:
+            cursor %= len(self.matches)
+        self.cursor = min(max(cursor, 0), len(self.matches) - 1)
+        self._scroll()
+
+    def handle_key(self, key: str) -> Optional[str]:
+        """Apply a key press; returns "select" or "cancel" when the picker should close."""
+        if key in _ENTER_KEYS:
+            return "select" if self.matches else None
+        if key in _CANCEL_KEYS:
+            return "cancel"
+        if key in _UP_KEYS:
+            self.move(-1)
+        elif key in _DOWN_KEYS:
+            self.move(1)
+        elif key == readchar.key.PAGE_UP:
+            self.move(-self.page_size, wrap=False)
+        elif key == readchar.key.PAGE_DOWN:
+            self.move(self.page_size, wrap=False)
+        elif key == readchar.key.HOME:
+            self.move(-len(self.matches), wrap=False)
+        elif key == readchar.key.END:
+            self.move(len(self.matches), wrap=False)
+        elif key in _BACKSPACE_KEYS:
+            self.set_query(self.query[:-1])
+        elif len(key) == 1 and key.isprintable():
+            self.set_query(self.query + key)
+        return None
+
+    def visible(self) -> List[Tuple[int, str, bool]]:
+        """The page window as (index, label, highlighted) tuples."""
+        window = self.matches[self.top : self.top + self.page_size]
+        return [(i, self.labels[i], i == self.selected) for i in window]
+
+    def render(self, message: str, width: int) -> List[str]:
+        """Render the prompt line, the page window and a status line."""
+        lines = [f"\x1b[1m?\x1b[0m {message}: {self.query}"]
+        for _, label, highlighted in self.visible():
+            marker = "\x1b[33m>\x1b[0m " if highlighted else "  "
+            lines.append(marker + _truncate(label, width - 2))
+        if not self.matches:
+            lines.append("  (no matches)")
+        if len(self.matches) > self.page_size or self.query:
+            lines.append(
+                f"\x1b[2m  {self.cursor + 1 if self.matches else 0}/{len(self.matches)}"
+                f" (of {len(self.labels)}) - type to filter\x1b[0m"
+            )
+        return lines
+
+    def _scroll(self) -> None:
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + self.page_size:
+            self.top = self.cursor - self.page_size + 1
+
+
+def _truncate(text: str, width: int) -> str:
+    return text if len(text) <= width else text[: max(0, width - 1)] + "…"
+
+
+def get_page_size() -> int:
+    """Get the number of choices shown at once from the menu_page_size setting."""
+    page_size = get_setting("menu_page_size")
+    return page_size if isinstance(page_size, int) and page_size > 0 else DEFAULT_PAGE_SIZE
+
+
+def pick(
+    message: str,
+    choices: Sequence[Union[str, Tuple[str, Any]]],
+    default: Optional[int] = None,
+    page_size: Optional[int] = None,
+    on_highlight: Optional[Callable[[int], None]] = None,
+    read_key: Callable[[], str] = readchar.readkey,
+    output=None,
+) -> Optional[Any]:
+    """Let the user pick one of the choices, filtering as they type.
+
+    Choices are labels or (label, value) tuples. Up/Down move the cursor, PageUp and
+    PageDown move a page, Enter selects and Esc or Ctrl+C cancels.
+
+    Args:
+        message: Prompt shown above the choices.
+        choices: Labels, or (label, value) tuples.
+        default: Index of the initially highlighted choice.
+        page_size: Choices shown at once (default: the menu_page_size setting).
+        on_highlight: Called with the index of each newly highlighted choice.
+        read_key: Source of key presses.
+        output: Text stream to render to (default: stdout).
+
+    Returns:
+        The selected label or value, or None if cancelled or there were no choices.
+    """
+    if not choices:
+        return None
+    labels = [choice if isinstance(choice, str) else choice[0] for choice in choices]
+    output = output or sys.stdout
+    picker = Picker(labels, page_size or get_page_size(), default)
+    width = shutil.get_terminal_size().columns
+
+    rendered = 0
+    highlighted = None
+    action = None
+    output.write("\x1b[?25l")  # Hide the cursor while rendering
+    try:
+        while action is None:
+            lines = picker.render(message, width)
+            if rendered:
+                # Move back to the first line of the previous render and clear it
+                output.write(f"\x1b[{rendered}F\x1b[J")
+            output.write("\n".join(lines) + "\n")
+            output.flush()
+            rendered = len(lines)
+
+            if on_highlight is not None and picker.selected != highlighted:
+                highlighted = picker.selected
+                if highlighted is not None:
+                    on_highlight(highlighted)
+            try:
+                action = picker.handle_key(read_key())
+            except KeyboardInterrupt:
+                action = "cancel"
+    finally:
+        output.write(f"\x1b[{rendered}F\x1b[J" if rendered else "")
+        output.write("\x1b[?25h")
+        output.flush()
+
+    if action == "cancel" or picker.selected is None:
+        return None
+    choice = choices[picker.selected]
+    output.write(f"\x1b[1m?\x1b[0m {message}: {labels[picker.selected]}\n")
+    return choice if isinstance(choice, str) else choice[1]
@@ -37,3 +37,15 @@ def sudo_run(cmd, **kwargs):
         raise ValueError("shell=True not allowed for security reasons")
     full_cmd = ["sudo"] + cmd
     return subprocess.run(full_cmd, **kwargs)  # nosec B603
+
+
+def safe_popen(cmd, **kwargs):
+    """
+    Safe subprocess.Popen wrapper, for commands whose output is streamed.
+    - cmd must be a list
+    - shell=True is prohibited
+    """
+    _validate_cmd(cmd)
+    if kwargs.get("shell", False):
+        raise ValueError("shell=True not allowed for security reasons")
+    return subprocess.Popen(cmd, **kwargs)  # nosec B603
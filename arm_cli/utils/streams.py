@@ -0,0 +1,248 @@
+"""Streaming helpers for tar archives and compressed files.
+
+These helpers keep memory bounded by moving data in fixed size chunks, so that
+multi-gigabyte image layers never have to be staged on disk or held in memory.
+"""
+
+import gzip
+import io
+import os
+import tarfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment]
+
+CHUNK_SIZE = 1024 * 1024
+# Uncompressed bytes per gzip member when compressing in parallel
+GZIP_BLOCK_SIZE = 4 * 1024 * 1024
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class IterStream(io.RawIOBase):
+    """Readable file object over an iterable of byte chunks (e.g. a Docker API stream)."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def get_default_compression() -> str:
+    """Get the best compression available: zstd if installed, otherwise gzip."""
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def open_compressed_writer(fileobj, compression: str, workers: Optional[int] = None):
+    """Wrap a writable binary file object with a streaming compressor.
+
+    With workers, gzip compresses blocks in parallel as separate gzip members (which
+    gzip readers concatenate) and zstd uses that many threads instead of one per core.
+    The returned object must be closed to flush the compressed trailer; closing it
+    does not close the underlying file object.
+    """
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        threads = -1 if workers is None else workers
+        return zstandard.ZstdCompressor(level=3, threads=threads).stream_writer(
+            fileobj, closefd=False
+        )
+    if compression == "gzip":
+        if workers is not None:
+            return ParallelGzipWriter(fileobj, workers)
+        return gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6, mtime=0)
+    if compression == "none":
+        return _NonClosingWriter(fileobj)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def open_compressed_reader(fileobj):
+    """Wrap a readable binary file object, detecting zstd, gzip or no compression."""
+    buffered = fileobj if hasattr(fileobj, "peek") else io.BufferedReader(fileobj)
+    magic = buffered.peek(4)[:4]
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("Reading zstd compressed data requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(buffered, read_across_frames=True)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=buffered, mode="rb")
+    return buffered
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """Gzip writer that compresses fixed size blocks on several threads, like pigz.
+
+    Each block becomes a gzip member, written in order. zlib releases the GIL while it
+    compresses, and at most two blocks per worker are held at once, so memory does not
+    grow with the data. Closing it leaves the wrapped file open.
+    """
+
+    def __init__(
+        self,
+        fileobj,
+        workers: int,
+        block_size: int = GZIP_BLOCK_SIZE,
+        compresslevel: int = 6,
+    ):
+        self._fileobj = fileobj
+        self._workers = workers
+        self._block_size = block_size
+        self._compresslevel = compresslevel
+        self._buffer = bytearray()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending: Deque[Future] = deque()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buffer += b
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[: self._block_size]))
+            del self._buffer[: self._block_size]
+        return len(b)
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(
+            self._executor.submit(gzip.compress, block, self._compresslevel, mtime=0)
+        )
+        while len(self._pending) > 2 * self._workers:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def flush(self) -> None:
+        self._fileobj.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            # An empty stream still gets one member, so it is a valid gzip file
+            if self._buffer or not self._pending:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._fileobj.write(self._pending.popleft().result())
+            self._fileobj.flush()
+        finally:
+            self._executor.shutdown()
+            super().close()
+
+
+class _NonClosingWriter(io.RawIOBase):
+    """Pass-through writer whose close() leaves the wrapped file open."""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._fileobj.write(b)
+        return len(b)
+
+    def flush(self) -> None:
+        self._fileobj.flush()
+
+
+def iter_tar_stream(
+    source: tarfile.TarFile,
+    keep: Optional[Callable[[tarfile.TarInfo], bool]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Re-emit the members of a streaming tar as raw tar bytes, optionally filtered.
+
+    Unlike writing through tarfile.open(mode="w|"), this yields each member's data as it
+    is read, so it can feed a chunked HTTP upload without buffering whole members.
+    """
+    for member in source:
+        if keep is not None and not keep(member):
+            continue
+        yield member.tobuf(tarfile.PAX_FORMAT, tarfile.ENCODING, "surrogateescape")
+        if member.isreg() and member.size:
+            data = source.extractfile(member)
+            if data is None:
+                raise RuntimeError(f"Could not read tar member {member.name}")
+            while True:
+                chunk = data.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            remainder = member.size % tarfile.BLOCKSIZE
+            if remainder:
+                yield tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+    yield tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+
+
+def iter_path_tar(
+    path: Path, arcname: Optional[str] = None, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Stream a file or directory tree from disk as raw tar bytes.
+
+    Files are read in chunks as the tar is consumed, so memory stays bounded no matter
+    how large the files are. Symlinks are stored as links, not followed.
+    """
+    root = Path(path)
+    arcname = root.name if arcname is None else arcname
+    paths = [(root, arcname)]
+    if root.is_dir() and not root.is_symlink():
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            relative = Path(dirpath).relative_to(root)
+            for name in dirnames + sorted(filenames):
+                paths.append((Path(dirpath) / name, str(Path(arcname) / relative / name)))
+    return iter_files_tar(paths, chunk_size)
+
+
+def iter_files_tar(
+    paths: Iterable[Tuple[Path, str]], chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Stream (path, arcname) entries from disk as raw tar bytes, pulling paths as it goes.
+
+    Entries removed before they are reached are skipped.
+    """
+    # Only used for gettarinfo(), which tracks hardlinks and owner names
+    info_source = tarfile.TarFile(fileobj=io.BytesIO(), mode="w", format=tarfile.PAX_FORMAT)
+    for file_path, name in paths:
+        try:
+            info = info_source.gettarinfo(str(file_path), arcname=name)
+        except FileNotFoundError:
+            continue
+        if info is None:  # sockets and other unsupported file types
+            continue
+        yield info.tobuf(tarfile.PAX_FORMAT, tarfile.ENCODING, "surrogateescape")
+        if not info.isreg() or not info.size:
+            continue
+        remaining = info.size
+        with open(file_path, "rb") as f:
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise RuntimeError(f"{file_path} changed size while it was being copied")
+                remaining -= len(chunk)
+                yield chunk
+        remainder = info.size % tarfile.BLOCKSIZE
+        if remainder:
+            yield tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+    yield tarfile.NUL * (tarfile.BLOCKSIZE * 2)
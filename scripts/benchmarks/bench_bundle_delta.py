@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark bundle deltas: delta size and create/apply throughput.
+
+With --base-bundle/--new-bundle, real bundles are used. To benchmark realistic ROS
+images, create them on a machine with Docker, e.g. with a project whose compose file
+references two releases of the same ROS based images:
+
+    arm-cli projects bundle -o v1.tar.zst    # with the previous release active
+    arm-cli projects bundle -o v2.tar.zst    # after updating the images
+    python scripts/benchmarks/bench_bundle_delta.py --base-bundle v1.tar.zst --new-bundle v2.tar.zst
+
+Without bundles, a synthetic layer resembling a ROS install tree (many small scripts
+and headers plus larger shared libraries) is generated and a release is simulated by
+rebuilding a few packages.
+"""
+
+import argparse
+import io
+import random
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from arm_cli.projects.delta import DeltaWriter, apply_delta, index_base
+from arm_cli.utils.streams import CHUNK_SIZE, open_compressed_reader
+
+
+def _make_layer(rng: random.Random, packages: int, changed: set) -> bytes:
+    """Build an uncompressed layer tar with one directory per ROS package."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for pkg in range(packages):
+            pkg_rng = random.Random(pkg * 1000 + (7 if pkg in changed else 0))
+            files = [
+                (f"opt/ros/humble/lib/libpkg{pkg}.so", pkg_rng.randint(200_000, 2_000_000)),
+                (f"opt/ros/humble/share/pkg{pkg}/package.xml", 2_000),
+            ]
+            files += [
+                (f"opt/ros/humble/include/pkg{pkg}/h{i}.hpp", pkg_rng.randint(1_000, 20_000))
+                for i in range(10)
+            ]
+            for name, size in files:
+                info = tarfile.TarInfo(name)
+                info.size = size
+                info.mtime = 1_700_000_000
+                tar.addfile(
+                    info, io.BytesIO(pkg_rng.getrandbits(size * 8).to_bytes(size, "little"))
+                )
+    return buf.getvalue()
+
+
+def _uncompressed_size(path: Path) -> int:
+    size = 0
+    with open(path, "rb") as f:
+        reader = open_compressed_reader(f)
+        while True:
+            block = reader.read(CHUNK_SIZE)
+            if not block:
+                return size
+            size += len(block)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-bundle", type=Path, help="Previous bundle")
+    parser.add_argument("--new-bundle", type=Path, help="New bundle")
+    parser.add_argument("--packages", type=int, default=60, help="Synthetic packages")
+    parser.add_argument("--changed", type=int, default=3, help="Synthetic packages rebuilt")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        if args.base_bundle and args.new_bundle:
+            base_path, new_path = args.base_bundle, args.new_bundle
+        else:
+            rng = random.Random(0)
+            changed = set(rng.sample(range(args.packages), args.changed))
+            base_path = tmp_dir / "base.tar"
+            new_path = tmp_dir / "new.tar"
+            base_path.write_bytes(_make_layer(rng, args.packages, set()))
+            new_path.write_bytes(_make_layer(rng, args.packages, changed))
+
+        new_size = _uncompressed_size(new_path)
+
+        start = time.monotonic()
+        base_index, base_digest = index_base(base_path)
+        delta_path = tmp_dir / "update.delta"
+        with open(delta_path, "wb") as f, open(new_path, "rb") as new_file:
+            writer = DeltaWriter(base_index, base_digest, f, "gzip", "none")
+            reader = open_compressed_reader(new_file)
+            while True:
+                block = reader.read(CHUNK_SIZE)
+                if not block:
+                    break
+                writer.write(block)
+            writer.close()
+        create_time = time.monotonic() - start
+
+        start = time.monotonic()
+        with open(tmp_dir / "rebuilt.tar", "wb") as f:
+            apply_delta(base_path, delta_path, f)
+        apply_time = time.monotonic() - start
+        delta_size = delta_path.stat().st_size
+
+    print(f"new bundle (uncompressed): {new_size / 1e6:10.1f} MB")
+    print(f"delta file (gzip):         {delta_size / 1e6:10.1f} MB")
+    print(f"delta ratio:               {delta_size / new_size:10.2%}")
+    print(f"create throughput:         {new_size / 1e6 / create_time:10.1f} MB/s")
+    print(f"apply throughput:          {new_size / 1e6 / apply_time:10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
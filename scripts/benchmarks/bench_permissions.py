@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark the data directory permission fixer against chown -R / chmod -R.
+
+Generates an image tree (cameras / days / files), then times both approaches on a
+tree that is already correct, where a fraction of the files drifted, and where every
+file has the wrong mode. Besides time, it counts how many of a sample of files got
+their inode rewritten (a new ctime): each is a metadata write to the storage, which
+is what wears SD cards and makes chown -R slow on robots. Ownership is set to the
+current user, so no sudo is needed.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from arm_cli.system.permissions import PermissionFixer
+from arm_cli.utils.walk import WALK_WORKERS
+
+
+def make_tree(root: Path, files: int, per_dir: int) -> list:
+    """Write `files` empty images in directories of `per_dir`, all with mode 0775."""
+    paths = []
+    directories = max(files // per_dir, 1)
+    for d in range(directories):
+        directory = root / f"camera-{d % 8}" / f"day-{d // 8:04d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for i in range(per_dir):
+            path = directory / f"{i:05d}.jpg"
+            path.touch()
+            paths.append(str(path))
+    subprocess.run(["chmod", "-R", "775", str(root)], check=True)
+    return paths
+
+
+def drift(paths: list, fraction: float) -> None:
+    for path in random.Random(0).sample(paths, int(len(paths) * fraction)):
+        os.chmod(path, 0o644)
+
+
+def ctimes(paths: list) -> list:
+    return [os.stat(path).st_ctime_ns for path in paths]
+
+
+def rewritten(sample: list, before: list) -> int:
+    return sum(1 for old, new in zip(before, ctimes(sample)) if old != new)
+
+
+def time_recursive(root: Path) -> float:
+    ids = f"{os.getuid()}:{os.getgid()}"
+    start = time.perf_counter()
+    subprocess.run(["chown", "-R", ids, str(root)], check=True)
+    subprocess.run(["chmod", "-R", "775", str(root)], check=True)
+    return time.perf_counter() - start
+
+
+def time_fixer(root: Path, workers: int) -> float:
+    start = time.perf_counter()
+    PermissionFixer([str(root)], os.getuid(), os.getgid(), workers=workers).run()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1_000_000, help="Files in the tree")
+    parser.add_argument("--per-dir", type=int, default=1000, help="Files per directory")
+    parser.add_argument("--workers", type=int, default=WALK_WORKERS, help="Fixer walk threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "images"
+        start = time.perf_counter()
+        paths = make_tree(root, args.files, args.per_dir)
+        print(f"generated {len(paths)} files in {time.perf_counter() - start:.1f}s")
+        sample = random.Random(1).sample(paths, min(len(paths), 10_000))
+        print(f"inodes rewritten out of a sample of {len(sample)} files")
+        print(f"{'tree':>12} {'chown/chmod -R':>15} {'rewritten':>9} {'fixer':>8} {'rewritten':>9}")
+        for label, fraction in [("correct", 0.0), ("1% drifted", 0.01), ("all wrong", 1.0)]:
+            drift(paths, fraction)
+            before = ctimes(sample)
+            recursive = time_recursive(root)
+            recursive_rewritten = rewritten(sample, before)
+            drift(paths, fraction)
+            before = ctimes(sample)
+            fixer = time_fixer(root, args.workers)
+            fixer_rewritten = rewritten(sample, before)
+            print(
+                f"{label:>12} {recursive:14.2f}s {recursive_rewritten:9d} "
+                f"{fixer:7.2f}s {fixer_rewritten:9d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
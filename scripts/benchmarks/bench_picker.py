@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Benchmark the interactive picker with many choices.
+
+Measures opening the picker (building the index and the first render), each keystroke
+while typing a query (filtering plus rendering the page window) and deleting it again.
+"""
+
+import argparse
+import io
+import random
+import statistics
+import time
+
+from arm_cli.utils.picker import Picker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--choices", type=int, default=10_000, help="Number of choices")
+    parser.add_argument("--page-size", type=int, default=20, help="Choices shown at once")
+    parser.add_argument("--query", default="humble nav2 robot12", help="Query to type")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = ["humble", "jazzy", "nav2", "moveit", "perception", "driver", "sim", "field"]
+    labels = [
+        f"{rng.choice(words)}-{rng.choice(words)}-robot{i} (~/code/{rng.choice(words)}/{i})"
+        for i in range(args.choices)
+    ]
+    output = io.StringIO()
+
+    start = time.perf_counter()
+    picker = Picker(labels, args.page_size)
+    output.write("\n".join(picker.render("Select a project", 120)))
+    open_time = time.perf_counter() - start
+
+    def keystroke(key: str) -> float:
+        start = time.perf_counter()
+        picker.handle_key(key)
+        output.write("\n".join(picker.render("Select a project", 120)))
+        return time.perf_counter() - start
+
+    typing = [keystroke(key) for key in args.query]
+    matches = len(picker.matches)
+    deleting = [keystroke("\x7f") for _ in args.query]
+    paging = [keystroke("\x1b[6~") for _ in range(50)]
+
+    def ms(values) -> str:
+        return f"median {statistics.median(values) * 1e3:6.2f} ms, max {max(values) * 1e3:6.2f} ms"
+
+    print(f"choices:            {args.choices}")
+    print(f"open (index+render): {open_time * 1e3:6.2f} ms")
+    print(f"typing '{args.query}' ({matches} matches): {ms(typing)}")
+    print(f"deleting:           {ms(deleting)}")
+    print(f"page down:          {ms(paging)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Benchmark fuzzy project search at many projects.
+
+Builds an index of synthetic projects, persists it like `projects init` does and
+measures loading it plus ranking typical queries (substring, partial and misspelled).
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from arm_cli.projects.project_index import ProjectIndex
+
+QUERIES = ["tokyo-lidar", "gripper", "oslo-drone-slam-42", "conveyr", "teleop vision", "ar"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=10_000, help="Number of projects")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sites = ["berlin", "austin", "tokyo", "lyon", "oslo", "pune", "quebec", "denver", "seoul"]
+    words = ["nav", "arm", "lidar", "camera", "sim", "field", "dock", "fleet", "gripper", "slam"]
+    words += ["teleop", "vision", "planner", "battery", "conveyor", "inspect", "weld", "drone"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = Path(tmp) / "global_context.index.json"
+        start = time.perf_counter()
+        index = ProjectIndex()
+        for i in range(args.projects):
+            name = f"{rng.choice(sites)}-{rng.choice(words)}-{rng.choice(words)}-{i}"
+            description = f"{rng.choice(words)} stack for {rng.choice(sites)}"
+            index.add(f"/home/user/code/{name}/project_config.json", name, description)
+        index.save(index_file)
+        build_time = time.perf_counter() - start
+        size = index_file.stat().st_size
+
+        start = time.perf_counter()
+        index = ProjectIndex.load(index_file)
+        load_time = time.perf_counter() - start
+
+    print(f"projects:       {args.projects}")
+    print(f"build + save:   {build_time * 1e3:8.1f} ms ({size / 1e6:.1f} MB)")
+    print(f"load:           {load_time * 1e3:8.1f} ms")
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            matches = index.search(query)
+            timings.append(time.perf_counter() - start)
+        top = matches[0].name if matches else "-"
+        print(
+            f"search {query!r:22} median {statistics.median(timings) * 1e3:6.2f} ms" f"  top: {top}"
+        )
+
+
+if __name__ == "__main__":
+    main()
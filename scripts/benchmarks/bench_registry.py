@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark the JSON and SQLite project registry backends at fleet sizes.
+
+Each operation is timed like a CLI invocation performs it: load the global context,
+then look up, activate, add or remove a project and save.
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+from unittest.mock import patch
+
+from arm_cli import config as config_module
+from arm_cli.utils import completion
+
+
+def make_registry(tmp: Path, projects: int, backend: str) -> Path:
+    """Write a global context with synthetic projects, migrated to SQLite if asked."""
+    target = tmp / "robot-0" / "project_config.json"
+    target.parent.mkdir(parents=True)
+    target.write_text(json.dumps({"name": "robot-0"}))
+    available = [{"name": "robot-0", "path": str(target)}] + [
+        {"name": f"robot-{i}", "path": f"/fleet/robot-{i}/project_config.json"}
+        for i in range(1, projects)
+    ]
+    config_file = tmp / "global_context.json"
+    config_file.write_text(
+        json.dumps({"active_project": available[-1]["path"], "available_projects": available})
+    )
+    if backend == "sqlite":
+        config_module.load_registry_config()
+    return config_file
+
+
+def operations() -> Dict[str, Callable[[int], None]]:
+    def load(i: int) -> None:
+        config_module.load_config()
+
+    def list_projects(i: int) -> None:
+        config_module.get_available_projects(config_module.load_config())
+
+    def activate(i: int) -> None:
+        config = config_module.load_config()
+        assert config_module.activate_project(config, "robot-0") is not None
+
+    def add(i: int) -> None:
+        config = config_module.load_config()
+        config_module.add_project_to_list(config, f"/new/robot-{i}/project_config.json", "new")
+        config_module.save_config(config)
+
+    def remove(i: int) -> None:
+        config = config_module.load_config()
+        config_module.remove_project_from_list(config, f"/new/robot-{i}/project_config.json")
+        config_module.save_config(config)
+
+    return {
+        "load": load,
+        "list": list_projects,
+        "activate": activate,
+        "add": add,
+        "remove": remove,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--projects", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Fleet sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per operation")
+    args = parser.parse_args()
+
+    print(f"{'projects':>9} {'backend':>7} " + " ".join(f"{op:>10}" for op in operations()))
+    for projects in args.projects:
+        for backend in ("json", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmp:
+                tmp_path = Path(tmp)
+                with patch.object(
+                    config_module, "get_config_file", return_value=tmp_path / "global_context.json"
+                ), patch.object(
+                    config_module, "is_sqlite_registry_enabled", return_value=backend == "sqlite"
+                ), patch.object(
+                    completion, "get_completion_dir", return_value=tmp_path / "completion"
+                ):
+                    make_registry(tmp_path, projects, backend)
+                    medians = []
+                    for operation in operations().values():
+                        timings = []
+                        for i in range(args.repeat):
+                            start = time.perf_counter()
+                            operation(i)
+                            timings.append(time.perf_counter() - start)
+                        medians.append(statistics.median(timings))
+            print(
+                f"{projects:>9} {backend:>7} "
+                + " ".join(f"{median * 1e3:8.1f}ms" for median in medians)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Benchmark data sync against a sequential shutil copy.
+
+Generates an image tree (cameras / days / files), then times copying it to an empty
+destination with shutil.copytree and with DataSync at a few worker counts, and a
+repeat sync where nothing changed, which only compares the trees.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from arm_cli.system.data.sync import SYNC_WORKERS, DataSync
+
+
+def make_tree(root: Path, files: int, per_dir: int, size: int) -> int:
+    """Write `files` images of `size` random bytes in directories of `per_dir`."""
+    directories = max(files // per_dir, 1)
+    for d in range(directories):
+        directory = root / f"camera-{d % 4}" / f"day-{d // 4:04d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for i in range(per_dir):
+            (directory / f"{i:05d}.jpg").write_bytes(os.urandom(size))
+    return directories * per_dir * size
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20_000, help="Files in the tree")
+    parser.add_argument("--per-dir", type=int, default=500, help="Files per directory")
+    parser.add_argument("--size", type=int, default=200_000, help="Bytes per file")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, SYNC_WORKERS, 16], help="Sync workers"
+    )
+    parser.add_argument("--tmp", default=None, help="Directory to generate the trees in")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.tmp) as tmp:
+        src = Path(tmp) / "src"
+        total = make_tree(src, args.files, args.per_dir, args.size)
+        print(f"generated {args.files} files, {total / 1e6:.0f} MB")
+
+        def report(label: str, seconds: float, copied: int = total) -> None:
+            print(f"{label:>22} {seconds:8.2f}s {copied / 1e6 / seconds:9.1f} MB/s")
+
+        dst = Path(tmp) / "dst"
+        report("shutil.copytree", timed(lambda: shutil.copytree(src, dst)))
+        for workers in args.workers:
+            shutil.rmtree(dst)
+            report(
+                f"sync, {workers} workers", timed(DataSync(str(src), str(dst), workers=workers).run)
+            )
+        seconds = timed(DataSync(str(src), str(dst)).run)
+        print(f"{'resync, no changes':>22} {seconds:8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
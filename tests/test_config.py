@@ -1,5 +1,7 @@
 import json
+import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch
 
@@ -12,6 +14,7 @@ from arm_cli.config import (
     get_config_file,
     load_config,
     load_project_config,
+    resolved_config_batch,
     save_config,
 )
 
@@ -178,10 +181,15 @@ class TestProjectConfig:
         data = config.model_dump()
         expected = {
             "name": "test-project",
+            "extends": None,
             "description": "Test project",
             "project_directory": "/tmp/project",
             "docker_compose_file": None,
             "data_directory": None,
+            "retention_directory": None,
+            "retention_max_age": None,
+            "retention_max_size": None,
+            "retention_keep_latest": None,
         }
         assert data == expected
 
@@ -239,3 +247,86 @@ class TestProjectConfig:
         config = ProjectConfig(name="test-project", project_directory="~/projects")
         resolved = config.get_resolved_project_directory(Path("/dummy/config.json"))
         assert resolved == str(Path.home() / "projects")
+
+
+class TestProjectConfigExtends:
+    @pytest.fixture
+    def chain(self, tmp_path):
+        """A robot config extending a site base, which extends the default template."""
+        site = tmp_path / "sites" / "lyon.json"
+        site.parent.mkdir()
+        site.write_text(
+            json.dumps({"extends": "default", "name": "lyon", "data_directory": "/lyon/DATA"})
+        )
+        robot = tmp_path / "robots" / "r2" / "project_config.json"
+        robot.parent.mkdir(parents=True)
+        robot.write_text(
+            json.dumps({"extends": "../../sites/lyon.json", "name": "r2", "description": None})
+        )
+        cache_file = tmp_path / "cache" / "resolved_project_configs.json"
+        with patch("arm_cli.config.get_resolved_config_cache_file", return_value=cache_file):
+            yield site, robot, cache_file
+
+    def test_extends_chain_is_merged_root_first(self, chain):
+        """Test that each config overrides the configs it extends."""
+        _, robot, _ = chain
+        config = load_project_config(str(robot))
+        assert config.name == "r2"
+        assert config.extends == "../../sites/lyon.json"
+        assert config.data_directory == "/lyon/DATA"
+        assert config.docker_compose_file == "docker-compose.yml"  # From the default template
+        assert config.description is None  # An explicit null overrides the template
+        # Relative paths resolve against the loaded file
+        assert config.get_resolved_project_directory(robot) == str(robot.parent)
+
+    def test_merge_config_data_merges_nested_objects(self):
+        """Test that nested objects are merged while other values are replaced."""
+        from arm_cli.config import merge_config_data
+
+        base = {"env": {"A": "1", "B": "2"}, "ports": [1, 2], "name": "base"}
+        override = {"env": {"B": "3"}, "ports": [3]}
+        assert merge_config_data(base, override) == {
+            "env": {"A": "1", "B": "3"},
+            "ports": [3],
+            "name": "base",
+        }
+
+    def test_resolved_chain_is_cached_by_content(self, chain):
+        """Test that an unchanged chain is a cache lookup and edits to any file are seen."""
+        site, robot, cache_file = chain
+        load_project_config(str(robot))
+        assert cache_file.exists()
+
+        with patch("arm_cli.config._read_config_chain") as read_chain:
+            assert load_project_config(str(robot)).data_directory == "/lyon/DATA"
+            read_chain.assert_not_called()
+
+        site.write_text(json.dumps({"extends": "default", "name": "lyon", "data_directory": "/x"}))
+        assert load_project_config(str(robot)).data_directory == "/x"
+
+    def test_batch_resolves_from_threads_with_one_cache_write(self, chain):
+        """Test that configs resolved concurrently in a batch write the cache once."""
+        site, _, cache_file = chain
+        robots = []
+        for i in range(20):
+            robot = site.parent.parent / "robots" / f"batch-{i}.json"
+            robot.write_text(json.dumps({"extends": "../sites/lyon.json", "name": f"b{i}"}))
+            robots.append(robot)
+
+        with patch("arm_cli.config.os.replace", wraps=os.replace) as replace:
+            with resolved_config_batch(), ThreadPoolExecutor(max_workers=8) as executor:
+                names = list(executor.map(lambda r: load_project_config(str(r)).name, robots))
+        assert names == [f"b{i}" for i in range(20)]
+        assert replace.call_count == 1
+        assert len(json.loads(cache_file.read_text())) == 20
+        assert [p.name for p in cache_file.parent.iterdir()] == [cache_file.name]
+
+    def test_extends_cycle_is_an_error(self, tmp_path):
+        """Test that a config chain extending itself fails instead of looping."""
+        a, b = tmp_path / "a.json", tmp_path / "b.json"
+        a.write_text(json.dumps({"name": "a", "extends": "b.json"}))
+        b.write_text(json.dumps({"name": "b", "extends": "a.json"}))
+        cache_file = tmp_path / "resolved.json"
+        with patch("arm_cli.config.get_resolved_config_cache_file", return_value=cache_file):
+            with pytest.raises(ValueError, match="extends itself"):
+                load_project_config(str(a))
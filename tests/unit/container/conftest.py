@@ -0,0 +1,194 @@
+import base64
+import json
+import os
+import socket
+import socketserver
+import struct
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from arm_cli.utils.streams import IterStream, iter_path_tar
+
+
+class FakeDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Docker daemon stand-in serving a few containers over a unix socket.
+
+    Each container's filesystem is a directory on disk, used by the archive endpoints.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, containers):
+        super().__init__(str(path), FakeDaemonHandler)
+        self.path = path
+        self.containers = containers
+        self.actions = []
+
+    @property
+    def url(self):
+        return f"unix://{self.path}"
+
+
+class FakeDaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        url = urlparse(self.path)
+        container = self._container(url.path.strip("/").split("/")[-2])
+        path = self._container_path(container, url)
+        if not os.path.lexists(path):
+            return self._reply(404, b"")
+        st = os.lstat(path)
+        stat = {"name": path.name, "size": st.st_size, "mode": (1 << 31) if path.is_dir() else 0}
+        self.send_response(200)
+        self.send_header(
+            "X-Docker-Container-Path-Stat", base64.b64encode(json.dumps(stat).encode()).decode()
+        )
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts[-1] == "version":
+            return self._json({"ApiVersion": "1.41", "Version": "24.0.0"})
+        if parts[-2:] == ["containers", "json"]:
+            show_all = parse_qs(url.query).get("all") == ["1"]
+            return self._json(
+                [
+                    {"Id": c["Id"], "Names": ["/" + c["Name"]], "Status": c["State"]}
+                    for c in self.server.containers
+                    if show_all or c["State"] == "running"
+                ]
+            )
+        container = self._container(parts[-2])
+        if parts[-1] == "json":
+            return self._json({"Id": container["Id"], "Config": {"Tty": False}})
+        if parts[-1] == "logs":
+            body = b"".join(
+                struct.pack(">BxxxL", 1, len(line)) + line for line in container["Logs"]
+            )
+            return self._reply(200, body, "application/vnd.docker.raw-stream")
+        if parts[-1] == "archive":
+            path = self._container_path(container, url)
+            if not path.exists():
+                return self._reply(404, b"")
+            stat = {"name": path.name, "mode": (1 << 31) if path.is_dir() else 0}
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-tar")
+            self.send_header(
+                "X-Docker-Container-Path-Stat",
+                base64.b64encode(json.dumps(stat).encode()).decode(),
+            )
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in iter_path_tar(path):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self._reply(404, b"")
+
+    def do_PUT(self):
+        url = urlparse(self.path)
+        container = self._container(url.path.strip("/").split("/")[-2])
+        path = self._container_path(container, url)
+        body = self._read_chunked()
+        with tarfile.open(fileobj=IterStream(body), mode="r|") as tar:
+            for member in tar:
+                tar.extract(member, path)
+        for _ in body:  # tarfile stops reading at the first end-of-archive block
+            pass
+        self._reply(200, b"")
+
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        self.server.actions.append((parts[-1], self._container(parts[-2])["Name"]))
+        self._reply(204, b"")
+
+    def _read_chunked(self):
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return
+            yield self.rfile.read(size)
+            self.rfile.readline()
+
+    def _container(self, container_id):
+        return next((c for c in self.server.containers if c["Id"] == container_id), {})
+
+    def _container_path(self, container, url):
+        return container["Root"] / parse_qs(url.query)["path"][0].lstrip("/")
+
+    def _json(self, value):
+        self._reply(200, json.dumps(value).encode(), "application/json")
+
+    def _reply(self, code, body, content_type="text/plain"):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def _container(root, name, state="running"):
+    (root / name / "data").mkdir(parents=True)
+    return {
+        "Id": name.ljust(64, "0"),
+        "Name": name,
+        "State": state,
+        "Logs": [f"{name} line {i}\n".encode() for i in range(3)],
+        "Root": root / name,
+    }
+
+
+@pytest.fixture
+def daemons(tmp_path):
+    specs = {
+        "robot1": [("driver", "running"), ("camera", "running")],
+        "robot2": [("driver", "running"), ("planner", "running"), ("old", "exited")],
+    }
+    servers = {}
+    for name, containers in specs.items():
+        root = tmp_path / "containers" / name
+        server = FakeDaemon(
+            tmp_path / f"{name}.sock", [_container(root, *spec) for spec in containers]
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers[name] = server
+    yield servers
+    for server in servers.values():
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def hung_socket(tmp_path):
+    """A socket that accepts connections but never answers, like a stalled board."""
+    path = tmp_path / "hung.sock"
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    sock.listen(8)
+    yield f"unix://{path}"
+    sock.close()
+
+
+@pytest.fixture
+def contexts(tmp_path, monkeypatch, daemons):
+    """Docker contexts for the fake daemons, as `docker context create` writes them."""
+    config_dir = tmp_path / "docker"
+    for name, server in daemons.items():
+        meta_dir = config_dir / "contexts" / "meta" / f"id-{name}"
+        meta_dir.mkdir(parents=True)
+        meta = {"Name": name, "Metadata": {}, "Endpoints": {"docker": {"Host": server.url}}}
+        (meta_dir / "meta.json").write_text(json.dumps(meta))
+    monkeypatch.setenv("DOCKER_CONFIG", str(config_dir))
+    return config_dir
@@ -0,0 +1,125 @@
+import io
+import os
+import tarfile
+import tracemalloc
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.container.archive import extract_tar_stream
+from arm_cli.container.container import container
+
+
+def _invoke(*args):
+    return CliRunner().invoke(container, list(args), obj={"config": None})
+
+
+def _root(daemon, name):
+    return next(c["Root"] for c in daemon.containers if c["Name"] == name)
+
+
+def _make_maps(path):
+    (path / "floor1").mkdir(parents=True)
+    (path / "floor1" / "map.pgm").write_bytes(bytes(range(256)) * 1000)
+    (path / "floor1" / "map.yaml").write_text("image: map.pgm\nresolution: 0.05\n")
+    (path / "current").symlink_to("floor1")
+    return path
+
+
+def test_copy_fans_out_to_every_matching_container(contexts, daemons, tmp_path):
+    maps = _make_maps(tmp_path / "maps")
+
+    result = _invoke(
+        "cp", str(maps), "driver:/data", "--endpoint", "robot1", "--endpoint", "robot2"
+    )
+
+    assert result.exit_code == 0, result.output
+    for daemon in daemons.values():
+        copied = _root(daemon, "driver") / "data" / "maps"
+        assert (copied / "floor1" / "map.pgm").read_bytes() == bytes(range(256)) * 1000
+        assert (copied / "current").is_symlink()
+    assert "driver:/data @ robot1: 0.3 MB" in result.output
+    assert "Copied 0.5 MB to 2 containers" in result.output
+
+
+def test_copy_renames_to_missing_destination(contexts, daemons, tmp_path):
+    calibration = tmp_path / "calibration.yaml"
+    calibration.write_text("fx: 525.0\n")
+
+    result = _invoke("cp", str(calibration), "camera:/data/intrinsics.yaml", "--endpoint", "robot1")
+
+    assert result.exit_code == 0, result.output
+    copied = _root(daemons["robot1"], "camera") / "data" / "intrinsics.yaml"
+    assert copied.read_text() == "fx: 525.0\n"
+
+
+def test_copy_out_of_container(contexts, daemons, tmp_path):
+    _make_maps(_root(daemons["robot2"], "planner") / "data" / "maps")
+
+    result = _invoke("cp", "planner:/data/maps", str(tmp_path / "backup"), "--all-endpoints")
+
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "backup" / "floor1" / "map.yaml").read_text().startswith("image:")
+    assert (tmp_path / "backup" / "current").is_symlink()
+
+
+def test_copy_out_requires_a_single_container(contexts, tmp_path):
+    result = _invoke(
+        "cp", "driver:/data", str(tmp_path), "--endpoint", "robot1", "--endpoint", "robot2"
+    )
+
+    assert result.exit_code == 1
+    assert "found on robot1, robot2" in result.output
+
+
+def test_copy_uses_constant_memory(contexts, daemons, tmp_path):
+    """A file much larger than the chunk size is streamed without being buffered."""
+    size = 64 * 1024 * 1024
+    large_map = tmp_path / "large.pgm"
+    with open(large_map, "wb") as f:
+        f.truncate(size)
+
+    tracemalloc.start()
+    try:
+        result = _invoke("cp", str(large_map), "camera:/data", "--endpoint", "robot1")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert result.exit_code == 0, result.output
+    assert (_root(daemons["robot1"], "camera") / "data" / "large.pgm").stat().st_size == size
+    assert peak < size / 4
+
+
+def _tar_with_link(name, target, link_type=tarfile.SYMTYPE):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        maps = tarfile.TarInfo("maps")
+        maps.type = tarfile.DIRTYPE
+        tar.addfile(maps)
+        link = tarfile.TarInfo(name)
+        link.type, link.linkname = link_type, target
+        tar.addfile(link)
+    return [buf.getvalue()]
+
+
+@pytest.mark.parametrize(
+    "name, target, link_type",
+    [
+        ("maps/escape", "../../outside", tarfile.SYMTYPE),
+        ("maps/escape", "/etc", tarfile.SYMTYPE),
+        ("maps/escape", "../outside", tarfile.LNKTYPE),
+    ],
+)
+def test_extract_without_filters_refuses_links_outside_the_destination(
+    tmp_path, monkeypatch, name, target, link_type
+):
+    # Python before 3.12 (without backports) has no extraction filters
+    monkeypatch.delattr(tarfile, "tar_filter", raising=False)
+
+    with pytest.raises(ValueError, match="Refusing to link"):
+        extract_tar_stream(_tar_with_link(name, target, link_type), tmp_path, "maps")
+    assert not os.path.lexists(tmp_path / "maps" / "escape")
+
+    extract_tar_stream(_tar_with_link("maps/current", "../maps/floor1"), tmp_path / "ok", "maps")
+    assert (tmp_path / "ok" / "maps" / "current").is_symlink()
@@ -0,0 +1,98 @@
+import time
+
+import docker
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.container.container import container
+from arm_cli.container.endpoints import Endpoint, query_endpoints, resolve_endpoints
+
+
+def _invoke(*args):
+    return CliRunner().invoke(container, list(args), obj={"config": None})
+
+
+def test_resolve_endpoints(contexts, daemons):
+    endpoints = resolve_endpoints(["robot2", "unix:///tmp/other.sock", "robot2"], False)
+    assert [e.name for e in endpoints] == ["robot2", "unix:///tmp/other.sock"]
+    assert endpoints[0].host == daemons["robot2"].url
+
+    assert [e.name for e in resolve_endpoints([], True)] == ["default", "robot1", "robot2"]
+    with pytest.raises(ValueError, match="Unknown endpoint 'robot3'"):
+        resolve_endpoints(["robot3"], False)
+
+
+def test_list_merges_endpoints(contexts):
+    result = _invoke("list", "--endpoint", "robot1", "--endpoint", "robot2")
+
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0].split() == ["ENDPOINT", "CONTAINER", "ID", "NAME", "STATUS"]
+    assert [line.split()[0::2] for line in lines[1:]] == [
+        ["robot1", "driver"],
+        ["robot1", "camera"],
+        ["robot2", "driver"],
+        ["robot2", "planner"],
+    ]
+
+
+def test_unreachable_endpoint_does_not_stall_listing(daemons, hung_socket):
+    endpoints = [Endpoint("hung", hung_socket), Endpoint("robot1", daemons["robot1"].url)]
+
+    start = time.monotonic()
+    results = query_endpoints(endpoints, lambda client: client.api.containers(), timeout=0.5)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 2
+    assert results[0].error.startswith("timed out")
+    assert [c["Names"][0] for c in results[1].value] == ["/driver", "/camera"]
+
+
+def test_list_reports_unavailable_endpoints(contexts, hung_socket):
+    result = _invoke(
+        "list", "--endpoint", "robot1", "--endpoint", hung_socket, "--endpoint-timeout", "0.5"
+    )
+
+    assert result.exit_code == 0
+    assert "driver" in result.output
+    assert f"endpoint {hung_socket} unavailable: timed out" in result.output
+
+
+def test_stop_container_on_selected_endpoint(contexts, daemons, monkeypatch):
+    def choose(message, choices, **kwargs):
+        return next(value for label, value in choices if label.startswith("planner"))
+
+    monkeypatch.setattr("arm_cli.container.container.pick", choose)
+
+    result = _invoke("stop", "--endpoint", "robot1", "--endpoint", "robot2")
+
+    assert result.exit_code == 0, result.output
+    assert "Stopping planner on robot2..." in result.output
+    assert daemons["robot2"].actions == [("stop", "planner")]
+    assert daemons["robot1"].actions == []
+
+
+@pytest.mark.parametrize(
+    "error",
+    [docker.errors.DockerException("Error while fetching server API version"), OSError("reset")],
+)
+def test_stop_container_reports_connection_errors(contexts, daemons, monkeypatch, error):
+    def get(self, endpoint, container_id):
+        raise error
+
+    monkeypatch.setattr(
+        "arm_cli.container.container.pick", lambda message, choices, **kw: choices[0][1]
+    )
+    monkeypatch.setattr("arm_cli.container.container.Prefetcher.get", get)
+
+    result = _invoke("stop", "--endpoint", "robot1")
+
+    assert result.exit_code == 0, result.output
+    assert f"Error stopping container: {error}" in result.output
+    assert daemons["robot1"].actions == []
+
+
+def test_logs_by_name_includes_stopped_containers(contexts):
+    result = _invoke("logs", "old", "--all-endpoints", "--endpoint-timeout", "1")
+
+    assert "old line 0\nold line 1\nold line 2\n" in result.output
@@ -0,0 +1,114 @@
+import base64
+import json
+import time
+
+from arm_cli.container.container import get_attach_command
+from arm_cli.container.endpoints import Endpoint
+from arm_cli.container.prefetch import Prefetcher
+
+# Round trip to a robot board over a slow link
+DELAY = 0.1
+
+
+class SlowResponse:
+    def __init__(self, status_code, stat=None):
+        self.status_code = status_code
+        self.headers = {}
+        if stat is not None:
+            encoded = base64.b64encode(json.dumps(stat).encode()).decode()
+            self.headers["X-Docker-Container-Path-Stat"] = encoded
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class SlowAPI:
+    """Docker API stand-in where every request takes DELAY seconds."""
+
+    base_url = "http+docker://localhost"
+    api_version = "1.41"
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = 0
+
+    def inspect_container(self, container_id):
+        self.requests += 1
+        time.sleep(DELAY)
+        return {"Id": container_id, "State": {"Running": True}}
+
+    def head(self, url, params):
+        self.requests += 1
+        time.sleep(DELAY)
+        if params["path"] in self.files:
+            return SlowResponse(200, {"name": params["path"].lstrip("/"), "mode": 0})
+        return SlowResponse(404)
+
+
+class SlowClient:
+    def __init__(self, files=("/ros_entrypoint.sh",)):
+        self.api = SlowAPI(files)
+
+
+def _connect_slowly(connections):
+    def connect(endpoint):
+        time.sleep(DELAY)
+        connections.append(endpoint)
+        return SlowClient()
+
+    return connect
+
+
+def _selection_to_action_latency(prefetcher, candidates, choice):
+    """Simulate the picker: candidates are shown, the user thinks, then picks one."""
+    prefetcher.start(candidates)
+    time.sleep(5 * DELAY)
+    selected = time.monotonic()
+    prefetched = prefetcher.get(*choice)
+    return time.monotonic() - selected, prefetched
+
+
+def test_prefetch_makes_selected_action_start_immediately():
+    """With prefetching, the chosen container is ready as soon as it is selected."""
+    robot = Endpoint("robot1", "ssh://robot1")
+    candidates = [(robot, f"container{i}") for i in range(4)]
+    connections = []
+
+    with Prefetcher(_connect_slowly(connections), resolve_exec=True) as prefetcher:
+        latency, prefetched = _selection_to_action_latency(prefetcher, candidates, candidates[2])
+
+    assert latency < DELAY / 2
+    assert prefetched.attrs["Id"] == "container2"
+    assert prefetched.entrypoints == ["/ros_entrypoint.sh"]
+    # Every candidate on an endpoint shares one warm connection
+    assert connections == [robot]
+
+
+def test_selection_without_prefetch_waits_for_round_trips():
+    """Baseline: without candidates, connecting, inspecting and resolving happen after selection."""
+    robot = Endpoint("robot1", "ssh://robot1")
+
+    with Prefetcher(_connect_slowly([]), resolve_exec=True) as prefetcher:
+        latency, _ = _selection_to_action_latency(prefetcher, [], (robot, "container2"))
+
+    # connect + inspect + one stat per entrypoint
+    assert latency >= 4 * DELAY
+
+
+def test_unlikely_choice_is_fetched_on_demand():
+    """A container beyond the prefetched candidates is still fetched when chosen."""
+    robot = Endpoint("robot1", "ssh://robot1")
+    candidates = [(robot, f"container{i}") for i in range(20)]
+
+    with Prefetcher(_connect_slowly([]), max_workers=1) as prefetcher:
+        _, prefetched = _selection_to_action_latency(prefetcher, candidates, candidates[-1])
+
+    assert prefetched.attrs["Id"] == "container19"
+
+
+def test_attach_command_sources_resolved_entrypoints():
+    assert get_attach_command(["/ros_entrypoint.sh"]) == "source /ros_entrypoint.sh\nexec bash"
+    assert "if [ -f /interactive_entrypoint.sh ]" in get_attach_command(None)
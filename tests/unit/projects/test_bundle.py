@@ -0,0 +1,173 @@
+import hashlib
+import io
+import json
+import tarfile
+
+import pytest
+
+from arm_cli.projects.bundle import (
+    BUNDLE_METADATA,
+    get_chain_ids,
+    load_bundle,
+    read_bundle_metadata,
+    write_bundle,
+)
+from arm_cli.utils.streams import zstandard
+
+
+def _digest(data):
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def _add(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    tar.addfile(info, io.BytesIO(data))
+
+
+class FakeImage:
+    def __init__(self, diff_ids):
+        self.attrs = {"RootFS": {"Type": "layers", "Layers": diff_ids}}
+
+
+class FakeImages:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, ref):
+        return FakeImage(self.client.images_by_ref[ref])
+
+    def list(self, all=False):
+        return [FakeImage(diff_ids) for diff_ids in self.client.local_images]
+
+
+class FakeAPI:
+    def __init__(self, client):
+        self.client = client
+        self.loaded = None
+
+    def get_image(self, ref, chunk_size=None):
+        """Export an image as an OCI layout `docker save` stream, in small chunks."""
+        layers = self.client.layer_data[ref]
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            paths = []
+            for data in layers:
+                path = "blobs/sha256/" + _digest(data).split(":")[1]
+                _add(tar, path, data)
+                paths.append(path)
+            config = json.dumps({"rootfs": {"diff_ids": [_digest(d) for d in layers]}}).encode()
+            config_path = "blobs/sha256/" + _digest(config).split(":")[1]
+            _add(tar, config_path, config)
+            manifest_blob = json.dumps({"config": config_path, "layers": paths}).encode()
+            _add(tar, "blobs/sha256/" + _digest(manifest_blob).split(":")[1], manifest_blob)
+            index = {
+                "schemaVersion": 2,
+                "mediaType": "application/vnd.oci.image.index.v1+json",
+                "manifests": [
+                    {
+                        "mediaType": "application/vnd.oci.image.manifest.v1+json",
+                        "digest": _digest(manifest_blob),
+                        "size": len(manifest_blob),
+                        "annotations": {"io.containerd.image.name": ref},
+                    }
+                ],
+            }
+            _add(tar, "index.json", json.dumps(index).encode())
+            _add(tar, "oci-layout", b'{"imageLayoutVersion": "1.0.0"}')
+            manifest = [{"Config": config_path, "RepoTags": [ref], "Layers": paths}]
+            _add(tar, "manifest.json", json.dumps(manifest).encode())
+        data = buf.getvalue()
+        return (data[i : i + 1000] for i in range(0, len(data), 1000))
+
+    def load_image(self, data):
+        stream = b"".join(data)
+        with tarfile.open(fileobj=io.BytesIO(stream), mode="r") as tar:
+            self.loaded = {m.name: tar.extractfile(m).read() for m in tar if m.isreg()}
+        yield {"stream": "Loaded image\n"}
+
+
+class FakeDockerClient:
+    def __init__(self, layer_data, local_images=None):
+        self.layer_data = layer_data
+        self.images_by_ref = {
+            ref: [_digest(data) for data in layers] for ref, layers in layer_data.items()
+        }
+        self.local_images = local_images or []
+        self.images = FakeImages(self)
+        self.api = FakeAPI(self)
+
+
+BASE = b"base layer " * 2000
+ROS = b"ros layer " * 500
+APP_V1 = b"app v1 " * 100
+APP_V2 = b"app v2 " * 100
+
+
+@pytest.fixture
+def layer_data():
+    return {"ros:humble": [BASE, ROS], "app:1": [BASE, ROS, APP_V1]}
+
+
+@pytest.mark.parametrize(
+    "compression",
+    ["gzip", "none"]
+    + [pytest.param("zstd", marks=pytest.mark.skipif(zstandard is None, reason="no zstandard"))],
+)
+def test_write_bundle_deduplicates_shared_layers(tmp_path, layer_data, compression):
+    """Layers shared between images are stored once in the bundle."""
+    client = FakeDockerClient(layer_data)
+    bundle_path = tmp_path / "bundle.tar"
+
+    with open(bundle_path, "wb") as f:
+        stats = write_bundle(client, ["ros:humble", "app:1"], f, compression)
+
+    assert stats["images"] == 2
+    assert stats["deduplicated_bytes"] == len(BASE) + len(ROS)
+
+    metadata = read_bundle_metadata(bundle_path)
+    assert [image["ref"] for image in metadata["images"]] == ["ros:humble", "app:1"]
+    assert metadata["images"][1]["diff_ids"] == [_digest(BASE), _digest(ROS), _digest(APP_V1)]
+
+
+def test_load_bundle_skips_layers_present_on_target(tmp_path, layer_data):
+    """Only layers whose chain is missing on the target are sent to the daemon."""
+    with open(tmp_path / "bundle.tar.gz", "wb") as f:
+        write_bundle(FakeDockerClient(layer_data), ["ros:humble", "app:1"], f, "gzip")
+
+    # The target already has the ROS image, so only the app layer is missing
+    target = FakeDockerClient({}, local_images=[[_digest(BASE), _digest(ROS)]])
+    loaded, skipped = load_bundle(target, tmp_path / "bundle.tar.gz")
+
+    assert (loaded, skipped) == (1, 2)
+    sent = target.api.loaded
+    assert APP_V1 in sent.values()
+    assert BASE not in sent.values()
+    assert ROS not in sent.values()
+    assert "manifest.json" in sent
+    assert BUNDLE_METADATA not in sent
+
+
+def test_get_chain_ids_depend_on_parent_layers():
+    """The same layer on top of a different parent has a different chain id."""
+    first = get_chain_ids(["sha256:a", "sha256:b"])
+    second = get_chain_ids(["sha256:c", "sha256:b"])
+    assert first[0] == "sha256:a"
+    assert first[1] != second[1]
+
+
+def test_write_bundle_merges_oci_layout_entries(tmp_path, layer_data):
+    """The bundle is an OCI layout too, with an index of every image."""
+    with open(tmp_path / "bundle.tar", "wb") as f:
+        write_bundle(FakeDockerClient(layer_data), ["ros:humble", "app:1"], f, "none")
+
+    with tarfile.open(tmp_path / "bundle.tar") as tar:
+        names = tar.getnames()
+        index = json.load(tar.extractfile("index.json"))
+        layout = json.load(tar.extractfile("oci-layout"))
+    assert names.count("index.json") == names.count("oci-layout") == 1
+    assert layout == {"imageLayoutVersion": "1.0.0"}
+    assert index["mediaType"] == "application/vnd.oci.image.index.v1+json"
+    refs = [m["annotations"]["io.containerd.image.name"] for m in index["manifests"]]
+    assert refs == ["ros:humble", "app:1"]
+    assert all("blobs/sha256/" + m["digest"].split(":")[1] in names for m in index["manifests"])
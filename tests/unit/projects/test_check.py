@@ -0,0 +1,97 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import AvailableProject, GlobalContext
+from arm_cli.projects import check, project_index
+from arm_cli.projects.check import STATUS_BROKEN, STATUS_DEAD, STATUS_OK, check_projects
+from arm_cli.projects.projects import projects
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Projects in every state, with the global context stored in a temporary dir."""
+
+    def project(name, config=None, compose=True):
+        project_dir = tmp_path / name
+        project_dir.mkdir()
+        config_file = project_dir / "project_config.json"
+        if config is not None:
+            config_file.write_text(config)
+        if compose:
+            (project_dir / "docker-compose.yml").write_text("services: {}\n")
+        return AvailableProject(name=name, path=str(config_file))
+
+    def config(name):
+        return json.dumps(
+            {"name": name, "project_directory": ".", "docker_compose_file": "docker-compose.yml"}
+        )
+
+    available = [
+        project("healthy", config("healthy")),
+        project("no-compose", config("no-compose"), compose=False),
+        project("deleted"),
+        project("corrupt", "{not json"),
+    ]
+    config_file = tmp_path / "global_context.json"
+    with patch("arm_cli.config.get_config_file", return_value=config_file), patch.object(
+        check, "get_config_file", return_value=config_file
+    ), patch.object(project_index, "get_config_file", return_value=config_file):
+        yield GlobalContext(active_project=available[2].path, available_projects=available)
+
+
+def test_check_projects(registry):
+    health = check_projects(registry.available_projects)
+    assert [h.status for h in health] == [STATUS_OK, STATUS_BROKEN, STATUS_DEAD, STATUS_DEAD]
+    assert health[1].problems[0].startswith("compose file missing")
+    assert health[2].problems == ["config missing"]
+    assert health[3].problems[0].startswith("config unreadable")
+
+
+def test_check_caches_parses_by_mtime(registry):
+    check_projects(registry.available_projects)
+    with patch.object(check, "_parse_project", wraps=check._parse_project) as parse:
+        check_projects(registry.available_projects)
+        # Only the unreadable config is parsed again, in case a parent it extends was fixed
+        assert [call.args[0].parent.name for call in parse.call_args_list] == ["corrupt"]
+
+        config_file = registry.available_projects[0].path
+        with open(config_file, "w") as f:
+            json.dump({"name": "healthy", "project_directory": "./gone"}, f)
+        os.utime(config_file, ns=(1, 1))
+        health = check_projects(registry.available_projects)
+        assert parse.call_count == 3  # corrupt again, and the edited config
+        assert health[0].status == STATUS_BROKEN
+
+
+def test_ls_check_reports_table_and_json(registry):
+    runner = CliRunner()
+    result = runner.invoke(projects, ["ls", "--check"], obj={"config": registry})
+    assert result.exit_code == 1
+    lines = result.output.splitlines()
+    assert lines[0].split() == ["STATUS", "NAME", "PATH", "PROBLEMS"]
+    assert [line.split()[0] for line in lines[1:]] == ["OK", "BROKEN", "DEAD", "DEAD"]
+
+    result = runner.invoke(projects, ["ls", "--check", "--json"], obj={"config": registry})
+    entries = json.loads(result.output)
+    assert [(e["name"], e["status"], e["active"]) for e in entries] == [
+        ("healthy", "ok", False),
+        ("no-compose", "broken", False),
+        ("deleted", "dead", True),
+        ("corrupt", "dead", False),
+    ]
+
+
+def test_ls_prune_removes_dead_projects(registry, tmp_path):
+    result = CliRunner().invoke(projects, ["ls", "--prune", "--yes"], obj={"config": registry})
+    assert result.exit_code == 0, result.output
+    assert "Pruned 2 project(s)." in result.output
+
+    saved = json.loads((tmp_path / "global_context.json").read_text())
+    assert [p["name"] for p in saved["available_projects"]] == ["healthy", "no-compose"]
+    assert saved["active_project"] == ""
+    assert not (tmp_path / "global_context.json.tmp").exists()
+    assert (tmp_path / "global_context.check.json").exists()
@@ -0,0 +1,72 @@
+import gzip
+import io
+import random
+
+import pytest
+
+from arm_cli.projects.delta import (
+    MAX_CHUNK,
+    MIN_CHUNK,
+    DeltaWriter,
+    apply_delta,
+    index_base,
+    iter_chunks,
+)
+
+
+def _random_bytes(size, seed):
+    return random.Random(seed).getrandbits(size * 8).to_bytes(size, "little")
+
+
+@pytest.fixture
+def base_data():
+    return _random_bytes(2 * 1024 * 1024, seed=1)
+
+
+def _write_delta(base_path, new_data, path, write_size=10240):
+    base_index, base_digest = index_base(base_path)
+    with open(path, "wb") as f:
+        writer = DeltaWriter(base_index, base_digest, f, "gzip", "gzip")
+        for i in range(0, len(new_data), write_size):
+            writer.write(new_data[i : i + write_size])
+        writer.close()
+    return writer.stats
+
+
+def test_iter_chunks_respects_size_limits(base_data):
+    """Chunks stay within the size limits and cover the whole stream."""
+    chunks = list(iter_chunks(io.BytesIO(base_data), read_size=4096))
+    assert b"".join(chunks) == base_data
+    assert all(len(c) <= MAX_CHUNK for c in chunks)
+    assert all(len(c) >= MIN_CHUNK for c in chunks[:-1])
+
+
+def test_delta_round_trip_after_insertion(tmp_path, base_data):
+    """An insertion only costs the chunks around it, and apply rebuilds the new bundle."""
+    base_path = tmp_path / "base.tar.gz"
+    base_path.write_bytes(gzip.compress(base_data))
+    middle = len(base_data) // 2
+    new_data = base_data[:middle] + b"updated config file" + base_data[middle:]
+
+    stats = _write_delta(base_path, new_data, tmp_path / "update.delta")
+
+    assert stats["literal_bytes"] <= 2 * MAX_CHUNK
+    assert stats["copied_bytes"] + stats["literal_bytes"] == len(new_data)
+    assert (tmp_path / "update.delta").stat().st_size < len(new_data) // 4
+
+    out = io.BytesIO()
+    result = apply_delta(base_path, tmp_path / "update.delta", out)
+    assert result["size"] == len(new_data)
+    assert gzip.decompress(out.getvalue()) == new_data
+
+
+def test_apply_delta_rejects_wrong_base(tmp_path, base_data):
+    """Applying a delta to a different base is refused before writing output."""
+    base_path = tmp_path / "base.tar"
+    base_path.write_bytes(base_data)
+    _write_delta(base_path, base_data + b"more", tmp_path / "update.delta")
+
+    other_path = tmp_path / "other.tar"
+    other_path.write_bytes(_random_bytes(1024, seed=2))
+    with pytest.raises(ValueError, match="not the base bundle"):
+        apply_delta(other_path, tmp_path / "update.delta", io.BytesIO())
@@ -0,0 +1,86 @@
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import AvailableProject, GlobalContext
+from arm_cli.projects.foreach import get_log_file
+from arm_cli.projects.projects import projects
+
+
+@pytest.fixture
+def config(tmp_path):
+    available = []
+    for name in ["lyon-r1", "lyon-r2", "oslo-r1"]:
+        project_dir = tmp_path / name
+        project_dir.mkdir()
+        config_file = project_dir / "project_config.json"
+        config_file.write_text(
+            json.dumps({"name": name, "project_directory": ".", "data_directory": f"/data/{name}"})
+        )
+        available.append(AvailableProject(name=name, path=str(config_file)))
+    return GlobalContext(active_project=available[0].path, available_projects=available)
+
+
+def _foreach(config, *args):
+    with patch("arm_cli.config.save_config") as save_config:
+        result = CliRunner().invoke(projects, ["foreach", *args], obj={"config": config})
+        save_config.assert_not_called()
+    return result
+
+
+def test_foreach_runs_in_each_project_with_its_env(config, tmp_path):
+    script = 'echo "$ARM_PROJECT_NAME $ARM_PROJECT_DATA_DIRECTORY $(pwd)"'
+    result = _foreach(config, "--", "sh", "-c", script)
+    assert result.exit_code == 0, result.output
+    for name in ["lyon-r1", "lyon-r2", "oslo-r1"]:
+        assert f"[{name}] {name} /data/{name} {tmp_path / name}" in result.output
+    assert "3/3 projects succeeded." in result.output
+    assert config.active_project == config.available_projects[0].path
+
+
+def test_foreach_filters_and_reports_exit_codes(config):
+    script = '[ "$ARM_PROJECT_NAME" != lyon-r2 ] || exit 3'
+    result = _foreach(config, "--filter", "lyon-*", "--", "sh", "-c", script)
+    assert result.exit_code == 1
+    rows = {line.split()[0]: line.split()[1] for line in result.output.splitlines()[1:] if line}
+    assert rows["lyon-r1"] == "0"
+    assert rows["lyon-r2"] == "3"
+    assert "oslo-r1" not in result.output
+    assert "1/2 projects succeeded." in result.output
+
+
+def test_foreach_writes_per_project_logs(config, tmp_path):
+    log_dir = tmp_path / "logs"
+    result = _foreach(config, "--log-dir", str(log_dir), "--", "sh", "-c", "echo $ARM_PROJECT_NAME")
+    assert result.exit_code == 0, result.output
+    assert get_log_file(log_dir, config.available_projects[2]).read_text() == "oslo-r1\n"
+    assert "] oslo-r1" not in result.output
+
+
+def test_foreach_logs_projects_with_the_same_name_apart(config, tmp_path):
+    for project in config.available_projects:
+        project.name = "robot"
+    log_dir = tmp_path / "logs"
+    result = _foreach(config, "--log-dir", str(log_dir), "--", "sh", "-c", "pwd")
+    assert result.exit_code == 0, result.output
+    logs = sorted(path.read_text() for path in log_dir.iterdir())
+    assert logs == [f"{tmp_path / name}\n" for name in ["lyon-r1", "lyon-r2", "oslo-r1"]]
+
+
+def test_foreach_runs_projects_concurrently(config):
+    start = time.monotonic()
+    result = _foreach(config, "-j", "3", "--", "sleep", "0.5")
+    assert result.exit_code == 0, result.output
+    assert time.monotonic() - start < 1.0
+
+
+def test_foreach_reports_missing_project_directory(config, tmp_path):
+    (tmp_path / "oslo-r1" / "project_config.json").write_text(
+        json.dumps({"name": "oslo-r1", "project_directory": "/nonexistent"})
+    )
+    result = _foreach(config, "--", "true")
+    assert result.exit_code == 1
+    assert "project directory not found: /nonexistent" in result.output
@@ -0,0 +1,172 @@
+import json
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import AvailableProject, GlobalContext
+from arm_cli.projects import project_index
+from arm_cli.projects.project_index import (
+    ProjectIndex,
+    get_index_file,
+    is_ambiguous,
+    update_project_index,
+)
+from arm_cli.projects.projects import projects
+
+PROJECTS = {
+    "navigation": "Nav2 stack for the warehouse robots",
+    "manipulation": "MoveIt configuration for the arm",
+    "perception": "Camera and lidar drivers",
+    "nav-sim": "Gazebo simulation of the navigation stack",
+}
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Global context with real project config files, stored in a temporary config dir."""
+    available = []
+    for name, description in PROJECTS.items():
+        path = tmp_path / name / "project_config.json"
+        path.parent.mkdir()
+        path.write_text(json.dumps({"name": name, "description": description}))
+        available.append(AvailableProject(name=name, path=str(path)))
+    config_file = tmp_path / "global_context.json"
+    with patch("arm_cli.config.get_config_file", return_value=config_file), patch.object(
+        project_index, "get_config_file", return_value=config_file
+    ):
+        yield GlobalContext(available_projects=available)
+
+
+def _names(matches):
+    return [match.name for match in matches]
+
+
+def test_search_ranks_name_matches_first(config):
+    index = update_project_index(config)
+
+    assert _names(index.search("nav"))[:2] == ["nav-sim", "navigation"]
+    assert _names(index.search("navigation")) == ["navigation", "nav-sim"]
+    assert _names(index.search("lidar")) == ["perception"]
+    # Typos still match by shared trigrams
+    assert _names(index.search("manipulaton"))[0] == "manipulation"
+    assert index.search("zzz") == []
+
+
+def test_ambiguity():
+    index = ProjectIndex()
+    index.add("/a/config.json", "robot-arm")
+    index.add("/b/config.json", "robot-base")
+    index.add("/c/config.json", "camera")
+
+    assert is_ambiguous(index.search("robot"))
+    assert not is_ambiguous(index.search("robot-b"))
+
+
+def test_index_is_persisted_and_updated_incrementally(config):
+    update_project_index(config)
+    assert get_index_file().name == "global_context.index.json"
+    assert get_index_file().exists()
+
+    removed = config.available_projects.pop(0)
+    with patch.object(project_index, "_read_description", return_value="") as read:
+        index = update_project_index(config)
+        read.assert_not_called()
+
+    assert removed.path not in index
+    assert ProjectIndex.load(get_index_file()).search("navigation")[0].name == "nav-sim"
+
+    config.available_projects.append(AvailableProject(name="docking", path="/x/docking.json"))
+    with patch.object(project_index, "_read_description", return_value="") as read:
+        index = update_project_index(config)
+        read.assert_called_once_with("/x/docking.json")
+    assert _names(index.search("dock")) == ["docking"]
+
+
+def test_index_compacts_removed_entries():
+    index = ProjectIndex()
+    for i in range(10):
+        index.add(f"/p{i}.json", f"project{i}")
+    for i in range(8):
+        index.remove(f"/p{i}.json")
+
+    index._compact()
+
+    assert len(index.projects) == 2
+    assert _names(index.search("project9"))[0] == "project9"
+
+
+def test_search_is_fast_with_many_projects():
+    rng = random.Random(0)
+    sites = ["berlin", "austin", "tokyo", "lyon", "oslo", "pune", "quebec", "denver"]
+    words = ["nav", "arm", "lidar", "camera", "sim", "field", "dock", "fleet", "gripper", "slam"]
+    words += ["teleop", "vision", "planner", "battery", "conveyor", "inspect", "weld", "drone"]
+    index = ProjectIndex()
+    for i in range(10_000):
+        name = f"{rng.choice(sites)}-{rng.choice(words)}-{rng.choice(words)}-{i}"
+        description = f"{rng.choice(words)} stack for {rng.choice(sites)}"
+        index.add(f"/home/user/code/{name}/project_config.json", name, description)
+
+    index.search("warm up")  # Joins the postings of the bulk add, as loading would
+
+    timings = []
+    for query in ["tokyo-lidar", "oslo-drone-slam-42", "conveyr", "weld", "teleop-vision"]:
+        start = time.perf_counter()
+        index.search(query)
+        timings.append(time.perf_counter() - start)
+
+    assert sorted(timings)[len(timings) // 2] < 0.01
+    assert index.search("lyon-dock-camera-")[0].name.startswith("lyon-dock-camera-")
+
+
+def test_activate_resolves_partial_name(config):
+    with patch("arm_cli.projects.activate.activate_project") as activate:
+        activate.return_value = None
+        result = CliRunner().invoke(projects, ["activate", "percep"], obj={"config": config})
+
+    assert result.exit_code == 0, result.output
+    assert activate.call_args_list[-1].args[1].endswith("perception/project_config.json")
+
+
+def test_activate_picks_between_ambiguous_matches(config):
+    with patch("arm_cli.projects.activate.activate_project", return_value=None), patch(
+        "arm_cli.projects.activate.pick", return_value=None
+    ) as pick:
+        result = CliRunner().invoke(projects, ["activate", "nav"], obj={"config": config})
+
+    assert "Cancelled." in result.output
+    labels = [label for label, _ in pick.call_args.args[1]]
+    assert labels[0].startswith("nav-sim") and labels[1].startswith("navigation")
+
+
+def test_many_substring_matches_skip_the_fuzzy_pass_and_the_full_scan():
+    index = ProjectIndex()
+    for i in range(20):
+        index.add(f"/robot{i}.json", f"robot{i}")
+    index.add("/other.json", "other")
+
+    class NoScan(list):
+        def __iter__(self):
+            raise AssertionError("searched every project")
+
+    index.projects = NoScan(index.projects)
+    matches = index.search("robot", limit=5)
+    assert len(matches) == 5 and all(m.name.startswith("robot") for m in matches)
+
+
+def test_loaded_index_is_reused_until_the_file_changes(config):
+    update_project_index(config)
+    index_file = get_index_file()
+    with patch.object(project_index.json, "load", wraps=json.load) as load:
+        index = ProjectIndex.load(index_file)
+        assert ProjectIndex.load(index_file) is index
+        load.assert_not_called()
+
+        other = ProjectIndex()
+        other.add("/x/docking.json", "docking")
+        other.save(index_file.with_name("elsewhere.json"))
+        index_file.write_text(index_file.with_name("elsewhere.json").read_text())
+        assert _names(ProjectIndex.load(index_file).search("dock")) == ["docking"]
+        load.assert_called_once()
@@ -1,4 +1,5 @@
 import json
+import subprocess
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
@@ -210,3 +211,64 @@ def test_projects_help(runner):
     assert "init" in result.output
     assert "ls" in result.output
     assert "remove" in result.output
+
+
+def test_projects_info_format(runner, mock_config, temp_project_config):
+    """Test that info --format prints every requested field in one call."""
+    project_config = ProjectConfig(**{**temp_project_config, "description": "It's a test"})
+
+    with patch("arm_cli.projects.info.get_active_project_config") as mock_get_config:
+        mock_get_config.return_value = project_config
+
+        result = runner.invoke(projects, ["info", "--format", "json"], obj={"config": mock_config})
+        assert result.exit_code == 0
+        assert json.loads(result.output) == {
+            **temp_project_config,
+            "description": "It's a test",
+            "extends": None,
+            "retention_directory": None,
+            "retention_max_age": None,
+            "retention_max_size": None,
+            "retention_keep_latest": None,
+        }
+
+        result = runner.invoke(
+            projects,
+            ["info", "--format", "shell", "--field", "name", "--field", "description"],
+            obj={"config": mock_config},
+        )
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            "export ARM_PROJECT_NAME=test-project",
+            "export ARM_PROJECT_DESCRIPTION='It'\"'\"'s a test'",
+        ]
+
+        result = runner.invoke(
+            projects,
+            ["info", "--format", "env", "--field", "project_directory"],
+            obj={"config": mock_config},
+        )
+        assert result.output == "ARM_PROJECT_DIRECTORY=/tmp/test-project\n"
+
+        result = runner.invoke(
+            projects, ["info", "--format", "env", "--field", "bogus"], obj={"config": mock_config}
+        )
+        assert result.output.startswith("Unknown field: bogus")
+
+
+def test_projects_info_shell_format_is_eval_safe(runner, mock_config, temp_project_config):
+    """Test that shell exports round-trip values with quotes and substitutions."""
+    description = "$(touch /tmp/pwned) `id` 'quoted' \"double\"\nsecond line"
+    project_config = ProjectConfig(**{**temp_project_config, "description": description})
+
+    with patch("arm_cli.projects.info.get_active_project_config") as mock_get_config:
+        mock_get_config.return_value = project_config
+        result = runner.invoke(projects, ["info", "--format", "shell"], obj={"config": mock_config})
+
+    env = subprocess.run(
+        ["bash", "-c", f'{result.output}\nprintf %s "$ARM_PROJECT_DESCRIPTION"'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert env.stdout == description
@@ -0,0 +1,174 @@
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import docker
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext, ProjectConfig
+from arm_cli.projects.projects import projects
+from arm_cli.projects.pull import PullProgress, is_image_current, pull_images
+
+
+class FakeRegistry:
+    """Stand-in for a registry: image reference -> (digest, [(layer_id, size), ...])."""
+
+    def __init__(self, images):
+        self.images = images
+
+
+class FakeImage:
+    def __init__(self, repo_digests):
+        self.attrs = {"RepoDigests": repo_digests}
+
+
+class FakeRegistryData:
+    def __init__(self, digest):
+        self.id = digest
+
+
+class FakeImages:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, ref):
+        if ref not in self.client.local:
+            raise docker.errors.ImageNotFound(ref)
+        return FakeImage([f"{ref.split(':')[0]}@{self.client.local[ref]}"])
+
+    def get_registry_data(self, ref):
+        return FakeRegistryData(self.client.registry.images[ref][0])
+
+
+class FakeAPI:
+    def __init__(self, client):
+        self.client = client
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.pulled = []
+        self._lock = threading.Lock()
+
+    def pull(self, ref, stream=False, decode=False):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            digest, layers = self.client.registry.images[ref]
+            yield {"status": f"Pulling from {ref}", "id": ref.split(":")[-1]}
+            for layer_id, size in layers:
+                time.sleep(0.01)
+                yield {
+                    "status": "Downloading",
+                    "id": layer_id,
+                    "progressDetail": {"current": size // 2, "total": size},
+                }
+                yield {"status": "Pull complete", "id": layer_id, "progressDetail": {}}
+            yield {"status": f"Digest: {digest}"}
+            self.client.local[ref] = digest
+            self.pulled.append(ref)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeDockerClient:
+    def __init__(self, registry, local=None):
+        self.registry = registry
+        self.local = dict(local or {})
+        self.images = FakeImages(self)
+        self.api = FakeAPI(self)
+
+
+@pytest.fixture
+def registry():
+    return FakeRegistry(
+        {
+            "ros:humble": ("sha256:aaa", [("base", 1000), ("ros", 500)]),
+            "app:latest": ("sha256:bbb", [("base", 1000), ("app", 200)]),
+            "tools:latest": ("sha256:ccc", [("base", 1000), ("tools", 300)]),
+            "db:latest": ("sha256:ddd", [("db", 400)]),
+        }
+    )
+
+
+def test_is_image_current(registry):
+    """Images whose local digest matches the registry are current."""
+    client = FakeDockerClient(registry, local={"ros:humble": "sha256:aaa", "app:latest": "old"})
+    assert is_image_current(client, "ros:humble")
+    assert not is_image_current(client, "app:latest")
+    assert not is_image_current(client, "db:latest")
+
+
+def test_pull_images_skips_current_and_respects_limit(registry):
+    """Current images are skipped and no more than `jobs` pulls run at once."""
+    client = FakeDockerClient(registry, local={"ros:humble": "sha256:aaa"})
+    images = ["ros:humble", "app:latest", "tools:latest", "db:latest"]
+
+    results = pull_images(client, images, jobs=2)
+
+    assert results["ros:humble"] == ("skipped", None)
+    for image in images[1:]:
+        assert results[image] == ("pulled", None)
+    assert sorted(client.api.pulled) == sorted(images[1:])
+    assert client.api.max_in_flight <= 2
+
+
+def test_pull_progress_counts_shared_layers_once():
+    """A layer reported by several image streams is only counted once."""
+    progress = PullProgress(["a", "b"], min_interval=60.0)
+    for _ in range(2):
+        progress.update(
+            {"status": "Downloading", "id": "base", "progressDetail": {"current": 5, "total": 10}}
+        )
+    progress.update({"status": "Pull complete", "id": "base"})
+    progress.update({"status": "Already exists", "id": "other"})
+
+    assert progress.totals() == (10, 10)
+    assert progress.done_layers == {"base", "other"}
+
+
+def test_pull_images_reports_errors(registry):
+    """Errors in the pull stream are reported per image without aborting the rest."""
+    registry.images["broken:latest"] = ("sha256:eee", [])
+    client = FakeDockerClient(registry)
+
+    original_pull = client.api.pull
+
+    def pull(ref, **kwargs):
+        if ref == "broken:latest":
+            return iter([{"error": "manifest unknown"}])
+        return original_pull(ref, **kwargs)
+
+    client.api.pull = pull
+    results = pull_images(client, ["broken:latest", "db:latest"], jobs=2)
+
+    assert results["broken:latest"] == ("failed", "manifest unknown")
+    assert results["db:latest"] == ("pulled", None)
+
+
+def test_projects_pull_command(registry, tmp_path):
+    """The pull command pulls every image from the project's compose file."""
+    compose_file = tmp_path / "docker-compose.yml"
+    compose_file.write_text("services: {}\n")
+    project_config = ProjectConfig(
+        name="robot", project_directory=str(tmp_path), docker_compose_file="docker-compose.yml"
+    )
+    client = FakeDockerClient(registry, local={"ros:humble": "sha256:aaa"})
+
+    with patch(
+        "arm_cli.projects.pull.get_active_project_config", return_value=project_config
+    ), patch(
+        "arm_cli.projects.pull.get_compose_images", return_value=["ros:humble", "db:latest"]
+    ) as mock_images, patch(
+        "arm_cli.projects.pull.docker.from_env", return_value=client
+    ):
+        result = CliRunner().invoke(
+            projects, ["pull", "--jobs", "2"], obj={"config": GlobalContext()}
+        )
+
+    assert result.exit_code == 0, result.output
+    mock_images.assert_called_once_with(Path(compose_file))
+    assert "Up to date: ros:humble" in result.output
+    assert "Pulled: db:latest" in result.output
@@ -0,0 +1,174 @@
+import subprocess
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import docker
+import pytest
+
+from arm_cli.projects.rollout import get_container_health, get_rollout_batches, rollout
+
+SERVICES = {
+    "db": {"image": "postgres:16"},
+    "api": {"image": "robot/api:2", "depends_on": {"db": {"condition": "service_healthy"}}},
+    "ui": {"image": "robot/ui:2", "depends_on": {"api": {"condition": "service_started"}}},
+    "driver": {"image": "robot/driver:2", "depends_on": {"db": {}}},
+    "logger": {"image": "robot/logger:2"},
+}
+
+
+class FakeContainer:
+    def __init__(self, service, image_id, state):
+        self.service = service
+        self.attrs = {"Image": image_id, "State": state}
+
+    def reload(self):
+        pass
+
+
+class FakeImage:
+    def __init__(self, client, image_id):
+        self.client = client
+        self.image_id = image_id
+
+    def tag(self, ref):
+        self.client.tags[ref] = self.image_id
+
+
+class FakeImages:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, image_id):
+        return FakeImage(self.client, image_id)
+
+
+class FakeContainers:
+    def __init__(self, client):
+        self.client = client
+
+    def list(self, all=False, filters=None):
+        service = filters["label"][1].split("=", 1)[1]
+        return [self.client.containers_by_service[service]]
+
+
+class FakeDockerClient:
+    """Compose project where recreating a service gives it the image its tag points to."""
+
+    def __init__(self, unhealthy=()):
+        self.unhealthy = set(unhealthy)
+        self.tags = {service["image"]: f"sha256:new-{name}" for name, service in SERVICES.items()}
+        self.containers_by_service = {
+            name: FakeContainer(name, f"sha256:old-{name}", {"Status": "running"})
+            for name in SERVICES
+        }
+        self.recreated = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.images = FakeImages(self)
+        self.containers = FakeContainers(self)
+
+    def recreate(self, compose_file, services):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        for name in services:
+            image_id = self.tags[SERVICES[name]["image"]]
+            state = {"Status": "running"}
+            if name in self.unhealthy and "new" in image_id:
+                state["Health"] = {"Status": "unhealthy"}
+            self.containers_by_service[name] = FakeContainer(name, image_id, state)
+            self.recreated.append(name)
+        with self._lock:
+            self.in_flight -= 1
+
+
+def _rollout(client, **kwargs):
+    options = dict(batch_size=1, max_unavailable=1, timeout=5.0, on_failure="abort")
+    options.update(kwargs)
+    with patch("arm_cli.projects.rollout.recreate_services", side_effect=client.recreate):
+        return rollout(
+            client, Path("docker-compose.yml"), {"name": "robot", "services": SERVICES}, **options
+        )
+
+
+def test_rollout_batches_follow_reverse_dependency_order():
+    """Dependents are restarted before their dependencies, never mixed within a batch."""
+    assert get_rollout_batches(SERVICES, batch_size=2) == [
+        ["driver", "logger"],
+        ["ui"],
+        ["api"],
+        ["db"],
+    ]
+
+
+def test_rollout_batches_detect_cycles():
+    services = {"a": {"depends_on": ["b"]}, "b": {"depends_on": ["a"]}}
+    with pytest.raises(ValueError, match="cycle"):
+        get_rollout_batches(services, batch_size=1)
+
+
+def test_container_health():
+    assert get_container_health(FakeContainer("a", "", {"Status": "running"})) == "healthy"
+    assert get_container_health(FakeContainer("a", "", {"Status": "exited"})) == "failed"
+    starting = {"Status": "running", "Health": {"Status": "starting"}}
+    assert get_container_health(FakeContainer("a", "", starting)) == "starting"
+
+
+def test_rollout_recreates_all_services(capsys):
+    client = FakeDockerClient()
+
+    assert _rollout(client, batch_size=3, max_unavailable=2)
+
+    assert client.recreated.index("ui") < client.recreated.index("api")
+    assert client.recreated[-1] == "db"
+    assert client.max_in_flight <= 2
+
+
+def test_rollout_aborts_on_unhealthy_batch():
+    client = FakeDockerClient(unhealthy={"ui"})
+
+    assert not _rollout(client, on_failure="abort")
+
+    assert "api" not in client.recreated
+    assert client.containers_by_service["ui"].attrs["Image"] == "sha256:new-ui"
+
+
+def test_rollout_rolls_back_to_previous_images():
+    client = FakeDockerClient(unhealthy={"ui"})
+
+    assert not _rollout(client, on_failure="rollback")
+
+    assert client.containers_by_service["ui"].attrs["Image"] == "sha256:old-ui"
+    assert client.containers_by_service["driver"].attrs["Image"] == "sha256:old-driver"
+    assert client.tags["robot/ui:2"] == "sha256:old-ui"
+
+
+def test_rollout_rolls_back_when_docker_fails_mid_batch():
+    client = FakeDockerClient()
+    recreate = client.recreate
+
+    def failing_recreate(compose_file, services):
+        if services == ["ui"] and client.tags["robot/ui:2"] == "sha256:new-ui":
+            raise docker.errors.APIError("daemon went away")
+        recreate(compose_file, services)
+
+    client.recreate = failing_recreate
+    assert not _rollout(client, on_failure="rollback")
+    assert client.containers_by_service["driver"].attrs["Image"] == "sha256:old-driver"
+
+
+def test_rollback_continues_past_services_that_cannot_be_recreated(capsys):
+    client = FakeDockerClient(unhealthy={"ui"})
+    recreate = client.recreate
+
+    def failing_recreate(compose_file, services):
+        if services == ["ui"] and client.tags["robot/ui:2"] == "sha256:old-ui":
+            raise subprocess.CalledProcessError(1, "docker", stderr="no such image")
+        recreate(compose_file, services)
+
+    client.recreate = failing_recreate
+    assert not _rollout(client, on_failure="rollback")
+    assert "Could not recreate ui: no such image" in capsys.readouterr().out
+    assert client.containers_by_service["driver"].attrs["Image"] == "sha256:old-driver"
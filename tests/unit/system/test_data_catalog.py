@@ -0,0 +1,150 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext
+from arm_cli.system.data import catalog as catalog_module
+from arm_cli.system.data.catalog import DataCatalog, get_source, index_trees, parse_time
+from arm_cli.system.system import system
+
+T_1400 = time.mktime((2024, 5, 1, 14, 0, 0, 0, 0, -1))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """/DATA with an image a minute from 13:50 to 14:39 per camera, and an influxdb2 file."""
+    root = tmp_path / "DATA"
+    for camera in ["front", "rear"]:
+        directory = root / "images" / camera / "2024-05-01"
+        directory.mkdir(parents=True)
+        for minute in range(-10, 40):
+            image = directory / f"{minute + 10:02d}.jpg"
+            image.write_bytes(b"x" * 100)
+            mtime = T_1400 + minute * 60
+            os.utime(image, (mtime, mtime))
+    (root / "influxdb2").mkdir()
+    (root / "influxdb2" / "data.tsm").write_bytes(b"y" * 500)
+    return root
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = DataCatalog(tmp_path / "catalog.db")
+    yield catalog
+    catalog.close()
+
+
+def test_get_source():
+    assert get_source("/DATA/images/front/2024-05-01", "/DATA") == "images/front"
+    assert get_source("/DATA/influxdb2", "/DATA") == "influxdb2"
+    assert get_source("/DATA", "/DATA") == ""
+
+
+def test_parse_time():
+    assert parse_time("2024-05-01 14:00") == T_1400
+    assert parse_time("2024-05-01T14:00:00") == T_1400
+    assert parse_time("14:30", now=T_1400) == T_1400 + 1800
+    assert parse_time("2h", now=T_1400) == T_1400 - 7200
+    with pytest.raises(ValueError):
+        parse_time("yesterday")
+
+
+def test_query_by_time_range_and_source(data_dir, catalog):
+    roots = [str(data_dir)]
+    stats = index_trees(catalog, roots)
+    assert (stats.dirs, stats.files) == (7, 101)
+
+    files = list(catalog.query(roots, T_1400, T_1400 + 1800, ["images/rear"]))
+    assert len(files) == 30
+    assert files[0].path == str(data_dir / "images" / "rear" / "2024-05-01" / "10.jpg")
+    assert [f.mtime for f in files] == sorted(f.mtime for f in files)
+    assert {f.source for f in files} == {"images/rear"}
+
+    assert len(list(catalog.query(roots, until=T_1400, sources=["images/*"]))) == 20
+    assert len(list(catalog.query([str(data_dir / "influxdb2")]))) == 1
+
+
+def test_repeat_index_only_rescans_changed_directories(data_dir, catalog):
+    roots = [str(data_dir)]
+    index_trees(catalog, roots)
+    with patch.object(catalog_module, "scan_dir", wraps=catalog_module.scan_dir) as scan_dir:
+        stats = index_trees(catalog, roots)
+    assert scan_dir.call_count == 0 and stats.dirs == 7
+
+    front = data_dir / "images" / "front" / "2024-05-01"
+    (front / "00.jpg").unlink()
+    (front / "new.jpg").write_bytes(b"z")
+    stats = index_trees(catalog, roots)
+    assert (stats.scanned, stats.files) == (1, 50)
+    paths = {f.path for f in catalog.query(roots, sources=["images/front"])}
+    assert str(front / "new.jpg") in paths and str(front / "00.jpg") not in paths
+
+    # Directories that are gone are dropped with their files
+    for image in front.iterdir():
+        image.unlink()
+    front.rmdir()
+    stats = index_trees(catalog, roots)
+    assert stats.removed == 1
+    assert not list(catalog.query(roots, sources=["images/front"]))
+
+
+def test_index_and_query_commands(data_dir, tmp_path):
+    runner = CliRunner()
+    obj = {"config": GlobalContext()}
+    with patch.object(catalog_module, "get_catalog_file", return_value=tmp_path / "catalog.db"):
+        result = runner.invoke(system, ["data", "query", str(data_dir)], obj=obj)
+        assert result.exit_code == 1
+        assert "not indexed" in result.output
+
+        result = runner.invoke(system, ["data", "index", str(data_dir)], obj=obj)
+        assert result.exit_code == 0, result.output
+        result = runner.invoke(system, ["data", "index", str(data_dir / "images")], obj=obj)
+        assert result.exit_code == 1
+        assert "index that instead" in result.output
+        # Updating a nested directory updates the root it was indexed from
+        result = runner.invoke(
+            system, ["data", "query", str(data_dir / "images"), "--update"], obj=obj
+        )
+        assert result.exit_code == 0, result.output
+
+        args = ["data", "query", str(data_dir), "--source", "images/front"]
+        args += ["--since", "2024-05-01 14:00", "--until", "2024-05-01 14:05"]
+        result = runner.invoke(system, args, obj=obj)
+        assert result.exit_code == 0, result.output
+        assert result.stdout.splitlines() == [
+            str(data_dir / "images" / "front" / "2024-05-01" / f"{i}.jpg") for i in range(10, 15)
+        ]
+
+        file_list = tmp_path / "files.txt"
+        result = runner.invoke(system, args + ["-l", "-o", str(file_list)], obj=obj)
+        assert "Wrote 5 files" in result.output
+        first = file_list.read_text().splitlines()[0].split()
+        assert first[:4] == ["2024-05-01", "14:00:00", "100", "images/front"]
+
+
+def test_each_directory_is_indexed_from_one_root(data_dir, catalog):
+    images = str(data_dir / "images")
+    index_trees(catalog, [images])
+    assert {f.source for f in catalog.query([images])} == {"front/2024-05-01", "rear/2024-05-01"}
+
+    # An enclosing root takes the nested one over, with sources relative to itself
+    index_trees(catalog, [str(data_dir)])
+    assert catalog.get_roots() == [str(data_dir)]
+    assert {f.source for f in catalog.query([images])} == {"images/front", "images/rear"}
+
+    with pytest.raises(ValueError, match="inside"):
+        index_trees(catalog, [images])
+    assert {f.source for f in catalog.query([images])} == {"images/front", "images/rear"}
+
+
+def test_nested_roots_cannot_be_indexed_together(data_dir, tmp_path):
+    catalog = DataCatalog(tmp_path / "other.db")
+    try:
+        with pytest.raises(ValueError, match="inside"):
+            index_trees(catalog, [str(data_dir), str(data_dir / "images")])
+        assert catalog.get_roots() == []
+    finally:
+        catalog.close()
@@ -0,0 +1,93 @@
+import io
+import os
+import tarfile
+import time
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext, ProjectConfig
+from arm_cli.system.data import export as export_module
+from arm_cli.system.data.catalog import DataCatalog, index_trees
+from arm_cli.system.data.export import export_files
+from arm_cli.system.system import system
+from arm_cli.utils.streams import open_compressed_reader
+
+T_1400 = time.mktime((2024, 5, 1, 14, 0, 0, 0, 0, -1))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """/DATA with an image a minute from 14:00 to 14:09 per camera."""
+    root = tmp_path / "DATA"
+    for camera in ["front", "rear"]:
+        directory = root / "images" / camera
+        directory.mkdir(parents=True)
+        for minute in range(10):
+            image = directory / f"{minute}.jpg"
+            image.write_bytes(f"{camera} {minute} ".encode() * 5000)
+            mtime = T_1400 + minute * 60
+            os.utime(image, (mtime, mtime))
+    return root
+
+
+def _members(archive: bytes):
+    with tarfile.open(fileobj=open_compressed_reader(io.BytesIO(archive)), mode="r|") as tar:
+        return {member.name: tar.extractfile(member).read() for member in tar}
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd", "none"])
+def test_export_files_writes_a_compressed_tar(data_dir, tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    catalog = DataCatalog(tmp_path / "catalog.db")
+    index_trees(catalog, [str(data_dir)])
+    files = catalog.query([str(data_dir)], T_1400 + 120, T_1400 + 300, ["images/front"])
+    out = io.BytesIO()
+    stats = export_files(files, str(data_dir), out, compression, workers=2)
+    catalog.close()
+
+    members = _members(out.getvalue())
+    assert sorted(members) == [f"images/front/{minute}.jpg" for minute in (2, 3, 4)]
+    assert members["images/front/3.jpg"] == (data_dir / "images" / "front" / "3.jpg").read_bytes()
+    assert stats.files == 3 and stats.written_bytes == len(out.getvalue())
+    if compression != "none":
+        assert stats.written_bytes < stats.tar_bytes
+
+
+def test_export_command_streams_to_stdout(data_dir, tmp_path):
+    project = ProjectConfig(name="robot", data_directory=str(data_dir))
+    with patch.object(
+        export_module, "get_active_project_config", return_value=project
+    ), patch.object(export_module, "get_catalog_file", return_value=tmp_path / "catalog.db"):
+        result = CliRunner().invoke(
+            system,
+            ["data", "export", "--since", "2024-05-01 14:08", "-o", "-", "--compression", "gzip"],
+            obj={"config": GlobalContext()},
+        )
+    assert result.exit_code == 0, result.stderr
+    assert sorted(_members(result.stdout_bytes)) == [
+        "images/front/8.jpg",
+        "images/front/9.jpg",
+        "images/rear/8.jpg",
+        "images/rear/9.jpg",
+    ]
+    assert "Exported 4 files" in result.stderr
+
+
+def test_export_updates_the_root_holding_the_data_directory(data_dir, tmp_path):
+    catalog = DataCatalog(tmp_path / "catalog.db")
+    index_trees(catalog, [str(data_dir.parent)])
+    catalog.close()
+    (data_dir / "images" / "front" / "new.jpg").write_bytes(b"new")
+
+    project = ProjectConfig(name="robot", data_directory=str(data_dir))
+    with patch.object(
+        export_module, "get_active_project_config", return_value=project
+    ), patch.object(export_module, "get_catalog_file", return_value=tmp_path / "catalog.db"):
+        result = CliRunner().invoke(
+            system, ["data", "export", "-o", "-"], obj={"config": GlobalContext()}
+        )
+    assert result.exit_code == 0, result.stderr
+    assert "images/front/new.jpg" in _members(result.stdout_bytes)
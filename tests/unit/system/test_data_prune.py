@@ -0,0 +1,175 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext, ProjectConfig
+from arm_cli.system.data import prune as prune_module
+from arm_cli.system.data.prune import (
+    BatchDeleter,
+    PruneStats,
+    RetentionPolicy,
+    get_retention_policy,
+    parse_duration,
+    prune,
+    remove_empty_dirs,
+)
+from arm_cli.system.system import system
+
+NOW = time.time()
+DAY = 86400.0
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Two cameras with one image per day for the last ten days (image i is i days old)."""
+    root = tmp_path / "DATA" / "images"
+    for camera in ["front", "rear"]:
+        for age in range(10):
+            directory = root / camera / f"day-{age}"
+            directory.mkdir(parents=True)
+            image = directory / "0.jpg"
+            image.write_bytes(b"x" * 4096)
+            mtime = NOW - age * DAY - 60
+            os.utime(image, (mtime, mtime))
+    return root
+
+
+def _ages(root):
+    return {
+        camera: sorted(int(d.name.split("-")[1]) for d in (root / camera).iterdir())
+        for camera in ["front", "rear"]
+    }
+
+
+def _size(root):
+    return sum(os.lstat(p).st_blocks * 512 for p in root.rglob("*.jpg"))
+
+
+def test_parse_duration():
+    assert parse_duration("90m") == 5400
+    assert parse_duration("12h") == 43200
+    assert parse_duration("2w") == 14 * DAY
+    assert parse_duration("30") == 30 * DAY
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_max_age_deletes_old_files_and_their_directories(images):
+    stats = prune(RetentionPolicy(str(images), max_age=5 * DAY), now=NOW)
+    assert stats.deleted["age"][0] == 10
+    # Emptied day directories go, cameras stay
+    assert _ages(images) == {"front": [0, 1, 2, 3, 4], "rear": [0, 1, 2, 3, 4]}
+
+
+def test_remove_empty_dirs_removes_emptied_parents_once(tmp_path):
+    root = tmp_path / "images"
+    leaves = [
+        root / "front" / "2024" / f"{day:02}" / f"{hour:02}"
+        for day in range(5)
+        for hour in range(4)
+    ]
+    for leaf in leaves:
+        leaf.mkdir(parents=True)
+    (root / "front" / "2024" / "03" / "keep.jpg").write_bytes(b"x")
+
+    with patch.object(prune_module.os, "rmdir", wraps=os.rmdir) as rmdir:
+        remove_empty_dirs({str(leaf) for leaf in leaves}, str(root))
+    tried = [call.args[0] for call in rmdir.call_args_list]
+    assert len(tried) == len(set(tried))
+    assert sorted(p.name for p in (root / "front" / "2024").iterdir()) == ["03"]
+    assert list((root / "front" / "2024" / "03").iterdir()) == [
+        root / "front" / "2024" / "03" / "keep.jpg"
+    ]
+
+
+def test_keep_latest_protects_newest_files_per_camera(images):
+    (images / "rear" / "day-0" / "0.jpg").unlink()
+    stats = prune(RetentionPolicy(str(images), max_age=DAY, keep_latest=3), now=NOW)
+    assert _ages(images) == {"front": [0, 1, 2], "rear": [0, 1, 2, 3]}
+    assert stats.kept[0] == 6
+
+
+def test_max_size_deletes_oldest_files_first(images):
+    per_file = _size(images) // 20
+    stats = prune(RetentionPolicy(str(images), max_size=12 * per_file), now=NOW)
+    assert stats.deleted["quota"][0] == 8
+    assert _ages(images) == {"front": list(range(6)), "rear": list(range(6))}
+    assert _size(images) <= 12 * per_file
+
+
+def test_dry_run_reports_without_deleting(images):
+    before = _size(images)
+    stats = prune(
+        RetentionPolicy(str(images), max_age=7 * DAY, max_size=before // 2), dry_run=True, now=NOW
+    )
+    assert _size(images) == before
+    assert (stats.deleted["age"][0], stats.deleted["quota"][0]) == (6, 4)
+    assert stats.deleted_bytes == before - stats.kept[1]
+
+
+def test_deletes_are_batched_and_rate_limited(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"{i}.jpg"
+        path.touch()
+        paths.append(path)
+    sleeps = []
+    deleter = BatchDeleter(PruneStats(), rate=1.0, batch_size=2, sleep=sleeps.append)
+    for path in paths:
+        deleter.add(str(path), 0, "age")
+    assert len(sleeps) == 2 and not paths[3].exists() and paths[4].exists()
+    deleter.flush()
+    assert len(sleeps) == 3 and all(0 < s <= 2 for s in sleeps)
+    # Files removed by something else in the meantime are not errors
+    deleter.add(str(paths[0]), 0, "age")
+    deleter.flush()
+    assert deleter.stats.deleted["age"][0] == 5 and not deleter.stats.errors
+
+
+def test_policy_comes_from_project_config_with_overrides(tmp_path):
+    project = ProjectConfig(
+        name="robot",
+        data_directory=str(tmp_path),
+        retention_max_age="30d",
+        retention_keep_latest=10,
+    )
+    policy = get_retention_policy(project, max_size="1G")
+    assert policy == RetentionPolicy(str(tmp_path / "images"), 30 * DAY, 1 << 30, 10)
+    with pytest.raises(ValueError):
+        get_retention_policy(project, max_age="forever")
+
+
+def test_prune_command(images):
+    runner = CliRunner()
+    project = ProjectConfig(name="robot", data_directory=str(images.parent))
+    with patch.object(prune_module, "get_active_project_config", return_value=project):
+        result = runner.invoke(system, ["data", "prune"], obj={"config": GlobalContext()})
+        assert result.exit_code == 1
+        assert "No retention policy" in result.output
+
+        result = runner.invoke(
+            system,
+            ["data", "prune", "--max-age", "5d", "--dry-run"],
+            obj={"config": GlobalContext()},
+        )
+        assert result.exit_code == 0, result.output
+        assert "Would delete 10 of 20 files" in result.output
+
+        result = runner.invoke(
+            system,
+            ["data", "prune", "--max-age", "5d"],
+            input="n\n",
+            obj={"config": GlobalContext()},
+        )
+        assert "Prune cancelled." in result.output
+        assert len(list(images.rglob("*.jpg"))) == 20
+
+        result = runner.invoke(
+            system, ["data", "prune", "--max-age", "5d", "-y"], obj={"config": GlobalContext()}
+        )
+    assert result.exit_code == 0, result.output
+    assert "Deleted 10 of 20 files" in result.output
+    assert len(list(images.rglob("*.jpg"))) == 10
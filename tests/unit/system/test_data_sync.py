@@ -0,0 +1,152 @@
+import errno
+import os
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext
+from arm_cli.system.data import sync as sync_module
+from arm_cli.system.data.sync import DataSync, copy_file
+from arm_cli.system.system import system
+
+MTIME = 1714564800
+
+
+@pytest.fixture
+def src(tmp_path):
+    """Images of two cameras, each with its own mode and mtime."""
+    root = tmp_path / "robot" / "images"
+    for camera in ["front", "rear"]:
+        directory = root / camera
+        directory.mkdir(parents=True)
+        for i in range(3):
+            image = directory / f"{i}.jpg"
+            image.write_bytes(f"{camera} {i}".encode() * 1000)
+            image.chmod(0o640)
+            os.utime(image, (MTIME + i, MTIME + i))
+    return root
+
+
+def _tree(root):
+    return {
+        str(path.relative_to(root)): (path.read_bytes(), int(path.stat().st_mtime))
+        for path in root.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_copies_missing_and_changed_files_only(src, tmp_path):
+    dst = tmp_path / "workstation" / "images"
+    stats = DataSync(str(src), str(dst)).run()
+    assert (stats.scanned, stats.copied) == (6, 6)
+    assert _tree(dst) == _tree(src)
+    assert (dst / "front" / "0.jpg").stat().st_mode & 0o777 == 0o640
+
+    (src / "front" / "new.jpg").write_bytes(b"new")
+    (src / "rear" / "1.jpg").write_bytes(b"rewritten")
+    (dst / "only-here.jpg").write_bytes(b"kept")
+    stats = DataSync(str(src), str(dst)).run()
+    assert stats.copied == 2
+    assert _tree(dst) == {**_tree(src), "only-here.jpg": (b"kept", _tree(dst)["only-here.jpg"][1])}
+
+
+def test_checksum_finds_changes_with_the_same_size_and_mtime(src, tmp_path):
+    dst = tmp_path / "dst"
+    DataSync(str(src), str(dst)).run()
+    image = dst / "front" / "0.jpg"
+    image.write_bytes(image.read_bytes().upper())
+    os.utime(image, (MTIME, MTIME))
+
+    assert DataSync(str(src), str(dst)).run().copied == 0
+    stats = DataSync(str(src), str(dst), checksum=True).run()
+    assert (stats.copied, stats.unchanged) == (1, 5)
+    assert _tree(dst) == _tree(src)
+
+
+def test_dry_run_copies_nothing(src, tmp_path):
+    dst = tmp_path / "dst"
+    stats = DataSync(str(src), str(dst), dry_run=True, checkpoint_file=tmp_path / "cp").run()
+    assert stats.copied == 6 and stats.copied_bytes == sum(len(c) for c, _ in _tree(src).values())
+    assert not dst.exists() and not (tmp_path / "cp").exists()
+
+
+def test_interrupted_sync_resumes_without_rescanning(src, tmp_path):
+    dst = tmp_path / "dst"
+    checkpoint = tmp_path / "checkpoint"
+    interrupted = str(dst / "rear" / "2.jpg")
+
+    def interrupting_copy(src_path, dst_path):
+        if dst_path == interrupted:
+            raise KeyboardInterrupt
+        return copy_file(src_path, dst_path)
+
+    with patch.object(sync_module, "copy_file", side_effect=interrupting_copy):
+        with pytest.raises(KeyboardInterrupt):
+            DataSync(str(src), str(dst), checkpoint_file=checkpoint).run()
+    assert checkpoint.exists()
+
+    with patch.object(sync_module, "map_tree") as map_tree:
+        stats = DataSync(str(src), str(dst), checkpoint_file=checkpoint).run()
+    map_tree.assert_not_called()
+    assert stats.copied >= 1 and stats.copied + stats.unchanged + stats.resumed == 6
+    assert _tree(dst) == _tree(src)
+    assert not checkpoint.exists()
+
+
+@pytest.mark.parametrize("unsupported", [["copy_file_range"], ["copy_file_range", "sendfile"]])
+def test_copy_falls_back_when_the_kernel_cannot_copy(tmp_path, unsupported):
+    src = tmp_path / "src.bin"
+    src.write_bytes(os.urandom(300000))
+
+    def no_kernel_copy(*args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    patches = [patch.object(os, name, side_effect=no_kernel_copy) for name in unsupported]
+    for p in patches:
+        p.start()
+    try:
+        assert copy_file(str(src), str(tmp_path / "out" / "dst.bin")) == 300000
+    finally:
+        for p in patches:
+            p.stop()
+    assert (tmp_path / "out" / "dst.bin").read_bytes() == src.read_bytes()
+    assert os.listdir(tmp_path / "out") == ["dst.bin"]
+
+
+def test_sync_command(src, tmp_path):
+    dst = tmp_path / "dst"
+    runner = CliRunner()
+    with patch.object(
+        sync_module, "get_sync_checkpoint_file", return_value=tmp_path / "checkpoint"
+    ):
+        result = runner.invoke(
+            system, ["data", "sync", str(src), str(dst)], obj={"config": GlobalContext()}
+        )
+        assert result.exit_code == 0, result.output
+        assert "Copied 6 files" in result.output
+
+        result = runner.invoke(
+            system, ["data", "sync", str(src), str(src / "front")], obj={"config": GlobalContext()}
+        )
+    assert result.exit_code == 1
+    assert "is inside" in result.output
+
+
+def test_sync_with_errors_scans_again_on_the_next_run(src, tmp_path):
+    dst = tmp_path / "dst"
+    checkpoint = tmp_path / "checkpoint"
+    unreadable = str(dst / "rear" / "2.jpg")
+
+    def failing_copy(src_path, dst_path):
+        if dst_path == unreadable:
+            raise OSError(errno.EACCES, "Permission denied")
+        return copy_file(src_path, dst_path)
+
+    with patch.object(sync_module, "copy_file", side_effect=failing_copy):
+        assert len(DataSync(str(src), str(dst), checkpoint_file=checkpoint).run().errors) == 1
+        (src / "front" / "new.jpg").write_bytes(b"new")
+        stats = DataSync(str(src), str(dst), checkpoint_file=checkpoint).run()
+    assert stats.scanned == 7 and len(stats.errors) == 1
+    assert (dst / "front" / "new.jpg").read_bytes() == b"new"
+    assert checkpoint.exists()
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext
+from arm_cli.system.data import usage
+from arm_cli.system.data.usage import UsageCache, summarize_trees, usage_by_day, usage_by_dir
+from arm_cli.system.system import system
+
+DAY_1 = time.mktime((2024, 5, 1, 12, 0, 0, 0, 0, -1))
+DAY_2 = time.mktime((2024, 5, 2, 12, 0, 0, 0, 0, -1))
+
+
+def _du(path):
+    return os.lstat(path).st_blocks * 512
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """/DATA with images of two cameras over two days, and an influxdb2 file."""
+    root = tmp_path / "DATA"
+    for camera in ["front", "rear"]:
+        for day, mtime in [("2024-05-01", DAY_1), ("2024-05-02", DAY_2)]:
+            directory = root / "images" / camera / day
+            directory.mkdir(parents=True)
+            for i in range(2):
+                image = directory / f"{i}.jpg"
+                image.write_bytes(b"x" * 10000)
+                os.utime(image, (mtime, mtime))
+    (root / "influxdb2").mkdir()
+    (root / "influxdb2" / "data.tsm").write_bytes(b"y" * 50000)
+    return root
+
+
+def _tree_bytes(root):
+    return sum(
+        _du(os.path.join(d, name)) for d, dirs, files in os.walk(root) for name in files
+    ) + sum(_du(d) for d, dirs, files in os.walk(root))
+
+
+def test_usage_by_dir_and_day(data_dir):
+    roots = [str(data_dir)]
+    summaries = summarize_trees(roots)
+    assert len(summaries) == 9
+
+    by_dir = usage_by_dir(summaries, roots, depth=1)
+    assert set(by_dir) == {str(data_dir), str(data_dir / "images"), str(data_dir / "influxdb2")}
+    assert by_dir[str(data_dir / "images")][0] == 8
+    assert sum(size for _, size in by_dir.values()) == _tree_bytes(data_dir)
+
+    by_camera = usage_by_dir(summaries, roots, depth=2)
+    assert by_camera[str(data_dir / "images" / "rear")][0] == 4
+
+    by_day = usage_by_day(summaries)
+    assert {day: files for day, (files, _) in by_day.items()} == {
+        "2024-05-01": 4,
+        "2024-05-02": 4,
+        time.strftime(
+            "%Y-%m-%d", time.localtime(os.stat(data_dir / "influxdb2" / "data.tsm").st_mtime)
+        ): 1,
+    }
+
+
+def test_repeat_runs_only_rescan_changed_directories(data_dir, tmp_path):
+    roots = [str(data_dir)]
+    cache = UsageCache(tmp_path / "usage.json")
+    cache.save(roots, summarize_trees(roots, cache))
+
+    cache = UsageCache(tmp_path / "usage.json")
+    with patch.object(usage, "scan_dir", wraps=usage.scan_dir) as scan_dir:
+        summaries = summarize_trees(roots, cache)
+        assert scan_dir.call_count == 0
+    assert not any(s.scanned for s in summaries)
+
+    new_day = data_dir / "images" / "front" / "2024-05-03"
+    new_day.mkdir()
+    (new_day / "0.jpg").write_bytes(b"z" * 10000)
+    with patch.object(usage, "scan_dir", wraps=usage.scan_dir) as scan_dir:
+        summaries = summarize_trees(roots, cache)
+    assert sorted(os.path.basename(call.args[0]) for call in scan_dir.call_args_list) == [
+        "2024-05-03",
+        "front",
+    ]
+    assert usage_by_dir(summaries, roots, 1)[str(data_dir / "images")][0] == 9
+    cache.save(roots, summaries)
+
+    # Directories that are gone are dropped from the cache
+    (new_day / "0.jpg").unlink()
+    new_day.rmdir()
+    cache = UsageCache(tmp_path / "usage.json")
+    cache.save(roots, summarize_trees(roots, cache))
+    assert UsageCache(tmp_path / "usage.json").get(str(new_day)) is None
+
+
+def test_usage_command_outputs_sorted_table_and_json(data_dir, tmp_path):
+    runner = CliRunner()
+    with patch.object(usage, "get_usage_cache_file", return_value=tmp_path / "usage.json"):
+        result = runner.invoke(
+            system, ["data", "usage", str(data_dir)], obj={"config": GlobalContext()}
+        )
+        assert result.exit_code == 0, result.output
+        lines = result.output.splitlines()
+        assert lines[0].split() == ["SIZE", "FILES", "PATH"]
+        assert [line.split()[-1] for line in lines[1:4]] == [
+            str(data_dir / "images"),
+            str(data_dir / "influxdb2"),
+            str(data_dir),
+        ]
+        assert "scanned 9 of 9 directories" in result.output
+
+        result = runner.invoke(
+            system,
+            ["data", "usage", str(data_dir / "images"), "--by", "day", "--sort", "name", "--json"],
+            obj={"config": GlobalContext()},
+        )
+    entries = json.loads(result.output)
+    assert [(e["day"], e["files"]) for e in entries] == [("2024-05-01", 4), ("2024-05-02", 4)]
+
+
+def test_usage_command_rejects_missing_paths(tmp_path):
+    result = CliRunner().invoke(
+        system, ["data", "usage", str(tmp_path / "missing")], obj={"config": GlobalContext()}
+    )
+    assert result.exit_code == 1
+    assert "not a directory" in result.output
@@ -0,0 +1,80 @@
+import grp
+import os
+import pwd
+import subprocess
+from unittest import mock
+
+import pytest
+
+from arm_cli.system import host_facts
+from arm_cli.system.setup_utils import check_docker_group_setup, get_original_user_uid_gid
+
+
+@pytest.fixture(autouse=True)
+def fresh_facts():
+    host_facts.clear_cache()
+    yield
+    host_facts.clear_cache()
+
+
+def _utmp_record(record_type, line, user):
+    return host_facts._UTMP_RECORD.pack(
+        record_type, 1234, line.encode(), b"ts/0", user.encode(), b"", 0, 0, 0, 0, 0, 0, 0, 0, 0
+    )
+
+
+def test_read_utmp_keeps_user_sessions(tmp_path):
+    utmp = tmp_path / "utmp"
+    utmp.write_bytes(
+        _utmp_record(2, "~", "reboot")
+        + _utmp_record(host_facts._USER_PROCESS, "pts/0", "robot")
+        + _utmp_record(host_facts._USER_PROCESS, "pts/3", "operator")
+    )
+    assert host_facts.read_utmp(str(utmp)) == [("pts/0", "robot"), ("pts/3", "operator")]
+    assert host_facts.read_utmp(str(tmp_path / "missing")) == []
+
+
+def test_login_user_is_read_from_utmp_for_our_terminal(tmp_path):
+    utmp = tmp_path / "utmp"
+    utmp.write_bytes(
+        _utmp_record(host_facts._USER_PROCESS, "pts/0", "robot")
+        + _utmp_record(host_facts._USER_PROCESS, "pts/3", "operator")
+    )
+    with mock.patch.object(host_facts, "UTMP_FILES", (str(utmp),)), mock.patch.object(
+        host_facts, "get_terminal", return_value="pts/3"
+    ):
+        assert host_facts.get_login_user() == "operator"
+
+
+def test_original_user_prefers_sudo_user():
+    with mock.patch.dict(os.environ, {"SUDO_USER": "robot"}), mock.patch("subprocess.run") as run:
+        assert host_facts.get_original_user() == "robot"
+        run.assert_not_called()
+
+
+def test_ids_and_groups_match_id_without_subprocesses():
+    user = pwd.getpwuid(os.getuid()).pw_name
+    expected = subprocess.run(["id", "-nG", user], capture_output=True, text=True, check=True)
+
+    with mock.patch("subprocess.run") as run:
+        assert get_original_user_uid_gid(user) == (os.getuid(), pwd.getpwnam(user).pw_gid)
+        assert set(host_facts.get_user_groups(user)) == set(expected.stdout.split())
+        run.assert_not_called()
+
+
+def test_unknown_user_falls_back_to_our_ids():
+    assert host_facts.get_user_ids("no-such-user-here") == (os.getuid(), os.getgid())
+
+
+def test_docker_group_check_uses_group_database():
+    user = pwd.getpwuid(os.getuid()).pw_name
+    docker = grp.struct_group(("docker", "x", 998, [user]))
+    getgrgid = grp.getgrgid
+    with mock.patch.object(host_facts, "get_original_user", return_value=user), mock.patch.object(
+        host_facts.os, "getgrouplist", return_value=[os.getgid(), 998]
+    ), mock.patch.object(
+        host_facts.grp,
+        "getgrgid",
+        side_effect=lambda gid: docker if gid == 998 else getgrgid(gid),
+    ):
+        assert check_docker_group_setup()
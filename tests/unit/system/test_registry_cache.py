@@ -0,0 +1,277 @@
+import hashlib
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from arm_cli.system.registry_cache import BlobStore, add_registry_mirror, create_server, parse_size
+
+MANIFEST_TYPE = "application/vnd.docker.distribution.manifest.v2+json"
+
+
+def _digest(data):
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+class StandInRegistry(ThreadingHTTPServer):
+    """Upstream registry stand-in that requires an anonymous bearer token."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.blobs = {}
+        self.manifests = {}
+        self.tags = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def add_blob(self, data):
+        self.blobs[_digest(data)] = data
+        return _digest(data)
+
+    def add_manifest(self, name, tag, manifest):
+        data = json.dumps(manifest).encode()
+        self.manifests[_digest(data)] = data
+        self.tags[(name, tag)] = _digest(data)
+        return _digest(data)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(send_body=False)
+
+    def do_GET(self, send_body=True):
+        server = self.server
+        if self.path.startswith("/token"):
+            return self._reply(200, json.dumps({"token": "secret"}).encode(), send_body=send_body)
+        if self.headers.get("Authorization") != "Bearer secret":
+            challenge = f'Bearer realm="{server.url}/token",service="stand-in"'
+            return self._reply(401, b"", {"WWW-Authenticate": challenge}, send_body)
+
+        with server.lock:
+            server.requests.append((self.command, self.path))
+        _, _, name_and_rest = self.path.partition("/v2/")
+        name, kind, ref = name_and_rest.rsplit("/", 2)
+        if kind == "manifests":
+            digest = ref if ref.startswith("sha256:") else server.tags.get((name, ref))
+            data = server.manifests.get(digest)
+            headers = {"Content-Type": MANIFEST_TYPE, "Docker-Content-Digest": str(digest)}
+        else:
+            data = server.blobs.get(ref)
+            headers = {}
+        if data is None:
+            return self._reply(404, b"", send_body=send_body)
+        self._reply(200, data, headers, send_body)
+
+    def _reply(self, code, body, headers=None, send_body=True):
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def upstream():
+    server = _serve(StandInRegistry())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache(upstream, tmp_path):
+    server = _serve(create_server(tmp_path / "cache", 10_000, upstream.url, "127.0.0.1", 0))
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request) as response:
+        return response.status, dict(response.headers), response.read()
+
+
+def _blob_requests(upstream, digest):
+    return [r for r in upstream.requests if r[1].endswith(f"/blobs/{digest}")]
+
+
+def test_blob_is_fetched_from_upstream_once(upstream, cache):
+    """Concurrent and repeated requests for a blob hit upstream only once."""
+    data = b"layer data" * 100
+    digest = upstream.add_blob(data)
+    url = f"{cache.url}/v2/library/ros/blobs/{digest}"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: _get(url), range(8)))
+
+    assert all(status == 200 and body == data for status, _, body in results)
+    assert len(_blob_requests(upstream, digest)) == 1
+    assert cache.cache.stats["misses"] == 1
+
+
+def test_range_requests_are_served_from_cache(upstream, cache):
+    """Range requests return partial content with a Content-Range header."""
+    data = bytes(range(256)) * 4
+    digest = upstream.add_blob(data)
+    url = f"{cache.url}/v2/library/ros/blobs/{digest}"
+
+    status, headers, body = _get(url, {"Range": "bytes=10-19"})
+    assert status == 206
+    assert body == data[10:20]
+    assert headers["Content-Range"] == f"bytes 10-19/{len(data)}"
+
+    status, _, body = _get(url, {"Range": "bytes=-5"})
+    assert status == 206
+    assert body == data[-5:]
+
+
+def test_manifest_by_tag(upstream, cache):
+    """Tags are resolved upstream and the manifest is served with its media type."""
+    digest = upstream.add_manifest("library/ros", "humble", {"schemaVersion": 2})
+
+    status, headers, body = _get(f"{cache.url}/v2/library/ros/manifests/humble")
+
+    assert status == 200
+    assert json.loads(body) == {"schemaVersion": 2}
+    assert headers["Content-Type"] == MANIFEST_TYPE
+    assert headers["Docker-Content-Digest"] == digest
+
+
+def test_missing_blob_returns_upstream_status(upstream, cache):
+    """Unknown blobs report the upstream 404 instead of failing the server."""
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _get(f"{cache.url}/v2/library/ros/blobs/{_digest(b'missing')}")
+    assert e.value.code == 404
+
+
+def test_blob_store_evicts_least_recently_used(tmp_path):
+    """Blobs are evicted in least recently used order once over the size budget."""
+    store = BlobStore(tmp_path, max_bytes=250)
+    blobs = [bytes([i]) * 100 for i in range(3)]
+    digests = []
+    for data in blobs[:2]:
+        digests.append(_digest(data))
+        store.put(digests[-1], _Reader(data))
+
+    # Touch the first blob so the second one becomes least recently used
+    assert store.get(digests[0]) is not None
+    digests.append(_digest(blobs[2]))
+    store.put(digests[2], _Reader(blobs[2]))
+
+    assert store.get(digests[1]) is None
+    assert store.get(digests[0]) is not None
+    assert store.total_bytes == 200
+    # The access order survives a restart
+    assert BlobStore(tmp_path, max_bytes=250).total_bytes == 200
+
+
+def test_blob_store_rejects_digest_mismatch(tmp_path):
+    store = BlobStore(tmp_path, max_bytes=1000)
+    with pytest.raises(ValueError, match="Digest mismatch"):
+        store.put(_digest(b"expected"), _Reader(b"something else"))
+    assert store.total_bytes == 0
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self, size):
+        data, self.data = self.data[:size], self.data[size:]
+        return data
+
+
+def test_parse_size():
+    assert parse_size("500") == 500
+    assert parse_size("2K") == 2048
+    assert parse_size("1.5G") == int(1.5 * 1024**3)
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_add_registry_mirror_marks_http_mirror_insecure():
+    config = add_registry_mirror({"log-driver": "json-file"}, "http://lab-cache:5000")
+    assert config == {
+        "log-driver": "json-file",
+        "registry-mirrors": ["http://lab-cache:5000"],
+        "insecure-registries": ["lab-cache:5000"],
+    }
+    assert add_registry_mirror(config, "http://lab-cache:5000") == config
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/v2/../../etc/manifests/passwd",
+        "/v2/library/../../../tmp/manifests/latest",
+        "/v2/Library/ros/manifests/humble",
+        "/v2/library/ros/manifests/..",
+        "/v2/library/ros/manifests/.hidden",
+    ],
+)
+def test_invalid_names_and_tags_are_rejected(upstream, cache, path):
+    """Names and tags outside the distribution grammar never reach the tag store."""
+    with pytest.raises(urllib.error.HTTPError) as e:
+        _get(f"{cache.url}{path}")
+    assert e.value.code == 400
+    assert not upstream.requests
+    with pytest.raises(ValueError):
+        cache.cache.tag_file("library/../..", "passwd")
+
+
+def test_fetch_locks_are_dropped_after_the_fetch(upstream, cache):
+    """Each blob has a fetch lock only while it is being fetched."""
+    digests = [upstream.add_blob(bytes([i]) * 100) for i in range(5)]
+    for digest in digests:
+        _get(f"{cache.url}/v2/library/ros/blobs/{digest}")
+    assert cache.cache.store._fetch_locks == {}
+
+
+def test_blob_evicted_before_it_is_served_is_fetched_again(upstream, cache):
+    """A blob unlinked between the lookup and the open is fetched from upstream again."""
+    data = b"evicted layer" * 100
+    digest = upstream.add_blob(data)
+    url = f"{cache.url}/v2/library/ros/blobs/{digest}"
+    _get(url)
+
+    store = cache.cache.store
+    get = store.get
+
+    def get_then_evict(requested):
+        path = get(requested)
+        if path is not None:
+            path.unlink()
+        return path
+
+    store.get = get_then_evict
+    try:
+        status, _, body = _get(url)
+    finally:
+        store.get = get
+    assert status == 200 and body == data
+    assert len(_blob_requests(upstream, digest)) == 2
@@ -0,0 +1,135 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext
+from arm_cli.system import setup_engine
+from arm_cli.system.setup_engine import (
+    STATUS_CHANGED,
+    STATUS_ERROR,
+    STATUS_INCOMPLETE,
+    STATUS_OK,
+    STATUS_SKIPPED,
+    HostFacts,
+    SetupStep,
+    run_setup_steps,
+    sort_steps,
+)
+from arm_cli.system.system import system
+
+
+def test_facts_are_gathered_once_and_concurrently():
+    calls = []
+    barrier = threading.Barrier(2, timeout=5)
+
+    def slow(name):
+        def gather(facts):
+            calls.append(name)
+            # Both gatherers must be running at the same time to get past the barrier
+            barrier.wait()
+            return name
+
+        return gather
+
+    facts = HostFacts({"a": slow("a"), "b": slow("b"), "c": lambda facts: facts["a"] + facts["b"]})
+    assert facts["c"] == "ab"
+    assert facts["c"] == "ab"
+    assert sorted(calls) == ["a", "b"]
+    assert set(facts.timings()) == {"a", "b", "c"}
+
+
+def test_fact_errors_are_raised_when_read():
+    facts = HostFacts({"broken": lambda facts: 1 / 0})
+    with pytest.raises(ZeroDivisionError):
+        facts["broken"]
+
+
+def test_sort_steps_orders_requirements_first():
+    def step(name, *requires):
+        return SetupStep(name, lambda facts: True, lambda force: True, requires)
+
+    ordered = sort_steps([step("c", "b"), step("a"), step("b", "a")])
+    assert [s.name for s in ordered] == ["a", "b", "c"]
+
+    with pytest.raises(ValueError, match="requires itself"):
+        sort_steps([step("a", "b"), step("b", "a")])
+    with pytest.raises(ValueError, match="unknown step 'x'"):
+        sort_steps([step("a", "x")])
+
+
+def test_run_setup_steps_statuses_and_skips():
+    applied = []
+
+    def apply(name, result):
+        def run(force):
+            applied.append((name, force))
+            return result
+
+        return run
+
+    steps = [
+        SetupStep("done", lambda facts: True, apply("done", True)),
+        SetupStep("change", lambda facts: False, apply("change", True)),
+        SetupStep("cancel", lambda facts: False, apply("cancel", False)),
+        SetupStep("after-cancel", lambda facts: False, apply("after-cancel", True), ("cancel",)),
+        SetupStep("after-change", lambda facts: False, apply("after-change", True), ("change",)),
+        SetupStep("crash", lambda facts: 1 / 0, apply("crash", True)),
+    ]
+    results = run_setup_steps(steps, lambda: HostFacts({}), force=True)
+    assert [(r.name, r.status) for r in results] == [
+        ("done", STATUS_OK),
+        ("change", STATUS_CHANGED),
+        ("cancel", STATUS_INCOMPLETE),
+        ("after-cancel", STATUS_SKIPPED),
+        ("after-change", STATUS_CHANGED),
+        ("crash", STATUS_ERROR),
+    ]
+    assert results[3].detail == "requires cancel"
+    assert sorted(applied) == [("after-change", True), ("cancel", True), ("change", True)]
+
+
+def test_independent_checks_run_in_parallel():
+    def slow_check(facts):
+        time.sleep(0.2)
+        return True
+
+    steps = [SetupStep(str(i), slow_check, lambda force: True) for i in range(4)]
+    start = time.monotonic()
+    results = run_setup_steps(steps, lambda: HostFacts({}))
+    assert time.monotonic() - start < 0.6
+    assert all(result.status == STATUS_OK for result in results)
+
+
+def test_setup_command_no_change_path(tmp_path):
+    facts = HostFacts(
+        {
+            "in_docker": lambda facts: False,
+            "xhost_configured": lambda facts: True,
+            "in_docker_group": lambda facts: True,
+            "original_user": lambda facts: "robot",
+            "shell_configured": lambda facts: True,
+        }
+    )
+    with mock.patch("arm_cli.system.system.get_host_facts", return_value=facts), mock.patch(
+        "arm_cli.system.system.get_setup_ledger_file", return_value=tmp_path / "ledger.json"
+    ), mock.patch.object(
+        setup_engine, "check_data_directories_setup", return_value=True
+    ), mock.patch(
+        "subprocess.run"
+    ) as run:
+        result = CliRunner().invoke(system, ["setup", "--verbose"], obj={"config": GlobalContext()})
+    assert result.exit_code == 0, result.output
+    run.assert_not_called()
+    lines = result.output.splitlines()
+    table = lines[lines.index("STEP              STATUS  TIME") + 1 :][:4]
+    assert [line.split()[:2] for line in table] == [
+        ["xhost", "OK"],
+        ["shell", "OK"],
+        ["docker_group", "OK"],
+        ["data_directories", "OK"],
+    ]
+    assert "  in_docker_group: " in result.output
+    assert "not completed" not in result.output
@@ -0,0 +1,127 @@
+import json
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import GlobalContext
+from arm_cli.system.setup_engine import (
+    STATUS_CHANGED,
+    STATUS_DRIFT,
+    STATUS_OK,
+    STATUS_UNCHANGED,
+    HostFacts,
+    SetupStep,
+    run_setup_steps,
+)
+from arm_cli.system.setup_ledger import SetupLedger, stat_fingerprint
+from arm_cli.system.system import system
+
+
+@pytest.fixture
+def marker(tmp_path):
+    """A step that is set up when its marker file exists, fingerprinted by its stat."""
+    path = tmp_path / "marker"
+    calls = {"check": 0, "apply": 0}
+
+    def check(facts):
+        calls["check"] += 1
+        return path.exists()
+
+    def apply(force):
+        calls["apply"] += 1
+        path.write_text("set up")
+        return True
+
+    step = SetupStep(
+        "marker", check, apply, fingerprint=lambda: {"marker": stat_fingerprint(str(path))}
+    )
+    return path, step, calls
+
+
+def _statuses(results):
+    return [(result.status, result.detail) for result in results]
+
+
+def test_unchanged_steps_skip_checks_and_facts(marker, tmp_path):
+    path, step, calls = marker
+    ledger_file = tmp_path / "ledger.json"
+    get_facts = mock.Mock(return_value=HostFacts({}))
+
+    results = run_setup_steps([step], get_facts, ledger=SetupLedger(ledger_file))
+    assert _statuses(results) == [(STATUS_CHANGED, None)]
+    assert json.loads(ledger_file.read_text())["steps"]["marker"]["marker"] is not None
+
+    get_facts.reset_mock()
+    results = run_setup_steps([step], get_facts, ledger=SetupLedger(ledger_file))
+    assert _statuses(results) == [(STATUS_UNCHANGED, None)]
+    get_facts.assert_not_called()
+    assert calls == {"check": 1, "apply": 1}
+
+    results = run_setup_steps([step], get_facts, ledger=SetupLedger(ledger_file), verify=True)
+    assert _statuses(results) == [(STATUS_OK, None)]
+    assert calls == {"check": 2, "apply": 1}
+
+
+def test_check_only_reports_drift_without_changes(marker, tmp_path):
+    path, step, calls = marker
+    ledger_file = tmp_path / "ledger.json"
+    run_setup_steps([step], lambda: HostFacts({}), ledger=SetupLedger(ledger_file))
+    saved = ledger_file.read_text()
+
+    path.unlink()
+    results = run_setup_steps(
+        [step], lambda: HostFacts({}), ledger=SetupLedger(ledger_file), check_only=True
+    )
+    assert _statuses(results) == [(STATUS_DRIFT, "changed: marker")]
+    assert calls["apply"] == 1
+    assert not path.exists()
+    assert ledger_file.read_text() == saved
+
+
+def test_failed_steps_are_forgotten(tmp_path):
+    ledger = SetupLedger(tmp_path / "ledger.json")
+    ledger.record("step", {"version": "1"})
+    step = SetupStep(
+        "step", lambda facts: False, lambda force: False, fingerprint=lambda: {"version": "2"}
+    )
+    run_setup_steps([step], lambda: HostFacts({}), ledger=ledger)
+    assert SetupLedger(tmp_path / "ledger.json").changed_inputs("step", {"version": "2"}) is None
+
+
+def test_corrupt_ledger_is_ignored(tmp_path):
+    ledger_file = tmp_path / "ledger.json"
+    ledger_file.write_text("{not json")
+    assert SetupLedger(ledger_file).changed_inputs("step", {}) is None
+
+
+def test_setup_check_exits_with_drift(tmp_path):
+    facts = HostFacts(
+        {
+            "in_docker": lambda facts: True,
+            "xhost_configured": lambda facts: False,
+            "in_docker_group": lambda facts: False,
+            "original_user": lambda facts: "robot",
+            "shell_configured": lambda facts: True,
+        }
+    )
+    with mock.patch("arm_cli.system.system.get_host_facts", return_value=facts), mock.patch(
+        "arm_cli.system.system.get_setup_ledger_file", return_value=tmp_path / "ledger.json"
+    ), mock.patch(
+        "arm_cli.system.setup_engine.check_data_directories_setup", return_value=True
+    ), mock.patch(
+        "arm_cli.system.setup_engine.setup_docker_group"
+    ) as setup_docker_group:
+        result = CliRunner().invoke(system, ["setup", "--check"], obj={"config": GlobalContext()})
+    assert result.exit_code == 1, result.output
+    setup_docker_group.assert_not_called()
+    lines = result.output.splitlines()
+    header = next(i for i, line in enumerate(lines) if line.startswith("STEP"))
+    statuses = {line.split()[0]: line.split()[1] for line in lines[header + 1 : header + 5]}
+    assert statuses == {
+        "xhost": "OK",
+        "shell": "OK",
+        "docker_group": "DRIFT",
+        "data_directories": "OK",
+    }
+    assert not (tmp_path / "ledger.json").exists()
@@ -1,8 +1,16 @@
+import os
 from unittest import mock
 
 import pytest
 
-from arm_cli.system.setup_utils import is_line_in_file, setup_xhost
+from arm_cli.system.permissions import FixStats
+from arm_cli.system.setup_utils import (
+    check_data_directories_setup,
+    get_data_directories,
+    is_line_in_file,
+    setup_data_directories,
+    setup_xhost,
+)
 
 
 @pytest.fixture
@@ -33,3 +41,34 @@ def test_is_line_in_file_exists(temp_file):
 def test_is_line_in_file_not_exists(temp_file):
     """Test if the function correctly returns False for a missing line."""
     assert not is_line_in_file("missing line", temp_file)
+
+
+def test_check_data_directories_setup_only_checks_the_top_level(tmp_path):
+    for directory in get_data_directories(str(tmp_path)):
+        os.makedirs(directory)
+        os.chmod(directory, 0o775)
+    image = tmp_path / get_data_directories(str(tmp_path))[0] / "camera" / "0.jpg"
+    image.parent.mkdir()
+    image.write_bytes(b"jpg")
+    image.chmod(0o600)
+    ids = (os.getuid(), os.getgid())
+    with mock.patch("arm_cli.system.setup_utils.get_original_user_uid_gid", return_value=ids):
+        with mock.patch("arm_cli.system.permissions.walk_parallel") as walk:
+            assert check_data_directories_setup(str(tmp_path))
+        walk.assert_not_called()
+        os.chmod(get_data_directories(str(tmp_path))[1], 0o757)
+        assert not check_data_directories_setup(str(tmp_path))
+
+
+def test_setup_data_directories_walks_the_trees_once(tmp_path):
+    stats = FixStats()
+    with mock.patch.multiple(
+        "arm_cli.system.setup_utils",
+        check_data_directories_setup=mock.DEFAULT,
+        check_sudo_privileges=mock.Mock(return_value=True),
+        get_original_user_uid_gid=mock.Mock(return_value=(1000, 1000)),
+        sudo_run=mock.DEFAULT,
+        fix_permissions=mock.Mock(return_value=stats),
+    ) as mocks:
+        assert setup_data_directories(force=True, data_directory=str(tmp_path))
+    mocks["check_data_directories_setup"].assert_not_called()
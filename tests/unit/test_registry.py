@@ -0,0 +1,105 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from arm_cli.config import (
+    activate_project,
+    add_project_to_list,
+    get_available_projects,
+    load_config,
+    remove_project_from_list,
+    save_config,
+)
+from arm_cli.projects.projects import projects
+from arm_cli.registry import SqliteRegistry
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """A JSON global context with three projects, and the SQLite backend selected."""
+    available = []
+    for name in ["navigation", "manipulation", "perception"]:
+        path = tmp_path / name / "project_config.json"
+        path.parent.mkdir()
+        path.write_text(json.dumps({"name": name}))
+        available.append({"name": name, "path": str(path)})
+    config_file = tmp_path / "global_context.json"
+    config_file.write_text(
+        json.dumps({"active_project": available[1]["path"], "available_projects": available})
+    )
+    with patch("arm_cli.config.get_config_file", return_value=config_file), patch(
+        "arm_cli.config.is_sqlite_registry_enabled", return_value=True
+    ):
+        yield config_file
+
+
+def _names(config):
+    return [project.name for project in get_available_projects(config)]
+
+
+def test_json_context_is_migrated_once(config_file, tmp_path, capsys):
+    config = load_config()
+    assert config.active_project.endswith("manipulation/project_config.json")
+    assert _names(config) == ["navigation", "manipulation", "perception"]
+    assert (tmp_path / "global_context.db").exists()
+    # The notice must not end up in output piped from the first command after an upgrade
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "Migrated 3 projects" in captured.err
+
+    # Later changes to the JSON file are not re-imported
+    config_file.write_text(json.dumps({"active_project": "", "available_projects": []}))
+    assert _names(load_config()) == ["navigation", "manipulation", "perception"]
+
+
+def test_activate_is_an_indexed_single_row_update(config_file):
+    config = load_config()
+    with patch.object(SqliteRegistry, "list_projects") as list_projects:
+        project_config = activate_project(config, "PERCEPTION")
+        list_projects.assert_not_called()
+    assert project_config.name == "perception"
+    assert load_config().active_project.endswith("perception/project_config.json")
+    assert activate_project(config, "missing") is None
+
+
+def test_add_and_remove_update_rows(config_file, tmp_path):
+    config = load_config()
+    add_project_to_list(config, str(tmp_path / "navigation" / "project_config.json"), "nav")
+    add_project_to_list(config, "/robots/r2/project_config.json", "r2")
+    save_config(config)
+
+    config = load_config()
+    # Re-adding a project moves it to the end, as with the JSON backend
+    assert _names(config) == ["manipulation", "perception", "nav", "r2"]
+    assert config.active_project == "/robots/r2/project_config.json"
+
+    assert remove_project_from_list(config, "r2")
+    save_config(config)
+    config = load_config()
+    assert _names(config) == ["manipulation", "perception", "nav"]
+    assert config.active_project == ""
+
+
+def test_concurrent_processes_see_committed_rows(tmp_path):
+    writer = SqliteRegistry(tmp_path / "registry.db")
+    reader = SqliteRegistry(tmp_path / "registry.db")
+    writer.add("/a.json", "a")
+    assert reader.find("A") == ("/a.json", "a")
+    with writer._transaction():
+        writer.add("/b.json", "b")
+        # WAL readers are not blocked by the open write transaction
+        assert reader.count() == 1
+    assert reader.count() == 2
+
+
+def test_projects_commands_use_the_registry(config_file):
+    runner = CliRunner()
+    result = runner.invoke(projects, ["activate", "navigation"], obj={"config": load_config()})
+    assert result.exit_code == 0, result.output
+    assert "Activated project: navigation" in result.output
+
+    result = runner.invoke(projects, ["ls"], obj={"config": load_config()})
+    assert "1. navigation *" in result.output
+    assert "3. perception" in result.output
@@ -0,0 +1,71 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from click.shell_completion import ShellComplete
+
+from arm_cli.cli import cli
+from arm_cli.config import AvailableProject, GlobalContext, save_config
+from arm_cli.utils import completion
+from arm_cli.utils.completion import read_completion_cache, write_completion_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    with patch.object(completion, "get_completion_dir", return_value=tmp_path / "completion"):
+        yield tmp_path / "completion"
+
+
+def _complete(args, incomplete):
+    shell = ShellComplete(cli, {}, "arm-cli", "_ARM_CLI_COMPLETE")
+    return [item.value for item in shell.get_completions(args, incomplete)]
+
+
+def test_cache_expires(cache_dir):
+    write_completion_cache("containers", ["driver", "camera"])
+    assert read_completion_cache("containers") == ["driver", "camera"]
+    # The first line is the expiry time, readable without Python by the shell addins
+    assert int((cache_dir / "containers").read_text().split("\n")[0]) > time.time()
+
+    with patch.object(completion.time, "time", return_value=time.time() + 31):
+        assert read_completion_cache("containers") is None
+
+
+def test_saving_config_refreshes_project_completion(cache_dir, tmp_path):
+    config = GlobalContext(
+        available_projects=[
+            AvailableProject(name="navigation", path="/code/navigation/project_config.json"),
+            AvailableProject(name="nav-sim", path="/code/nav-sim/project_config.json"),
+            AvailableProject(name="perception", path="/code/perception/project_config.json"),
+        ]
+    )
+    with patch("arm_cli.config.get_config_file", return_value=tmp_path / "global_context.json"):
+        save_config(config)
+
+    with patch("arm_cli.config.load_config") as load_config:
+        assert _complete(["projects", "activate"], "nav") == ["navigation", "nav-sim"]
+        assert _complete(["projects", "remove"], "") == ["navigation", "nav-sim", "perception"]
+        load_config.assert_not_called()
+
+
+def test_container_completion_queries_docker_only_when_stale(cache_dir):
+    with patch.object(
+        completion, "_load_container_names", return_value=["driver", "camera"]
+    ) as load:
+        assert _complete(["container", "attach"], "d") == ["driver"]
+        assert _complete(["container", "logs"], "") == ["driver", "camera"]
+        assert load.call_count == 1
+
+        with patch.object(completion.time, "time", return_value=time.time() + 31):
+            _complete(["container", "attach"], "")
+        assert load.call_count == 2
+
+
+def test_completion_survives_docker_errors(cache_dir):
+    with patch.object(completion, "_load_container_names", side_effect=OSError("no daemon")):
+        assert _complete(["container", "attach"], "") == []
+
+
+def test_setting_completion(cache_dir):
+    assert _complete(["self", "settings", "get"], "menu") == ["menu_page_size"]
+    assert (cache_dir / "settings").exists()
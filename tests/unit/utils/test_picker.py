@@ -0,0 +1,90 @@
+import io
+
+import readchar
+
+from arm_cli.utils.picker import ChoiceIndex, Picker, pick
+
+LABELS = [f"robot{i:04d} ({'arm' if i % 2 else 'base'})" for i in range(10_000)]
+
+
+def _pick(keys, choices=LABELS, **kwargs):
+    output = io.StringIO()
+    key_iter = iter(keys)
+    result = pick(
+        "Select", choices, page_size=5, read_key=lambda: next(key_iter), output=output, **kwargs
+    )
+    return result, output.getvalue()
+
+
+def test_index_narrows_previous_matches():
+    index = ChoiceIndex(LABELS)
+
+    assert len(index.filter("robot00")) == 100
+    assert index.filter("ROBOT001 ARM") == [11, 13, 15, 17, 19]
+    # Cached results are reused when deleting characters
+    assert index.filter("robot00") is index.filter("robot00")
+
+
+def test_picker_renders_only_the_page_window():
+    picker = Picker(LABELS, page_size=5)
+
+    lines = picker.render("Select", width=80)
+
+    assert len(lines) == 7  # prompt, 5 choices, status
+    assert lines[1].endswith("robot0000 (base)")
+    assert "1/10000" in lines[-1]
+
+
+def test_picker_scrolls_and_wraps():
+    picker = Picker(LABELS, page_size=5)
+
+    picker.move(-1)
+    assert picker.selected == 9999
+    assert [i for i, _, _ in picker.visible()] == list(range(9995, 10_000))
+
+    picker.handle_key(readchar.key.HOME)
+    picker.handle_key(readchar.key.PAGE_DOWN)
+    assert picker.selected == 5
+    assert picker.visible()[-1][0] == 5
+
+
+def test_filter_keeps_highlighted_choice():
+    picker = Picker(LABELS, page_size=5)
+    picker.move(13, wrap=False)
+
+    for key in "arm":
+        picker.handle_key(key)
+    assert picker.selected == 13
+
+    picker.handle_key(" ")
+    picker.handle_key("9")
+    assert picker.matches[:2] == [9, 19]
+    assert picker.selected == 9
+
+
+def test_pick_returns_value_of_filtered_choice():
+    choices = [(f"project-{name}", name) for name in ("alpha", "beta", "gamma")]
+
+    result, output = _pick(["g", "a", readchar.key.ENTER], choices)
+
+    assert result == "gamma"
+    assert output.endswith("Select: project-gamma\n")
+
+
+def test_pick_reports_highlighted_choices():
+    highlighted = []
+
+    result, _ = _pick(
+        [readchar.key.DOWN, readchar.key.DOWN, readchar.key.ENTER],
+        default=3,
+        on_highlight=highlighted.append,
+    )
+
+    assert result == LABELS[5]
+    assert highlighted == [3, 4, 5]
+
+
+def test_pick_cancel():
+    assert _pick([readchar.key.ESC])[0] is None
+    # Enter does nothing while no choice matches
+    assert _pick(["x", "x", readchar.key.ENTER, readchar.key.ESC])[0] is None
@@ -0,0 +1,38 @@
+import gzip
+import io
+import os
+import tarfile
+
+from arm_cli.utils.streams import (
+    ParallelGzipWriter,
+    iter_files_tar,
+    open_compressed_reader,
+    open_compressed_writer,
+)
+
+
+def test_parallel_gzip_is_one_readable_stream_with_bounded_blocks():
+    data = os.urandom(50000) + b"a" * 200000
+    out = io.BytesIO()
+    writer = ParallelGzipWriter(out, workers=2, block_size=16384)
+    for i in range(0, len(data), 1000):
+        writer.write(data[i : i + 1000])
+        assert len(writer._pending) <= 4
+    writer.close()
+    assert not out.closed
+    assert gzip.decompress(out.getvalue()) == data
+    assert open_compressed_reader(io.BytesIO(out.getvalue())).read() == data
+
+
+def test_parallel_gzip_of_nothing_is_valid():
+    out = io.BytesIO()
+    open_compressed_writer(out, "gzip", workers=4).close()
+    assert gzip.decompress(out.getvalue()) == b""
+
+
+def test_files_tar_skips_files_removed_before_they_are_reached(tmp_path):
+    (tmp_path / "a.txt").write_bytes(b"a" * 700)
+    paths = [(tmp_path / "a.txt", "x/a.txt"), (tmp_path / "gone.txt", "x/gone.txt")]
+    tar = tarfile.open(fileobj=io.BytesIO(b"".join(iter_files_tar(paths))))
+    assert tar.getnames() == ["x/a.txt"]
+    assert tar.extractfile("x/a.txt").read() == b"a" * 700
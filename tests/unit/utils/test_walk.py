@@ -0,0 +1,54 @@
+import os
+
+from arm_cli.utils.walk import scan_dir, walk_parallel
+
+
+def _tree(root):
+    for camera in ["front", "rear"]:
+        for day in ["2024-05-01", "2024-05-02"]:
+            directory = root / camera / day
+            directory.mkdir(parents=True)
+            for i in range(3):
+                (directory / f"{i}.jpg").write_bytes(b"x" * i)
+    (root / "latest").symlink_to(root / "front")
+
+
+def test_walk_parallel_visits_every_directory_once(tmp_path):
+    _tree(tmp_path)
+    walked = list(walk_parallel([str(tmp_path)], workers=3))
+    paths = [w.path for w in walked]
+    assert sorted(os.path.relpath(p, tmp_path) for p in paths) == [
+        ".",
+        "front",
+        "front/2024-05-01",
+        "front/2024-05-02",
+        "rear",
+        "rear/2024-05-01",
+        "rear/2024-05-02",
+    ]
+    # Parents come before their subdirectories
+    assert paths.index(str(tmp_path / "front")) < paths.index(str(tmp_path / "front/2024-05-01"))
+    sizes = {entry.name: st.st_size for w in walked for entry, st in w.entries}
+    assert sizes["2.jpg"] == 2
+
+
+def test_walk_parallel_prunes_and_reports_errors(tmp_path):
+    _tree(tmp_path)
+    walked = list(
+        walk_parallel(
+            [str(tmp_path), str(tmp_path / "missing")],
+            descend=lambda parent, subdir: not subdir.endswith("rear"),
+        )
+    )
+    paths = {os.path.relpath(w.path, tmp_path) for w in walked}
+    assert not any(path.startswith("rear") for path in paths)
+    error = next(w for w in walked if w.path.endswith("missing"))
+    assert isinstance(error.error, FileNotFoundError)
+
+
+def test_scan_dir_does_not_follow_symlinks(tmp_path):
+    _tree(tmp_path)
+    assert sorted(os.path.basename(p) for p in scan_dir(str(tmp_path)).subdirs()) == [
+        "front",
+        "rear",
+    ]